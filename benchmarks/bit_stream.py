@@ -0,0 +1,60 @@
+"""Сравнение BitStream и BufferedBitStream на чтении из файла
+
+    $ python -m benchmarks.bit_stream [размер в КиБ]
+"""
+import os
+import random
+import sys
+import tempfile
+from time import perf_counter
+
+from flac.meta import BitStream, BufferedBitStream
+
+WIDTHS = [1, 4, 5, 8, 12, 16, 24, 32]
+
+
+def read_uints(stream, count: int):
+    read_uint = stream.read_uint
+    for i in range(count):
+        read_uint(WIDTHS[i & 7])
+
+
+def read_rice_ints(stream, count: int):
+    read_rice_int = stream.read_rice_int
+    for _ in range(count):
+        read_rice_int(4)
+
+
+def measure(cls, filename: str, func, count: int) -> float:
+    with open(filename, 'rb') as f:
+        stream = cls(f)
+        start = perf_counter()
+        func(stream, count)
+        return perf_counter() - start
+
+
+def main():
+    size = int(sys.argv[1]) * 1024 if len(sys.argv) > 1 else 1 << 20
+    rnd = random.Random(0)
+    data = bytes(rnd.getrandbits(8) for _ in range(size))
+
+    fd, filename = tempfile.mkstemp(suffix='.bin')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+
+        # в среднем 12.75 бит на read_uint и ~6 бит на rice int
+        cases = [('read_uint', read_uints, size * 8 // 13),
+                 ('read_rice_int', read_rice_ints, size * 8 // 8)]
+        for name, func, count in cases:
+            old = measure(BitStream, filename, func, count)
+            new = measure(BufferedBitStream, filename, func, count)
+            print('{:<14} {:>9} calls  BitStream {:7.3f}s  '
+                  'BufferedBitStream {:7.3f}s  x{:.1f}'.format(
+                      name, count, old, new, old / new))
+    finally:
+        os.remove(filename)
+
+
+if __name__ == '__main__':
+    main()
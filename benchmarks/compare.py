@@ -0,0 +1,52 @@
+"""Сравнение двух отчётов benchmarks.suite. Код выхода 1, если какой-то
+замер стал медленнее больше чем на threshold
+
+    $ python -m benchmarks.compare old.json new.json [--threshold 0.1]
+"""
+import argparse
+import json
+import sys
+from typing import List, Tuple
+
+
+def compare(old: dict, new: dict) -> List[Tuple[str, str, float]]:
+    """(бенчмарк, случай, new / old по samples_per_sec) для замеров,
+    которые есть в обоих отчётах
+    """
+    result = []
+    for benchmark, cases in sorted(new['results'].items()):
+        old_cases = old['results'].get(benchmark, {})
+        for case, measure in sorted(cases.items()):
+            if case not in old_cases:
+                continue
+            before = old_cases[case]['samples_per_sec']
+            if before:
+                result.append((benchmark, case,
+                               measure['samples_per_sec'] / before))
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare benchmark reports')
+    parser.add_argument('old')
+    parser.add_argument('new')
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help='allowed slowdown, 0.1 == 10%%')
+    args = parser.parse_args()
+
+    with open(args.old) as f:
+        old = json.load(f)
+    with open(args.new) as f:
+        new = json.load(f)
+
+    regressions = 0
+    for benchmark, case, ratio in compare(old, new):
+        slower = ratio < 1 - args.threshold
+        regressions += slower
+        print('{:<16} {:<18} x{:.2f}{}'.format(
+            benchmark, case, ratio, '  REGRESSION' if slower else ''))
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == '__main__':
+    main()
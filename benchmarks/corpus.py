@@ -0,0 +1,89 @@
+"""Детерминированный набор синтетических flac файлов для бенчмарков,
+без скачивания сэмплов: все типы субфреймов, режимы стерео, wasted bits,
+escape-разбиения Rice, 8/16/24 бит и разные размеры блока
+
+    $ python -m benchmarks.corpus [каталог] [секунд на файл]
+"""
+import os
+import sys
+from collections import namedtuple
+from typing import List
+
+from . import encoder
+
+SAMPLE_RATE = 44100
+
+
+class Case:
+    """Параметры encoder.encode для одного файла набора
+    """
+    def __init__(self, name: str, bits_per_sample: int = 16,
+                 block_size: int = 4096, subframe: str = 'lpc8',
+                 stereo: str = 'independent', partition_order: int = 2,
+                 escape: bool = False, wasted: bool = False):
+        self.name = name
+        self.bits_per_sample = bits_per_sample
+        self.block_size = block_size
+        self.subframe = subframe
+        self.stereo = stereo
+        self.partition_order = partition_order
+        self.escape = escape
+        self.wasted = wasted
+
+
+CASES = [Case('constant', subframe='constant'),
+         Case('verbatim', subframe='verbatim')] + \
+    [Case('fixed{}'.format(o), subframe='fixed{}'.format(o))
+     for o in range(5)] + \
+    [Case('lpc{}'.format(o), subframe='lpc{}'.format(o))
+     for o in [1, 2, 4, 8, 12, 16, 24, 32]] + \
+    [Case(s, stereo=s) for s in ['left_side', 'right_side', 'mid_side']] + \
+    [Case('wasted', wasted=True),
+     Case('escape', escape=True, partition_order=4)] + \
+    [Case('{}bit_{}'.format(b, size), bits_per_sample=b, block_size=size)
+     for b in [8, 16, 24] for size in [576, 1152, 4608]]
+
+
+# samples - сэмплов на канал
+CorpusFile = namedtuple('CorpusFile', ['case', 'filename', 'samples'])
+
+
+def signal(case: Case, length: int) -> List[List[int]]:
+    if case.subframe == 'constant':
+        return [[1000] * length, [-1000] * length]
+    channels = encoder.make_signal(length, 2, case.bits_per_sample)
+    if case.wasted:
+        channels = [[(s >> 3) << 3 for s in c] for c in channels]
+    return channels
+
+
+def build_corpus(directory: str, seconds: float = 1.0) -> List[CorpusFile]:
+    """Записать файлы всех CASES в directory. Уже существующие файлы с
+    тем же именем (и той же длиной) не пересобираются
+    """
+    length = int(SAMPLE_RATE * seconds)
+    result = []
+    for case in CASES:
+        filename = os.path.join(directory, '{}_{}.flac'.format(
+            case.name, length))
+        if not os.path.exists(filename):
+            data = encoder.encode(
+                signal(case, length), SAMPLE_RATE, case.bits_per_sample,
+                case.block_size, case.subframe, case.stereo,
+                case.partition_order, case.escape, case.wasted)
+            with open(filename, 'wb') as f:
+                f.write(data)
+        result.append(CorpusFile(case, filename, length))
+    return result
+
+
+def main():
+    directory = sys.argv[1] if len(sys.argv) > 1 else 'corpus'
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 1.0
+    os.makedirs(directory, exist_ok=True)
+    for file in build_corpus(directory, seconds):
+        print(file.filename)
+
+
+if __name__ == '__main__':
+    main()
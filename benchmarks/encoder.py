@@ -0,0 +1,417 @@
+"""Синтетический flac кодировщик: строит потоки для тестов и корпус
+бенчмарков
+"""
+import hashlib
+import math
+import random
+import struct
+from typing import List, Optional, Sequence
+
+
+class BitWriter:
+    def __init__(self):
+        self._data = bytearray()
+        self._bitbuffer = 0
+        self._bitbufferlen = 0
+
+    def write_uint(self, value: int, n: int):
+        if n == 0:
+            return
+        self._bitbuffer = (self._bitbuffer << n) | (value & ((1 << n) - 1))
+        self._bitbufferlen += n
+        while self._bitbufferlen >= 8:
+            self._bitbufferlen -= 8
+            self._data.append((self._bitbuffer >> self._bitbufferlen) & 0xFF)
+        self._bitbuffer &= (1 << self._bitbufferlen) - 1
+
+    def write_sint(self, value: int, n: int):
+        self.write_uint(value & ((1 << n) - 1), n)
+
+    def write_unary(self, value: int):
+        for _ in range(value):
+            self.write_uint(0, 1)
+        self.write_uint(1, 1)
+
+    def write_rice_int(self, value: int, param: int):
+        value = (value << 1) if value >= 0 else ((-value - 1) << 1) | 1
+        self.write_unary(value >> param)
+        self.write_uint(value, param)
+
+    def write_bytes(self, data: bytes):
+        self.align()
+        self._data += data
+
+    def align(self):
+        if self._bitbufferlen > 0:
+            self.write_uint(0, 8 - self._bitbufferlen)
+
+    def getvalue(self) -> bytes:
+        return bytes(self._data)
+
+    def __len__(self):
+        return len(self._data)
+
+
+def crc8(data: bytes) -> int:
+    crc = 0
+    for byte in data:
+        crc ^= byte
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x07) & 0xFF if crc & 0x80 else crc << 1
+    return crc
+
+
+def crc16(data: bytes) -> int:
+    crc = 0
+    for byte in data:
+        crc ^= byte << 8
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x8005) & 0xFFFF if crc & 0x8000 \
+                else crc << 1
+    return crc
+
+
+def _utf8_number(value: int) -> bytes:
+    if value < 0x80:
+        return bytes([value])
+    length = 2
+    while value >= 1 << (5 * length + 1):
+        length += 1
+    result = []
+    for _ in range(length - 1):
+        result.append(0x80 | (value & 0x3F))
+        value >>= 6
+    first = ((0xFF << (8 - length)) & 0xFF) | value
+    return bytes([first] + result[::-1])
+
+
+BLOCK_SIZE_CODES = {192: 1, 576: 2, 1152: 3, 2304: 4, 4608: 5,
+                    256: 8, 512: 9, 1024: 10, 2048: 11, 4096: 12,
+                    8192: 13, 16384: 14, 32768: 15}
+SAMPLE_RATE_CODES = {88200: 1, 176400: 2, 192000: 3, 8000: 4, 16000: 5,
+                     22050: 6, 24000: 7, 32000: 8, 44100: 9, 48000: 10,
+                     96000: 11}
+SAMPLE_SIZE_CODES = {8: 1, 12: 2, 16: 4, 20: 5, 24: 6, 32: 7}
+FIXED_COEFFS = [[], [1], [2, -1], [3, -3, 1], [4, -6, 4, -1]]
+STEREO_MODES = {'left_side': 8, 'right_side': 9, 'mid_side': 10}
+
+
+def _lpc_coefs(samples: Sequence[int], order: int, precision: int):
+    n = len(samples)
+    autoc = [sum(samples[i] * samples[i - lag] for i in range(lag, n))
+             for lag in range(order + 1)]
+    if autoc[0] == 0:
+        return [0] * order, 0
+    lpc = [0.0] * order
+    err = float(autoc[0])
+    for i in range(order):
+        if err <= 0:
+            break
+        acc = autoc[i + 1] - sum(lpc[j] * autoc[i - j] for j in range(i))
+        k = acc / err
+        new = lpc[:]
+        new[i] = k
+        for j in range(i):
+            new[j] = lpc[j] - k * lpc[i - 1 - j]
+        lpc = new
+        err *= 1 - k * k
+    cmax = max(abs(c) for c in lpc) or 1.0
+    limit = (1 << (precision - 1)) - 1
+    shift = 0
+    while shift < 15 and cmax * (1 << (shift + 1)) <= limit:
+        shift += 1
+    coefs = [max(-limit - 1, min(limit, int(round(c * (1 << shift)))))
+             for c in lpc]
+    return coefs, shift
+
+
+def _residuals(samples, order, coefs, shift):
+    return [samples[i] - (sum(c * samples[i - j - 1]
+                              for j, c in enumerate(coefs)) >> shift)
+            for i in range(order, len(samples))]
+
+
+def _rice_param(values) -> int:
+    if not values:
+        return 0
+    mean = sum((v << 1) if v >= 0 else ((-v - 1) << 1) | 1
+               for v in values) // len(values)
+    return min(max(mean.bit_length() - 1, 0), 30)
+
+
+def _write_residuals(writer, residuals, block_size, order,
+                     partition_order, escape):
+    while partition_order > 0 and \
+            (block_size % (1 << partition_order) != 0 or
+             (block_size >> partition_order) < order):
+        partition_order -= 1
+    partitions = []
+    start = 0
+    for i in range(1 << partition_order):
+        count = (block_size >> partition_order) - (order if i == 0 else 0)
+        partitions.append(residuals[start:start + count])
+        start += count
+    params = [_rice_param(p) for p in partitions]
+    method = 1 if max(params) >= 15 else 0
+    writer.write_uint(method, 2)
+    writer.write_uint(partition_order, 4)
+    param_len = 4 if method == 0 else 5
+    for i, partition in enumerate(partitions):
+        if escape and i % 2 == 0:
+            bits = max([v.bit_length() + 1 for v in partition if v] or [0])
+            writer.write_uint((1 << param_len) - 1, param_len)
+            writer.write_uint(bits, 5)
+            for v in partition:
+                writer.write_sint(v, bits)
+            continue
+        writer.write_uint(params[i], param_len)
+        for v in partition:
+            writer.write_rice_int(v, params[i])
+
+
+def _write_subframe(writer, samples, bits_per_sample, kind,
+                    partition_order, escape, use_wasted):
+    wasted = 0
+    if use_wasted and any(samples):
+        while all(s & (1 << wasted) == 0 for s in samples):
+            wasted += 1
+        samples = [s >> wasted for s in samples]
+        bits_per_sample -= wasted
+
+    def header(subframe_type):
+        writer.write_uint(0, 1)
+        writer.write_uint(subframe_type, 6)
+        if wasted:
+            writer.write_uint(1, 1)
+            writer.write_unary(wasted - 1)
+        else:
+            writer.write_uint(0, 1)
+
+    if kind == 'constant' or (kind != 'verbatim' and
+                              all(s == samples[0] for s in samples)):
+        if kind == 'constant' and not all(s == samples[0] for s in samples):
+            raise ValueError('Samples are not constant')
+        header(0)
+        writer.write_sint(samples[0], bits_per_sample)
+        return
+    if kind == 'verbatim':
+        header(1)
+        for s in samples:
+            writer.write_sint(s, bits_per_sample)
+        return
+
+    order = int(kind[5:] if kind.startswith('fixed') else kind[3:])
+    order = min(order, len(samples))
+    if kind.startswith('fixed'):
+        coefs, shift = FIXED_COEFFS[order], 0
+        header(8 + order)
+    else:
+        order = max(order, 1)
+        precision = 15
+        coefs, shift = _lpc_coefs(samples, order, precision)
+        header(31 + order)
+    for s in samples[:order]:
+        writer.write_sint(s, bits_per_sample)
+    if not kind.startswith('fixed'):
+        writer.write_uint(precision - 1, 4)
+        writer.write_sint(shift, 5)
+        for c in coefs:
+            writer.write_sint(c, precision)
+    residuals = _residuals(samples, order, coefs, shift)
+    _write_residuals(writer, residuals, len(samples), order,
+                     partition_order, escape)
+
+
+def _encode_frame(channels, frame_number, sample_rate, bits_per_sample,
+                  subframe, stereo, partition_order, escape, use_wasted):
+    block_size = len(channels[0])
+    writer = BitWriter()
+    writer.write_uint(0b11111111111110, 14)
+    writer.write_uint(0, 1)
+    writer.write_uint(0, 1)
+
+    size_code = BLOCK_SIZE_CODES.get(block_size)
+    if size_code is None:
+        size_code = 6 if block_size <= 256 else 7
+    writer.write_uint(size_code, 4)
+    rate_code = SAMPLE_RATE_CODES.get(sample_rate)
+    if rate_code is None:
+        if sample_rate % 1000 == 0 and sample_rate // 1000 < 256:
+            rate_code = 12
+        elif sample_rate < 65536:
+            rate_code = 13
+        elif sample_rate % 10 == 0 and sample_rate // 10 < 65536:
+            rate_code = 14
+        else:
+            rate_code = 0
+
+    bps = [bits_per_sample] * len(channels)
+    if stereo in STEREO_MODES and len(channels) == 2:
+        left, right = channels
+        side = [l - r for l, r in zip(left, right)]
+        assignment = STEREO_MODES[stereo]
+        if stereo == 'left_side':
+            channels, bps = [left, side], [bits_per_sample,
+                                           bits_per_sample + 1]
+        elif stereo == 'right_side':
+            channels, bps = [side, right], [bits_per_sample + 1,
+                                            bits_per_sample]
+        else:
+            mid = [(l + r) >> 1 for l, r in zip(left, right)]
+            channels, bps = [mid, side], [bits_per_sample,
+                                          bits_per_sample + 1]
+    else:
+        assignment = len(channels) - 1
+
+    writer.write_uint(rate_code, 4)
+    writer.write_uint(assignment, 4)
+    writer.write_uint(SAMPLE_SIZE_CODES.get(bits_per_sample, 0), 3)
+    writer.write_uint(0, 1)
+    writer.write_bytes(_utf8_number(frame_number))
+    if size_code == 6:
+        writer.write_uint(block_size - 1, 8)
+    elif size_code == 7:
+        writer.write_uint(block_size - 1, 16)
+    if rate_code == 12:
+        writer.write_uint(sample_rate // 1000, 8)
+    elif rate_code == 13:
+        writer.write_uint(sample_rate, 16)
+    elif rate_code == 14:
+        writer.write_uint(sample_rate // 10, 16)
+    writer.write_uint(crc8(writer.getvalue()), 8)
+
+    for i, samples in enumerate(channels):
+        kind = subframe(frame_number, i) if callable(subframe) else subframe
+        _write_subframe(writer, samples, bps[i], kind, partition_order,
+                        escape, use_wasted)
+    writer.align()
+    writer.write_uint(crc16(writer.getvalue()), 16)
+    return writer.getvalue()
+
+
+def pcm_md5(channels: List[List[int]], bits_per_sample: int) -> bytes:
+    width = (bits_per_sample + 7) // 8
+    md5 = hashlib.md5()
+    for frame in zip(*channels):
+        md5.update(b''.join(s.to_bytes(width, 'little', signed=True)
+                            for s in frame))
+    return md5.digest()
+
+
+def metadata_block(block_type: int, payload: bytes,
+                   is_last: bool = False) -> bytes:
+    return struct.pack('>I', (is_last << 31) | (block_type << 24) |
+                       len(payload)) + payload
+
+
+def vorbis_comment(tags, vendor: str = 'synthetic') -> bytes:
+    vendor_data = vendor.encode('utf-8')
+    result = struct.pack('<I', len(vendor_data)) + vendor_data
+    comments = ['{}={}'.format(k, v) for k, vs in tags.items() for v in vs]
+    result += struct.pack('<I', len(comments))
+    for comment in comments:
+        data = comment.encode('utf-8')
+        result += struct.pack('<I', len(data)) + data
+    return result
+
+
+def picture(image_data: bytes, mime_type: str = 'image/png',
+            description: str = '', picture_type: int = 3) -> bytes:
+    mime = mime_type.encode('utf-8')
+    desc = description.encode('utf-8')
+    return (struct.pack('>II', picture_type, len(mime)) + mime +
+            struct.pack('>I', len(desc)) + desc +
+            struct.pack('>IIIII', 1, 1, 24, 0, len(image_data)) +
+            image_data)
+
+
+def cuesheet(tracks, lead_out: int, catalog: str = '',
+             is_cd: bool = True) -> bytes:
+    """tracks - (offset, номер, [(смещение индекса, номер индекса)],
+    is_audio)
+    """
+    result = catalog.encode('ascii').ljust(128, b'\0')
+    result += struct.pack('>Q', 88200 if is_cd else 0)
+    result += bytes([0x80 if is_cd else 0]) + bytes(258)
+    result += bytes([len(tracks) + 1])
+    tracks = list(tracks) + [(lead_out, 170 if is_cd else 255, [], True)]
+    for offset, number, indexes, is_audio in tracks:
+        result += struct.pack('>QB', offset, number) + bytes(12)
+        result += bytes([0 if is_audio else 0x80]) + bytes(13)
+        result += bytes([len(indexes)])
+        for index_offset, index_number in indexes:
+            result += struct.pack('>QB', index_offset, index_number)
+            result += bytes(3)
+    return result
+
+
+def encode(channels: List[List[int]], sample_rate: int = 44100,
+           bits_per_sample: int = 16, block_size: int = 4096,
+           subframe='fixed2', stereo: str = 'independent',
+           partition_order: int = 0, escape: bool = False,
+           wasted: bool = False, blocks: Optional[list] = None,
+           seektable_interval: Optional[int] = None) -> bytes:
+    """Закодировать сэмплы (список каналов) во flac файл
+
+    `blocks` - дополнительные блоки метаданных, пары (тип, данные).
+    """
+    total = len(channels[0])
+    frames = []
+    for number, start in enumerate(range(0, total, block_size)):
+        frames.append(_encode_frame(
+            [c[start:start + block_size] for c in channels], number,
+            sample_rate, bits_per_sample, subframe, stereo,
+            partition_order, escape, wasted))
+
+    extra = list(blocks or [])
+    if seektable_interval is not None:
+        points = b''
+        offset = 0
+        for number, frame in enumerate(frames):
+            sample = number * block_size
+            if sample % seektable_interval == 0:
+                points += struct.pack(
+                    '>QQH', sample, offset,
+                    min(block_size, total - sample))
+            offset += len(frame)
+        extra.insert(0, (3, points))
+
+    sizes = [len(f) for f in frames] or [0]
+    streaminfo = BitWriter()
+    streaminfo.write_uint(block_size, 16)
+    streaminfo.write_uint(block_size, 16)
+    streaminfo.write_uint(min(sizes), 24)
+    streaminfo.write_uint(max(sizes), 24)
+    streaminfo.write_uint(sample_rate, 20)
+    streaminfo.write_uint(len(channels) - 1, 3)
+    streaminfo.write_uint(bits_per_sample - 1, 5)
+    streaminfo.write_uint(total, 36)
+    streaminfo.write_bytes(pcm_md5(channels, bits_per_sample))
+
+    result = b'fLaC' + metadata_block(0, streaminfo.getvalue(),
+                                      is_last=not extra)
+    for i, (block_type, payload) in enumerate(extra):
+        result += metadata_block(block_type, payload,
+                                 is_last=i == len(extra) - 1)
+    return result + b''.join(frames)
+
+
+def make_signal(length: int, channels: int = 2, bits_per_sample: int = 16,
+                seed: int = 0) -> List[List[int]]:
+    """Детерминированный сигнал: синусоиды с небольшим шумом
+    """
+    rnd = random.Random(seed)
+    amplitude = (1 << (bits_per_sample - 1)) * 0.6
+    return [[int(amplitude * math.sin(i / (17 + 9 * c))) +
+             rnd.randint(-3, 3) for i in range(length)]
+            for c in range(channels)]
+
+
+def pcm(channels: List[List[int]], bits_per_sample: int) -> bytes:
+    """Ожидаемые перемежённые PCM данные (как в wav)
+    """
+    width = bits_per_sample // 8
+    added_val = 128 if bits_per_sample == 8 else 0
+    return b''.join((s + added_val).to_bytes(width, 'little',
+                                             signed=added_val == 0)
+                    for frame in zip(*channels) for s in frame)
@@ -0,0 +1,50 @@
+"""Сравнение упаковки PCM блоком с прежней поштучной через struct
+
+    $ python -m benchmarks.pcm [размер блока] [число блоков]
+"""
+import random
+import struct
+import sys
+from time import perf_counter
+
+from flac.meta.pcm import FORMATS, pack, pack_numpy, numpy
+
+
+def pack_per_sample(channels, sample_width: int) -> bytes:
+    added_val = 128 if sample_width == 1 else 0
+    return b''.join(struct.pack('<i', s + added_val)[:sample_width]
+                    for samples in zip(*channels) for s in samples)
+
+
+def measure(func, blocks) -> float:
+    start = perf_counter()
+    for channels in blocks:
+        func(channels)
+    return perf_counter() - start
+
+
+def main():
+    block_size = int(sys.argv[1]) if len(sys.argv) > 1 else 4096
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 16
+    rnd = random.Random(0)
+    blocks = [[[rnd.randint(-2 ** 15, 2 ** 15 - 1)
+                for _ in range(block_size)] for _ in range(2)]
+              for _ in range(count)]
+    samples = block_size * count * 2
+
+    old = measure(lambda c: pack_per_sample(c, 2), blocks)
+    print('{:<8} struct  {:6.2f} Msps'.format('s16le', samples / old / 1e6))
+    for name, fmt in FORMATS.items():
+        new = measure(lambda c: pack(c, 16, fmt), blocks)
+        line = '{:<8} array   {:6.2f} Msps  x{:.1f}'.format(
+            name, samples / new / 1e6, old / new)
+        if numpy is not None:
+            arrays = [[numpy.asarray(c) for c in b] for b in blocks]
+            vectorized = measure(lambda c: pack_numpy(c, 16, fmt), arrays)
+            line += '  numpy {:6.2f} Msps  x{:.1f}'.format(
+                samples / vectorized / 1e6, old / vectorized)
+        print(line)
+
+
+if __name__ == '__main__':
+    main()
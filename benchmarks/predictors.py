@@ -0,0 +1,69 @@
+"""Сравнение ядер предсказателей с прежним generic кодом на синтетических
+субфреймах
+
+    $ python -m benchmarks.predictors [размер блока] [число блоков]
+"""
+import random
+import sys
+from time import perf_counter
+
+from flac.meta.engine import NumpyEngine, numpy
+from flac.meta.predictors import FIXED_COEFFS, restore_fixed, restore_lpc
+
+LPC_ORDERS = [1, 2, 4, 8, 12, 16, 24, 32]
+
+
+def restore_generic(warmup, coefs, shift, residuals):
+    order = len(coefs)
+    result = warmup + [-1] * len(residuals)
+    for i in range(order, len(result)):
+        s = sum(coef * result[i - j - 1] for (j, coef) in enumerate(coefs))
+        result[i] = (s >> shift) + residuals[i - order]
+    return result
+
+
+def measure(func, subframes) -> float:
+    start = perf_counter()
+    for args in subframes:
+        func(*args)
+    return perf_counter() - start
+
+
+def report(name: str, samples: int, old: float, new: float):
+    print('{:<8} generic {:6.2f} Msps  kernel {:6.2f} Msps  x{:.1f}'.format(
+        name, samples / old / 1e6, samples / new / 1e6, old / new))
+
+
+def main():
+    block_size = int(sys.argv[1]) if len(sys.argv) > 1 else 4096
+    blocks = int(sys.argv[2]) if len(sys.argv) > 2 else 16
+    rnd = random.Random(0)
+    samples = block_size * blocks
+
+    def subframe(order: int):
+        warmup = [rnd.randint(-2 ** 15, 2 ** 15 - 1) for _ in range(order)]
+        residuals = [rnd.randint(-512, 511)
+                     for _ in range(block_size - order)]
+        return warmup, residuals
+
+    for order, coefs in enumerate(FIXED_COEFFS):
+        subframes = [subframe(order) for _ in range(blocks)]
+        old = measure(lambda w, r: restore_generic(w, coefs, 0, r),
+                      subframes)
+        new = measure(restore_fixed, subframes)
+        report('fixed{}'.format(order), samples, old, new)
+        if numpy is not None:
+            vectorized = measure(NumpyEngine().restore_fixed, subframes)
+            report('  numpy', samples, old, vectorized)
+
+    for order in LPC_ORDERS:
+        coefs = [rnd.randint(-2 ** 11, 2 ** 11) for _ in range(order)]
+        subframes = [subframe(order) + (coefs, 12) for _ in range(blocks)]
+        old = measure(lambda w, r, c, s: restore_generic(w, c, s, r),
+                      subframes)
+        new = measure(lambda w, r, c, s: restore_lpc(w, c, s, r), subframes)
+        report('lpc{}'.format(order), samples, old, new)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,166 @@
+"""Набор бенчмарков на синтетическом корпусе (benchmarks.corpus) с
+результатом в JSON: скорость в сэмплах в секунду (значения всех каналов)
+для каждого этапа и каждого файла корпуса
+
+    $ python -m benchmarks.suite [--seconds 1] [--corpus DIR] [-o out.json]
+    $ python -m benchmarks.compare old.json new.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+from time import perf_counter
+from typing import Callable, Dict, List
+
+from flac.meta import BitStream, BufferedBitStream, DecodeStats, Flac
+from flac.meta.engine import default_engine, numpy
+
+from .corpus import CorpusFile, build_corpus
+
+
+class Timer:
+    """Время и число сэмплов одного замера
+    """
+    def __init__(self):
+        self.seconds = 0.0
+        self.samples = 0
+
+    def result(self) -> Dict[str, float]:
+        return {'samples': self.samples, 'seconds': self.seconds,
+                'samples_per_sec': self.samples / self.seconds
+                if self.seconds else 0.0}
+
+
+def bench_bit_stream(file: CorpusFile) -> Dict[str, dict]:
+    """Чтение файла по 16 бит (как verbatim субфреймы) через BitStream
+    и BufferedBitStream
+    """
+    count = (os.path.getsize(file.filename) - 1) // 2
+    result = {}
+    for cls in [BitStream, BufferedBitStream]:
+        with open(file.filename, 'rb') as f:
+            read_uint = cls(f).read_uint
+            timer = Timer()
+            start = perf_counter()
+            for _ in range(count):
+                read_uint(16)
+            timer.seconds = perf_counter() - start
+            timer.samples = count
+        result[cls.__name__] = timer.result()
+    return result
+
+
+def bench_stages(file: CorpusFile) -> Dict[str, dict]:
+    """Время _decode_residuals и восстановления предсказателей внутри
+    полного декодирования файла, по Flac.stats
+    """
+    flac = Flac(file.filename)
+    stats = flac.stats = DecodeStats()
+    for _ in flac.iter_frames():
+        pass
+    result = {}
+    for name, stage in [('residuals', 'residuals'),
+                        ('predictors', 'prediction')]:
+        timer = Timer()
+        timer.seconds = stats.stage_seconds[stage]
+        timer.samples = stats.samples
+        if timer.seconds:
+            result[name] = timer.result()
+    return result
+
+
+def bench_data(file: CorpusFile) -> Dict[str, float]:
+    flac = Flac(file.filename)
+    timer = Timer()
+    start = perf_counter()
+    for _ in flac.data:
+        timer.samples += 1
+    timer.seconds = perf_counter() - start
+    return timer.result()
+
+
+def bench_convert(file: CorpusFile, convert_to_wav: Callable
+                  ) -> Dict[str, float]:
+    flac = Flac(file.filename)
+    fd, wav = tempfile.mkstemp(suffix='.wav')
+    os.close(fd)
+    timer = Timer()
+    try:
+        # convert_to_wav печатает прогресс, а stdout занят под JSON
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = perf_counter()
+            convert_to_wav(flac, wav)
+            timer.seconds = perf_counter() - start
+    finally:
+        os.remove(wav)
+    timer.samples = file.samples * flac.channels
+    return timer.result()
+
+
+def run(corpus: List[CorpusFile]) -> dict:
+    try:
+        from main import convert_to_wav
+    except ImportError as e:
+        # main.py тянет зависимости плеера (npyscreen)
+        print('convert_to_wav is skipped: {}'.format(e), file=sys.stderr)
+        convert_to_wav = None
+
+    results = {}  # type: Dict[str, Dict[str, dict]]
+
+    def add(benchmark: str, case: str, result: dict):
+        results.setdefault(benchmark, {})[case] = result
+
+    for file in corpus:
+        name = file.case.name
+        print(name, file=sys.stderr)
+        if name == 'verbatim':
+            for cls, result in bench_bit_stream(file).items():
+                add('bit_stream', cls, result)
+        for stage, result in bench_stages(file).items():
+            add(stage, name, result)
+        add('data', name, bench_data(file))
+        if convert_to_wav is not None:
+            add('convert_to_wav', name, bench_convert(file, convert_to_wav))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Offline benchmark suite')
+    parser.add_argument('--seconds', type=float, default=1.0,
+                        help='length of every corpus file')
+    parser.add_argument('--corpus', default=None,
+                        help='directory to keep the corpus in, '
+                             'temporary by default')
+    parser.add_argument('-o', '--output', default=None,
+                        help='JSON file, stdout by default')
+    args = parser.parse_args()
+
+    with contextlib.ExitStack() as stack:
+        directory = args.corpus
+        if directory is None:
+            directory = stack.enter_context(tempfile.TemporaryDirectory())
+        os.makedirs(directory, exist_ok=True)
+        corpus = build_corpus(directory, args.seconds)
+        report = {
+            'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'engine': default_engine().name,
+            'numpy': numpy.__version__ if numpy is not None else None,
+            'seconds_per_file': args.seconds,
+            'results': run(corpus),
+        }
+
+    text = json.dumps(report, indent=2, sort_keys=True)
+    if args.output is None:
+        print(text)
+    else:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,32 +1,113 @@
 import argparse
+from typing import Tuple
+
+from .meta.pcm import FORMATS
+from .meta.writer import DEFAULT_PADDING
+
+FLAC_FILE_HELP = 'flac file, - to read from stdin'
+
+
+def tag_value(text: str) -> Tuple[str, str]:
+    """Аргумент вида TAG=VALUE, значение может содержать '='
+    """
+    tag, sep, value = text.partition('=')
+    if not sep or not tag:
+        raise argparse.ArgumentTypeError(
+            'expected TAG=VALUE, got {!r}'.format(text))
+    return tag, value
 
 
 def make_parser():
     parser = argparse.ArgumentParser(description='Flac player')
+    parser.add_argument('--mmap', action='store_true',
+                        help='read flac file through mmap')
 
     commands = parser.add_subparsers(title='commands', dest='command')
     commands.required = True
 
     meta = commands.add_parser('meta', help="show flac's metadata")
-    meta_types = ['all', 'info', 'app', 'pic', 'tags']
+    meta_types = ['all', 'info', 'app', 'pic', 'tags', 'cue']
     meta.add_argument('type', type=str, choices=meta_types,
                       help="metadata's type")
-    meta.add_argument('flac_file', help='flac file')
+    meta.add_argument('flac_file', help=FLAC_FILE_HELP)
 
-    play = commands.add_parser('play', help='play file')
-    play.add_argument('flac_file', help='flac file')
+    play = commands.add_parser('play', help='play files without gaps')
+    play.add_argument('flac_files', nargs='+', help='flac files')
 
     extract_covers = commands.add_parser('covers', help='extract covers')
-    extract_covers.add_argument('flac_file', help='flac file')
+    extract_covers.add_argument('flac_file', help=FLAC_FILE_HELP)
     extract_covers.add_argument(
         'dir', default='.', help='directory path to extract covers to')
 
     convert = commands.add_parser('conv', help='convert flac to wav')
-    convert.add_argument('flac_file', help='flac file')
+    convert.add_argument('flac_file', help=FLAC_FILE_HELP)
     convert.add_argument('wav_file', help='wav file')
+    convert.add_argument('-j', '--jobs', type=int, default=1,
+                         help='number of decoding processes')
+    convert.add_argument('--start', type=float, default=None,
+                         help='start of the excerpt in seconds')
+    convert.add_argument('--end', type=float, default=None,
+                         help='end of the excerpt in seconds')
+    convert.add_argument('--format', choices=sorted(FORMATS), default=None,
+                         help='output sample format, by default the '
+                              'smallest integer container')
+    convert.add_argument('--profile', action='store_true',
+                         help='print decoding statistics (decodes in '
+                              'one process)')
+
+    split = commands.add_parser(
+        'split', help='split a disc image into wav tracks by its CUESHEET')
+    split.add_argument('flac_file', help=FLAC_FILE_HELP)
+    split.add_argument('dir', help='directory for track files')
 
     retrieve = commands.add_parser(
         'retr', help="rertieve flac's data to console")
-    retrieve.add_argument('flac_file', help='flac file')
+    retrieve.add_argument('flac_file', help=FLAC_FILE_HELP)
+    retrieve.add_argument('--raw', action='store_true',
+                          help='write raw PCM bytes instead of hex')
+    retrieve.add_argument('--start', type=float, default=None,
+                          help='start of the excerpt in seconds')
+    retrieve.add_argument('--end', type=float, default=None,
+                          help='end of the excerpt in seconds')
+    retrieve.add_argument('--channels', type=int, nargs='+', default=None,
+                          help='channels to output, starting from 0')
+    retrieve.add_argument('--profile', action='store_true',
+                          help='print decoding statistics to stderr')
+
+    scan = commands.add_parser(
+        'scan', help='scan directory and cache metadata of flac files')
+    scan.add_argument('dir', help='directory to scan')
+    scan.add_argument('--cache', default='library.sqlite',
+                      help='sqlite cache file')
+    scan.add_argument('-j', '--jobs', type=int, default=None,
+                      help='number of parsing processes')
+
+    verify = commands.add_parser(
+        'verify', help='check frame CRCs and MD5 of decoded audio')
+    verify.add_argument('files', nargs='+', help='flac files')
+    verify.add_argument('-j', '--jobs', type=int, default=None,
+                        help='number of checking processes')
+    verify.add_argument('--no-md5', action='store_true',
+                        help='check only frame CRCs')
+
+    tag = commands.add_parser(
+        'tag', help='edit tags and covers, in place when PADDING allows')
+    tag.add_argument('files', nargs='+', help='flac files')
+    tag.add_argument('--set', metavar='TAG=VALUE', type=tag_value,
+                     action='append', default=[],
+                     help='replace all values of a tag')
+    tag.add_argument('--add', metavar='TAG=VALUE', type=tag_value,
+                     action='append', default=[],
+                     help='add one more value to a tag')
+    tag.add_argument('--remove', metavar='TAG', action='append', default=[],
+                     help='remove a tag')
+    tag.add_argument('--cover', default=None,
+                     help='image file to replace front covers with')
+    tag.add_argument('--remove-covers', action='store_true',
+                     help='remove all pictures')
+    tag.add_argument('--padding', type=int, default=DEFAULT_PADDING,
+                     help='PADDING size when a file has to be rewritten')
+    tag.add_argument('-j', '--jobs', type=int, default=None,
+                     help='number of editing threads')
 
     return parser
@@ -0,0 +1,201 @@
+"""Вывод звука в callback режиме. pyaudio импортируется только при
+создании PyAudioBackend, так что остальной код (и тесты с FakeBackend)
+работает без него
+"""
+import sys
+from array import array
+from typing import Callable, Optional
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# значения из portaudio: их можно использовать, не импортируя pyaudio
+CONTINUE = 0
+COMPLETE = 1
+OUTPUT_UNDERFLOW = 0x4
+OUTPUT_OVERFLOW = 0x8
+
+
+class Gain:
+    """Громкость для callback'а вывода. Без numpy сэмплы 8 и 24 бит
+    расширяются в заранее выделенный array('i') (сэмпл в старших байтах
+    32-битного слова), умножаются на месте и возвращаются срезами с
+    шагом, так что в callback'е нет разбора сэмплов по байтам. 16 и 32
+    бита на little-endian умножаются прямо в буфере через memoryview
+    """
+    def __init__(self):
+        self._wide = bytearray()
+        self._samples = array('i')
+        self._sample_width = 0
+
+    def apply(self, buffer, sample_width: int, gain: float):
+        """Умножить сэмплы little-endian PCM в buffer на gain на месте,
+        с насыщением. 8-битные сэмплы беззнаковые, как в WAV
+        """
+        view = memoryview(buffer).cast('B')
+        if numpy is not None:
+            _apply_gain_numpy(view, sample_width, gain)
+            return
+
+        bits = sample_width * 8
+        high = (1 << (bits - 1)) - 1
+        low = -high - 1
+        if sys.byteorder == 'little' and sample_width in (2, 4):
+            _scale(view.cast('h' if sample_width == 2 else 'i'), 0,
+                   gain, low, high)
+            return
+
+        count = len(view) // sample_width
+        if len(self._wide) != count * 4 or \
+                self._sample_width != sample_width:
+            # младшие байты слов остаются нулями
+            self._wide = bytearray(count * 4)
+            self._samples = array('i', bytes(count * 4))
+            self._sample_width = sample_width
+        wide, samples = self._wide, self._samples
+        skip = 4 - sample_width
+        for b in range(sample_width):
+            wide[skip + b::4] = view[b::sample_width]
+        if sample_width == 1:
+            wide[3::4] = wide[3::4].translate(_FLIP_SIGN)
+        words = memoryview(samples).cast('B')
+        words[:] = wide
+        if sys.byteorder == 'big':
+            samples.byteswap()
+
+        _scale(samples, 32 - bits, gain, low, high)
+
+        if sys.byteorder == 'big':
+            samples.byteswap()
+        if sample_width == 1:
+            view[:] = words[3::4].tobytes().translate(_FLIP_SIGN)
+            return
+        for b in range(sample_width):
+            view[b::sample_width] = words[skip + b::4]
+
+
+def _scale(samples, shift: int, gain: float, low: int, high: int):
+    """samples[i] = clamp(int((samples[i] >> shift) * gain)) << shift
+    """
+    for i in range(len(samples)):
+        s = int((samples[i] >> shift) * gain)
+        if s > high:
+            s = high
+        elif s < low:
+            s = low
+        samples[i] = s << shift
+
+
+# беззнаковый 8-битный сэмпл <-> знаковый: инвертировать старший бит
+_FLIP_SIGN = bytes(b ^ 0x80 for b in range(256))
+
+
+def apply_gain(buffer, sample_width: int, gain: float):
+    """Gain().apply без переиспользования буферов между вызовами
+    """
+    Gain().apply(buffer, sample_width, gain)
+
+
+def _apply_gain_numpy(view: memoryview, sample_width: int, gain: float):
+    high = (1 << (sample_width * 8 - 1)) - 1
+    if sample_width == 3:
+        raw = numpy.frombuffer(view, dtype=numpy.uint8).reshape(-1, 3)
+        samples = (raw[:, 0].astype(numpy.int32) |
+                   (raw[:, 1].astype(numpy.int32) << 8) |
+                   (raw[:, 2].astype(numpy.int8).astype(numpy.int32) << 16))
+    else:
+        dtype = {1: numpy.uint8, 2: '<i2', 4: '<i4'}[sample_width]
+        raw = numpy.frombuffer(view, dtype=dtype)
+        samples = raw.astype(numpy.int64)
+        if sample_width == 1:
+            samples -= 128
+
+    scaled = numpy.clip(samples * gain, -high - 1, high).astype(numpy.int64)
+    if sample_width == 3:
+        raw[:, 0] = scaled & 0xFF
+        raw[:, 1] = (scaled >> 8) & 0xFF
+        raw[:, 2] = (scaled >> 16) & 0xFF
+    elif sample_width == 1:
+        raw[:] = scaled + 128
+    else:
+        raw[:] = scaled
+
+
+class PyAudioBackend:
+    """Звуковая карта через PyAudio
+    """
+    def __init__(self):
+        import pyaudio
+        self._formats = {8: pyaudio.paUInt8, 16: pyaudio.paInt16,
+                         24: pyaudio.paInt24, 32: pyaudio.paInt32}
+        self._audio = pyaudio.PyAudio()
+
+    def open(self, bits_per_sample: int, channels: int, rate: int,
+             frames_per_buffer: int, callback: Callable):
+        if bits_per_sample not in self._formats:
+            raise ValueError("This sample width isn't supported")
+        return self._audio.open(
+            format=self._formats[bits_per_sample], channels=channels,
+            rate=rate, output=True, frames_per_buffer=frames_per_buffer,
+            stream_callback=callback, start=False)
+
+    def terminate(self):
+        self._audio.terminate()
+
+
+class FakeStream:
+    """Поток без звуковой карты с API потока PyAudio. callback
+    вызывается вручную через pull, всё выведенное копится в output
+    """
+    def __init__(self, callback: Callable, frames_per_buffer: int,
+                 latency: float = 0.0):
+        self._callback = callback
+        self.frames_per_buffer = frames_per_buffer
+        self.latency = latency
+        self.output = bytearray()
+        self.active = False
+        self.closed = False
+
+    def pull(self, frame_count: Optional[int] = None, status: int = 0):
+        """Запросить у callback следующий кусок, как это делает PortAudio
+        """
+        data, flag = self._callback(
+            None, frame_count or self.frames_per_buffer, {}, status)
+        self.output += data
+        if flag == COMPLETE:
+            self.active = False
+        return data
+
+    def start_stream(self):
+        self.active = True
+
+    def stop_stream(self):
+        self.active = False
+
+    def close(self):
+        self.closed = True
+
+    def is_active(self) -> bool:
+        return self.active
+
+    def get_output_latency(self) -> float:
+        return self.latency
+
+
+class FakeBackend:
+    """Бэкенд для тестов и headless окружения
+    """
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.stream = None  # type: Optional[FakeStream]
+        self.terminated = False
+
+    def open(self, bits_per_sample: int, channels: int, rate: int,
+             frames_per_buffer: int, callback: Callable) -> FakeStream:
+        self.stream = FakeStream(callback, frames_per_buffer, self.latency)
+        return self.stream
+
+    def terminate(self):
+        self.terminated = True
@@ -0,0 +1,31 @@
+from binascii import hexlify
+from typing import BinaryIO, Iterable, Optional, Sequence
+
+from .meta import Frame
+
+OUTPUT_BUFFER_SIZE = 1 << 20
+
+
+def dump_frames(frames: Iterable[Frame], out: BinaryIO, raw: bool = False,
+                channels: Optional[Sequence[int]] = None,
+                buffer_size: int = OUTPUT_BUFFER_SIZE) -> int:
+    """Вывести PCM данные фреймов в out: hex строкой или, с raw, как
+    есть. Фреймы кодируются целиком и копятся в буфере, так что out.write
+    вызывается раз на buffer_size байт. channels - вывести только эти
+    каналы. Возвращает число записанных байт
+    """
+    buffer = bytearray()
+    written = 0
+    for frame in frames:
+        if channels is not None:
+            frame = frame.select_channels(channels)
+        buffer += frame.data if raw else hexlify(frame.data)
+        if len(buffer) >= buffer_size:
+            out.write(buffer)
+            written += len(buffer)
+            buffer = bytearray()
+    if buffer:
+        out.write(buffer)
+        written += len(buffer)
+    out.flush()
+    return written
@@ -0,0 +1,175 @@
+import json
+import os
+import sqlite3
+from binascii import hexlify
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .meta import Flac
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime INTEGER NOT NULL,
+    metadata TEXT,
+    error TEXT
+)
+'''
+
+
+def read_metadata(path: str) -> dict:
+    """Метаданные файла: STREAMINFO, теги и описания картинок
+    """
+    flac = Flac(path)
+    info = flac._streaminfo
+    tags = {}  # type: Dict[str, List[str]]
+    for comment in flac.vorbis_comments:
+        for tag, values in comment.tags.items():
+            tags.setdefault(tag, []).extend(values)
+    return {
+        'streaminfo': {
+            'min_block_size': info.min_block_size,
+            'max_block_size': info.max_block_size,
+            'min_frame_size': info.min_frame_size,
+            'max_frame_size': info.max_frame_size,
+            'sample_rate': info.sample_rate,
+            'channels': info.channels,
+            'bits_per_sample': info.bits_per_sample,
+            'total_samples': info.total_samples,
+            'md5': hexlify(info.md5).decode(),
+        },
+        'tags': tags,
+        'pictures': [{
+            'type': pic.type,
+            'mime_type': pic.mime_type,
+            'description': pic.description,
+            'width': pic.width,
+            'height': pic.height,
+            'color_depth': pic.color_depth,
+            'used_colors': pic.used_colors,
+            'size': pic.image_size,
+        } for pic in flac.pictures],
+    }
+
+
+def _scan_file(path: str) -> Tuple[Optional[str], Optional[str]]:
+    try:
+        return json.dumps(read_metadata(path)), None
+    except Exception as e:
+        return None, '{}: {}'.format(type(e).__name__, e)
+
+
+class ScanResult:
+    def __init__(self):
+        self.scanned = 0
+        self.unchanged = 0
+        self.failed = 0
+        self.removed = 0
+
+    def __str__(self):
+        return 'scanned: {}, unchanged: {}, failed: {}, removed: {}'.format(
+            self.scanned, self.unchanged, self.failed, self.removed)
+
+
+class Library:
+    """Кэш метаданных flac файлов в SQLite. Ключ - путь, размер и время
+    изменения файла, так что повторное сканирование пропускает
+    неизменённые файлы
+    """
+    def __init__(self, cache_path: str):
+        self._db = sqlite3.connect(cache_path)
+        self._db.execute(SCHEMA)
+
+    def close(self):
+        self._db.close()
+
+    def scan(self, root: str, workers: Optional[int] = None,
+             batch_size: int = 256) -> ScanResult:
+        """Просканировать каталог. workers - число процессов, при
+        workers=1 файлы разбираются в текущем процессе
+        """
+        result = ScanResult()
+        root = os.path.abspath(root)
+        rows = self._db.execute(
+            "SELECT path, size, mtime FROM files WHERE path LIKE ? "
+            "ESCAPE '\\'", (_like_prefix(root),))
+        known = {path: (size, mtime) for path, size, mtime in rows}
+
+        changed = []
+        for path, size, mtime in _walk(root):
+            if known.pop(path, None) == (size, mtime):
+                result.unchanged += 1
+            else:
+                changed.append((path, size, mtime))
+
+        if known:
+            self._db.executemany('DELETE FROM files WHERE path = ?',
+                                 [(path,) for path in known])
+            result.removed = len(known)
+
+        workers = workers or os.cpu_count() or 1
+        paths = [path for path, _, _ in changed]
+        if workers == 1:
+            parsed = map(_scan_file, paths)  # type: Iterator
+            executor = None
+        else:
+            executor = ProcessPoolExecutor(workers)
+            parsed = executor.map(_scan_file, paths, chunksize=16)
+
+        try:
+            rows = []
+            for (path, size, mtime), (metadata, error) in zip(changed,
+                                                              parsed):
+                rows.append((path, size, mtime, metadata, error))
+                result.scanned += 1
+                result.failed += error is not None
+                if len(rows) >= batch_size:
+                    self._save(rows)
+                    rows = []
+            self._save(rows)
+        finally:
+            if executor is not None:
+                executor.shutdown()
+        self._db.commit()
+        return result
+
+    def _save(self, rows: list):
+        self._db.executemany(
+            'INSERT OR REPLACE INTO files (path, size, mtime, metadata, '
+            'error) VALUES (?, ?, ?, ?, ?)', rows)
+        self._db.commit()
+
+    def get(self, path: str) -> Optional[dict]:
+        row = self._db.execute('SELECT metadata FROM files WHERE path = ?',
+                               (os.path.abspath(path),)).fetchone()
+        if row is None or row[0] is None:
+            return None
+        return json.loads(row[0])
+
+    def errors(self) -> List[Tuple[str, str]]:
+        return list(self._db.execute(
+            'SELECT path, error FROM files WHERE error IS NOT NULL '
+            'ORDER BY path'))
+
+    def __len__(self):
+        return self._db.execute('SELECT COUNT(*) FROM files').fetchone()[0]
+
+
+def _walk(root: str) -> Iterator[Tuple[str, int, int]]:
+    stack = [root]
+    while stack:
+        with os.scandir(stack.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.name.lower().endswith('.flac') and \
+                        entry.is_file():
+                    stat = entry.stat()
+                    yield entry.path, stat.st_size, stat.st_mtime_ns
+
+
+def _like_prefix(root: str) -> str:
+    escaped = root.replace('\\', '\\\\').replace('%', '\\%') \
+        .replace('_', '\\_')
+    return escaped.rstrip(os.sep) + os.sep + '%'
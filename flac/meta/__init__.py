@@ -1,4 +1,12 @@
 from .metadata import Flac
-from .bit_stream import BitStream
+from .async_flac import AsyncFlac
+from .bit_stream import BitStream, BufferedBitStream, MemoryBitStream
+from .frame import Frame
+from .frame_index import FrameIndex
+from .pcm import FORMATS, PcmFormat
+from .stats import DecodeStats
+from .writer import MetadataEditor
 
-__all__ = ['Flac', 'BitStream']
+__all__ = ['Flac', 'AsyncFlac', 'BitStream', 'BufferedBitStream',
+           'MemoryBitStream', 'Frame', 'FrameIndex', 'FORMATS', 'PcmFormat',
+           'DecodeStats', 'MetadataEditor']
@@ -0,0 +1,140 @@
+import asyncio
+import threading
+from concurrent.futures import CancelledError, Executor
+from typing import AsyncIterator, Optional
+
+from .frame import Frame
+from .metadata import Flac
+
+_DONE = object()
+
+
+class _StreamReaderAdapter:
+    """Блокирующий read() поверх asyncio.StreamReader. Вызывается только
+    из потока executor'а: чтение выполняется в цикле событий, а поток
+    ждёт результата
+    """
+    def __init__(self, reader: asyncio.StreamReader,
+                 loop: asyncio.AbstractEventLoop):
+        self._reader = reader
+        self._loop = loop
+        self._future = None
+        self._cancelled = False
+
+    def read(self, n: int = -1) -> bytes:
+        if self._cancelled:
+            raise EOFError()
+        self._future = asyncio.run_coroutine_threadsafe(
+            self._reader.read(n), self._loop)
+        try:
+            return self._future.result()
+        except CancelledError:
+            raise EOFError()
+
+    def seekable(self) -> bool:
+        return False
+
+    def cancel(self):
+        self._cancelled = True
+        if self._future is not None:
+            self._future.cancel()
+
+
+class AsyncFlac:
+    """Асинхронная обёртка над Flac. Разбор метаданных и декодирование
+    фреймов выполняются в executor'е (по умолчанию - пул потоков цикла
+    событий), так что цикл событий не блокируется. Между декодером и
+    потребителем стоит очередь на queue_size фреймов: если потребитель
+    не успевает, декодер ждёт
+
+        flac = await AsyncFlac.from_reader(reader)
+        async for frame in flac.frames():
+            ...
+    """
+    def __init__(self, flac: Flac, executor: Optional[Executor] = None,
+                 queue_size: int = 8,
+                 adapter: Optional[_StreamReaderAdapter] = None):
+        self.flac = flac
+        self._executor = executor
+        self._queue_size = queue_size
+        self._adapter = adapter
+
+    @classmethod
+    async def open(cls, filename: str, engine=None,
+                   executor: Optional[Executor] = None,
+                   queue_size: int = 8) -> 'AsyncFlac':
+        """Открыть файл. Все чтения файла идут в executor'е
+        """
+        loop = asyncio.get_running_loop()
+        flac = await loop.run_in_executor(
+            executor, lambda: Flac(filename, engine=engine))
+        return cls(flac, executor, queue_size)
+
+    @classmethod
+    async def from_reader(cls, reader: asyncio.StreamReader, engine=None,
+                          executor: Optional[Executor] = None,
+                          queue_size: int = 8) -> 'AsyncFlac':
+        """Читать flac из asyncio.StreamReader (сокет, pipe процесса,
+        тело HTTP ответа)
+        """
+        loop = asyncio.get_running_loop()
+        adapter = _StreamReaderAdapter(reader, loop)
+        flac = await loop.run_in_executor(
+            executor, lambda: Flac.from_stream(adapter, engine=engine))
+        return cls(flac, executor, queue_size, adapter)
+
+    @property
+    def sample_width(self):
+        return self.flac.sample_width
+
+    @property
+    def sample_rate(self):
+        return self.flac.sample_rate
+
+    @property
+    def channels(self):
+        return self.flac.channels
+
+    @property
+    def total_samples(self):
+        return self.flac.total_samples
+
+    async def frames(self) -> AsyncIterator[Frame]:
+        """Фреймы по порядку, как Flac.iter_frames. Если перестать
+        итерироваться раньше конца, декодер останавливается
+        """
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue(self._queue_size)  # type: asyncio.Queue
+        stop = threading.Event()
+        producer = loop.run_in_executor(
+            self._executor, self._produce, loop, queue, stop)
+        try:
+            while True:
+                frame = await queue.get()
+                if frame is _DONE:
+                    await producer  # пробрасывает ошибку декодирования
+                    return
+                yield frame
+        finally:
+            stop.set()
+            if self._adapter is not None and not producer.done():
+                self._adapter.cancel()
+            while not producer.done():
+                # освобождаем место в очереди для ждущего put
+                while not queue.empty():
+                    queue.get_nowait()
+                await asyncio.wait({producer}, timeout=0.05)
+
+    def _produce(self, loop: asyncio.AbstractEventLoop,
+                 queue: asyncio.Queue, stop: threading.Event):
+        def put(item):
+            asyncio.run_coroutine_threadsafe(queue.put(item), loop).result()
+
+        try:
+            for frame in self.flac.iter_frames():
+                if stop.is_set():
+                    return
+                put(frame)
+        finally:
+            if not stop.is_set():
+                put(_DONE)
@@ -1,4 +1,52 @@
-from typing import BinaryIO
+import os
+from array import array
+from typing import BinaryIO, List, Optional
+
+
+class LazyBytes:
+    """Байты файла, которые читаются только при первом обращении
+    """
+    def __init__(self, stream: Optional[BinaryIO] = None, offset: int = 0,
+                 size: int = 0, data: Optional[bytes] = None):
+        self._stream = stream
+        self.offset = offset
+        self.size = len(data) if data is not None else size
+        self._data = data
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._data is not None
+
+    def load(self) -> bytes:
+        if self._data is None:
+            stream = self._stream
+            name = getattr(stream, 'name', None)
+            if getattr(stream, 'closed', False) and isinstance(name, str):
+                # Flac уже закрыл файл: открыть его заново по имени
+                with open(name, 'rb') as f:
+                    self._data = _read_at(f, self.offset, self.size)
+            else:
+                self._data = _read_at(stream, self.offset, self.size)
+            self._stream = None
+        return self._data
+
+
+def _read_at(stream: BinaryIO, offset: int, size: int) -> bytes:
+    """Считать size байтов с offset, не меняя позицию в файле
+    """
+    try:
+        fileno = stream.fileno()
+    except (AttributeError, OSError, ValueError):
+        fileno = None
+    if fileno is not None and hasattr(os, 'pread'):
+        return os.pread(fileno, size, offset)
+
+    position = stream.tell()
+    try:
+        stream.seek(offset)
+        return stream.read(size)
+    finally:
+        stream.seek(position)
 
 
 class BitStream:
@@ -40,6 +88,11 @@ class BitStream:
             raise EOFError()
         return result
 
+    def read_lazy(self, n) -> LazyBytes:
+        """Считываем следующие n байтов (здесь сразу)
+        """
+        return LazyBytes(data=self.read_bytes(n))
+
     def read_sint(self, n):
         """Считать следующие n битов как signed int
         """
@@ -61,3 +114,324 @@ class BitStream:
     def _clear_buffer(self):
         self._bitbuffer = 0
         self._bitbufferlen = 0
+
+
+class BufferedBitStream:
+    """Битовый поток поверх большого буфера.
+
+    Файл читается блоками по `chunk_size` байт, а биты берутся из
+    аккумулятора, который пополняется словами по 8 байт. API совпадает
+    с `BitStream`.
+    """
+    CHUNK_SIZE = 1 << 16
+
+    def __init__(self, stream: BinaryIO, chunk_size: int = CHUNK_SIZE):
+        self._stream = stream
+        self._chunk_size = chunk_size
+        self._buffer = b''
+        self._pos = 0
+        self._bitbuffer = 0
+        self._bitbufferlen = 0
+        try:
+            self._offset = stream.tell()  # смещение начала буфера в файле
+        except (AttributeError, OSError):
+            self._offset = 0
+        seekable = getattr(stream, 'seekable', None)
+        self._seekable = bool(seekable and seekable())
+        self._captured = None  # type: Optional[List[bytes]]
+        self._capture_start = 0
+
+    def tell(self) -> int:
+        """Смещение в файле байта, содержащего следующий непрочитанный бит
+        """
+        return self._offset + self._pos - ((self._bitbufferlen + 7) >> 3)
+
+    def seekable(self) -> bool:
+        return self._seekable
+
+    def start_capture(self):
+        """Начать запоминать байты, начиная с текущего (для CRC фрейма)
+        """
+        self._capture_start = self.tell()
+        self._captured = []
+
+    def end_capture(self) -> bytes:
+        """Байты от start_capture до текущей позиции. Поток должен быть
+        выровнен по байтам
+        """
+        start = max(self._capture_start - self._offset, 0)
+        end = self.tell() - self._offset
+        chunks = self._captured or []
+        chunks.append(self._buffer[start:end])
+        self._captured = None
+        return b''.join(chunks)
+
+    def seek(self, offset: int):
+        """Перейти к байту offset. Если он уже в буфере, файл не читается
+        """
+        self._bitbufferlen = 0
+        if self._offset <= offset <= self._offset + len(self._buffer):
+            self._pos = offset - self._offset
+            return
+        self._stream.seek(offset)
+        self._offset, self._buffer, self._pos = offset, b'', 0
+
+    def find(self, sub: bytes) -> bool:
+        """Перейти к следующему вхождению sub, начиная с текущего байта.
+        Возвращает False, если до конца файла вхождений нет
+        """
+        self._clear_buffer()
+        self._rewind()
+        while True:
+            index = self._buffer.find(sub, self._pos)
+            if index >= 0:
+                self._pos = index
+                return True
+            keep = max(len(self._buffer) - len(sub) + 1, self._pos)
+            data = self._stream.read(self._chunk_size)
+            if len(data) == 0:
+                self._pos = len(self._buffer)
+                return False
+            self._offset += keep
+            self._buffer = self._buffer[keep:] + data
+            self._pos = 0
+
+    def _fill(self, n: int):
+        """Пополнить аккумулятор так, чтобы в нём было хотя бы n битов.
+        Старшие (уже прочитанные) биты аккумулятора отбрасываются здесь,
+        а не при каждом чтении
+        """
+        while self._bitbufferlen < n:
+            pos = self._pos
+            word = self._buffer[pos:pos + 8]
+            if len(word) == 0:
+                if self._captured is not None:
+                    start = max(self._capture_start - self._offset, 0)
+                    self._captured.append(self._buffer[start:])
+                self._offset += len(self._buffer)
+                self._buffer = self._stream.read(self._chunk_size)
+                self._pos = 0
+                if len(self._buffer) == 0:
+                    raise EOFError()
+                continue
+            self._pos = pos + len(word)
+            self._bitbuffer = (
+                (self._bitbuffer & ((1 << self._bitbufferlen) - 1))
+                << (len(word) << 3)) | int.from_bytes(word, 'big')
+            self._bitbufferlen += len(word) << 3
+
+    def read_uint(self, n) -> int:
+        """Считать слудующие n битов как unsigned int
+        """
+        if self._bitbufferlen < n:
+            self._fill(n)
+        self._bitbufferlen -= n
+        return (self._bitbuffer >> self._bitbufferlen) & ((1 << n) - 1)
+
+    def read_byte(self) -> int:
+        """Считываем следующий байт. При необходимости выравниваем по байтам
+        """
+        self._clear_buffer()
+        try:
+            return self.read_uint(8)
+        except EOFError:
+            return -1
+
+    def read_bytes(self, n) -> bytes:
+        """Считываем следующие n байтов. Буффер чистится
+        """
+        self._clear_buffer()
+        self._rewind()
+        pos = self._pos
+        result = self._buffer[pos:pos + n]
+        self._pos = pos + len(result)
+        if len(result) < n:
+            # pipe и сокет могут отдать меньше, чем просили
+            chunks = [result]
+            missing = n - len(result)
+            while missing > 0:
+                chunk = self._stream.read(missing)
+                if len(chunk) == 0:
+                    break
+                chunks.append(chunk)
+                missing -= len(chunk)
+            result = b''.join(chunks)
+            self._offset += pos + len(result)
+            self._buffer, self._pos = b'', 0
+        if len(result) == 0 and n > 0:
+            raise EOFError()
+        return result
+
+    def read_lazy(self, n) -> LazyBytes:
+        """Пропускаем следующие n байтов, запоминая их положение, чтобы
+        считать их при первом обращении. Из несмещаемого потока байты
+        считываются сразу
+        """
+        if not self._seekable:
+            return LazyBytes(data=self.read_bytes(n))
+        self._clear_buffer()
+        self._rewind()
+        offset = self.tell()
+        self.seek(offset + n)
+        return LazyBytes(self._stream, offset, n)
+
+    def read_sint(self, n):
+        """Считать следующие n битов как signed int
+        """
+        res = self.read_uint(n)
+        res -= res >> (n - 1) << n
+        return res
+
+    def read_rice_int(self, param):
+        """Считать rice encoded данные. Длина унарного префикса
+        определяется по старшему единичному биту аккумулятора
+        """
+        val = 0
+        while True:
+            if self._bitbufferlen == 0:
+                self._fill(1)
+            bits = self._bitbuffer & ((1 << self._bitbufferlen) - 1)
+            if bits:
+                length = bits.bit_length()
+                val += self._bitbufferlen - length
+                self._bitbufferlen = length - 1
+                break
+            val += self._bitbufferlen
+            self._bitbufferlen = 0
+        val = (val << param) | self.read_uint(param)
+        if (val & 1) == 0:
+            return val >> 1
+        return (val >> 1) * -1 - 1
+
+    def read_rice_partition(self, count: int, param: int) -> array:
+        """Считать count rice encoded чисел одним вызовом.
+
+        Аккумулятор и позиция в буфере держатся в локальных переменных,
+        унарный префикс считается через bit_length (count leading zeros)
+        """
+        result = array('i', bytes(count << 2))
+        mask = (1 << param) - 1
+        buffer, pos = self._buffer, self._pos
+        acc, acclen = self._bitbuffer, self._bitbufferlen
+        for i in range(count):
+            val = 0
+            bits = acc & ((1 << acclen) - 1)
+            while not bits:
+                val += acclen
+                word = buffer[pos:pos + 8]
+                if word:
+                    pos += len(word)
+                    acc = int.from_bytes(word, 'big')
+                    acclen = len(word) << 3
+                else:
+                    self._pos, self._bitbufferlen = pos, 0
+                    self._fill(1)
+                    buffer, pos = self._buffer, self._pos
+                    acc, acclen = self._bitbuffer, self._bitbufferlen
+                bits = acc & ((1 << acclen) - 1)
+            length = bits.bit_length()
+            val += acclen - length
+            acclen = length - 1
+
+            while acclen < param:
+                word = buffer[pos:pos + 8]
+                if word:
+                    pos += len(word)
+                    acc = ((acc & ((1 << acclen) - 1)) << (len(word) << 3)
+                           ) | int.from_bytes(word, 'big')
+                    acclen += len(word) << 3
+                else:
+                    self._pos, self._bitbuffer = pos, acc
+                    self._bitbufferlen = acclen
+                    self._fill(param)
+                    buffer, pos = self._buffer, self._pos
+                    acc, acclen = self._bitbuffer, self._bitbufferlen
+            acclen -= param
+            val = (val << param) | ((acc >> acclen) & mask)
+            result[i] = (val >> 1) ^ -(val & 1)
+
+        self._pos, self._bitbuffer, self._bitbufferlen = pos, acc, acclen
+        return result
+
+    def _clear_buffer(self):
+        """Выровнять поток по границе байта
+        """
+        self._bitbufferlen &= ~7
+
+    def _rewind(self):
+        """Вернуть целые байты из аккумулятора обратно в буфер
+        """
+        count = self._bitbufferlen >> 3
+        if count == 0:
+            return
+        if count <= self._pos:
+            self._pos -= count
+        else:
+            rest = self._bitbuffer & ((1 << self._bitbufferlen) - 1)
+            self._offset += self._pos - count
+            self._buffer = (rest.to_bytes(count, 'big') +
+                            self._buffer[self._pos:])
+            self._pos = 0
+        self._bitbufferlen = 0
+
+
+class MemoryBitStream(BufferedBitStream):
+    """Битовый поток поверх данных, целиком лежащих в памяти (например,
+    mmap файла). read_bytes и read_lazy отдают memoryview без копирования
+    """
+    def __init__(self, buffer):
+        self._stream = None
+        self._chunk_size = 0
+        self._buffer = buffer
+        self._view = memoryview(buffer)
+        self._pos = 0
+        self._bitbuffer = 0
+        self._bitbufferlen = 0
+        self._offset = 0
+        self._seekable = True
+        self._captured = None
+        self._capture_start = 0
+
+    def seek(self, offset: int):
+        self._bitbufferlen = 0
+        self._pos = min(offset, len(self._buffer))
+
+    def close(self):
+        """Отпустить memoryview на buffer, чтобы mmap можно было закрыть
+        """
+        self._view.release()
+
+    def find(self, sub: bytes) -> bool:
+        self._clear_buffer()
+        self._rewind()
+        index = self._buffer.find(sub, self._pos)
+        if index < 0:
+            self._pos = len(self._buffer)
+            return False
+        self._pos = index
+        return True
+
+    def _fill(self, n: int):
+        while self._bitbufferlen < n:
+            pos = self._pos
+            word = self._buffer[pos:pos + 8]
+            if len(word) == 0:
+                raise EOFError()
+            self._pos = pos + len(word)
+            self._bitbuffer = (
+                (self._bitbuffer & ((1 << self._bitbufferlen) - 1))
+                << (len(word) << 3)) | int.from_bytes(word, 'big')
+            self._bitbufferlen += len(word) << 3
+
+    def read_bytes(self, n) -> memoryview:
+        self._clear_buffer()
+        self._rewind()
+        pos = self._pos
+        result = self._view[pos:pos + n]
+        self._pos = pos + len(result)
+        if len(result) == 0 and n > 0:
+            raise EOFError()
+        return result
+
+    def read_lazy(self, n) -> LazyBytes:
+        return LazyBytes(data=self.read_bytes(n))
@@ -3,8 +3,12 @@ from .streaminfo import Streaminfo
 from .vorbis_comment import VorbisComment
 from .picture import Picture
 from .unknown import Unknown
+from .padding import Padding
 from .application import Application
+from .seektable import SeekTable, SeekPoint
+from .cuesheet import CueSheet, CueSheetTrack, CueSheetIndex
 
 
-__all__ = ['Streaminfo', 'VorbisComment',
-           'Picture', 'MetadataBlock', 'Unknown', 'Application']
+__all__ = ['Streaminfo', 'VorbisComment', 'Picture', 'MetadataBlock',
+           'Unknown', 'Padding', 'Application', 'SeekTable', 'SeekPoint',
+           'CueSheet', 'CueSheetTrack', 'CueSheetIndex']
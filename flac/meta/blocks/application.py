@@ -6,8 +6,14 @@ class Application(MetadataBlock):
     def __init__(self, size: int, is_last: bool, stream: BitStream):
         super().__init__(size, is_last)
 
-        self.id = stream.read_bytes(4).decode('utf-8')
-        self.data = stream.read_bytes(size - 4)
+        self.id = str(stream.read_bytes(4), 'utf-8')
+        self._data = stream.read_lazy(size - 4)
+
+    @property
+    def data(self) -> bytes:
+        """Данные приложения. Читаются из файла при первом обращении
+        """
+        return self._data.load()
 
     def __str__(self):
         return 'Application ID: {}'.format(self.id)
@@ -0,0 +1,82 @@
+from typing import List, Optional
+
+from ..bit_stream import BitStream
+from .metadata import MetadataBlock
+
+
+class CueSheetIndex:
+    def __init__(self, offset: int, number: int):
+        self.offset = offset  # в сэмплах от начала трека
+        self.number = number
+
+
+class CueSheetTrack:
+    def __init__(self, offset: int, number: int, isrc: str, is_audio: bool,
+                 pre_emphasis: bool, indexes: List[CueSheetIndex]):
+        self.offset = offset  # в сэмплах от начала файла
+        self.number = number
+        self.isrc = isrc
+        self.is_audio = is_audio
+        self.pre_emphasis = pre_emphasis
+        self.indexes = indexes
+
+    @property
+    def start(self) -> int:
+        """Сэмпл начала трека: INDEX 01, а если его нет - первый индекс.
+        Пауза INDEX 00 относится к предыдущему треку, как при
+        обычной нарезке образа
+        """
+        for index in self.indexes:
+            if index.number == 1:
+                return self.offset + index.offset
+        if self.indexes:
+            return self.offset + self.indexes[0].offset
+        return self.offset
+
+
+class CueSheet(MetadataBlock):
+    def __init__(self, size: int, is_last: bool, stream: BitStream):
+        super().__init__(size, is_last)
+
+        self.media_catalog_number = _ascii(stream.read_bytes(128))
+        self.lead_in = stream.read_uint(64)
+        self.is_cd = bool(stream.read_bytes(259)[0] & 0x80)
+
+        self.tracks = []  # type: List[CueSheetTrack]
+        for _ in range(stream.read_uint(8)):
+            offset = stream.read_uint(64)
+            number = stream.read_uint(8)
+            isrc = _ascii(stream.read_bytes(12))
+            flags = stream.read_bytes(14)[0]
+            indexes = []
+            for _ in range(stream.read_uint(8)):
+                index_offset = stream.read_uint(64)
+                indexes.append(
+                    CueSheetIndex(index_offset, stream.read_uint(8)))
+                stream.read_bytes(3)
+            self.tracks.append(CueSheetTrack(
+                offset, number, isrc, not flags & 0x80, bool(flags & 0x40),
+                indexes))
+
+    @property
+    def lead_out(self) -> Optional[CueSheetTrack]:
+        """Последний трек (170 для CD, 255 иначе) - конец аудиоданных
+        """
+        return self.tracks[-1] if self.tracks else None
+
+    def __str__(self):
+        s = 'Media catalog number: {}\n'.format(self.media_catalog_number)
+        s += 'Lead-in: {}\n'.format(self.lead_in)
+        s += 'CD: {}\n'.format(self.is_cd)
+        for track in self.tracks[:-1]:
+            s += 'Track {:02}: {}{}\n'.format(
+                track.number, track.start,
+                '' if track.is_audio else ' (data)')
+        if self.lead_out is not None:
+            s += 'Lead-out: {}'.format(self.lead_out.offset)
+        return s
+
+
+def _ascii(data: bytes) -> str:
+    # из MemoryBitStream приходит memoryview
+    return str(bytes(data).rstrip(b'\0'), 'ascii', 'replace')
@@ -2,3 +2,5 @@ class MetadataBlock:
     def __init__(self, size: int, is_last: bool):
         self.size = size
         self.is_last = is_last
+        self.offset = None  # смещение данных блока в файле, если известно
+        self.block_type = None  # код типа из заголовка блока
@@ -0,0 +1,15 @@
+from ..bit_stream import BitStream
+from .metadata import MetadataBlock
+
+
+class Padding(MetadataBlock):
+    """Пустое место после метаданных, в которое можно дописывать теги,
+    не переписывая аудиоданные
+    """
+    def __init__(self, size: int, is_last: bool, stream: BitStream):
+        super().__init__(size, is_last)
+
+        stream.read_lazy(size)
+
+    def __str__(self):
+        return 'Padding: {} bytes'.format(self.size)
@@ -36,13 +36,14 @@ class Picture(MetadataBlock):
         self.parse_picture(stream)
 
     def parse_picture(self, stream: BitStream):
-        self.type = picture_types[stream.read_uint(32)]
+        self.type_code = stream.read_uint(32)
+        self.type = picture_types.get(self.type_code, 'Unknown')
 
         mime_len = stream.read_uint(32)
-        self.mime_type = stream.read_bytes(mime_len).decode('utf-8')
+        self.mime_type = str(stream.read_bytes(mime_len), 'utf-8')
 
         desc_len = stream.read_uint(32)
-        self.description = stream.read_bytes(desc_len).decode('utf-8')
+        self.description = str(stream.read_bytes(desc_len), 'utf-8')
 
         self.width = stream.read_uint(32)
         self.height = stream.read_uint(32)
@@ -50,7 +51,17 @@ class Picture(MetadataBlock):
         self.used_colors = stream.read_uint(32)
 
         image_len = stream.read_uint(32)
-        self.image_data = stream.read_bytes(image_len)
+        self._image = stream.read_lazy(image_len)
+
+    @property
+    def image_size(self) -> int:
+        return self._image.size
+
+    @property
+    def image_data(self) -> bytes:
+        """Данные картинки. Читаются из файла при первом обращении
+        """
+        return self._image.load()
 
     def __str__(self):
         s = 'Type: {}\n'.format(self.type)
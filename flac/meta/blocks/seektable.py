@@ -0,0 +1,43 @@
+from bisect import bisect_right
+from typing import Optional
+
+from ..bit_stream import BitStream
+from .metadata import MetadataBlock
+
+PLACEHOLDER = 0xFFFFFFFFFFFFFFFF
+
+
+class SeekPoint:
+    def __init__(self, sample_number: int, offset: int, samples: int):
+        self.sample_number = sample_number
+        self.offset = offset
+        self.samples = samples
+
+
+class SeekTable(MetadataBlock):
+    def __init__(self, size: int, is_last: bool, stream: BitStream):
+        super().__init__(size, is_last)
+
+        self.points = []
+        for _ in range(size // 18):
+            sample_number = stream.read_uint(64)
+            offset = stream.read_uint(64)
+            samples = stream.read_uint(16)
+            if sample_number != PLACEHOLDER:
+                self.points.append(SeekPoint(sample_number, offset, samples))
+        if size % 18:
+            # хвост, которого не хватает на точку, тоже часть блока
+            stream.read_bytes(size % 18)
+        self.points.sort(key=lambda p: p.sample_number)
+        self._samples = [p.sample_number for p in self.points]
+
+    def find(self, sample: int) -> Optional[SeekPoint]:
+        """Ближайшая точка, не превосходящая sample
+        """
+        index = bisect_right(self._samples, sample)
+        if index == 0:
+            return None
+        return self.points[index - 1]
+
+    def __str__(self):
+        return 'Seek points: {}'.format(len(self.points))
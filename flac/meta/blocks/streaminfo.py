@@ -16,7 +16,7 @@ class Streaminfo(MetadataBlock):
         self.channels = stream.read_uint(3) + 1
         self.bits_per_sample = stream.read_uint(5) + 1
         self.total_samples = stream.read_uint(36)
-        self.md5 = stream.read_bytes(16)
+        self.md5 = bytes(stream.read_bytes(16))
 
     def __str__(self):
         s = 'min_block_size: {}\n'.format(self.min_block_size)
@@ -6,4 +6,4 @@ class Unknown(MetadataBlock):
     def __init__(self, size: int, is_last: bool, stream: BitStream):
         super().__init__(size, is_last)
 
-        stream.read_bytes(size)
+        stream.read_lazy(size)
@@ -12,15 +12,15 @@ class VorbisComment(MetadataBlock):
 
     def parse_comments(self, stream: BitStream):
         vendor_length = unpack("<I", stream.read_bytes(4))[0]
-        self.vendor_string = stream.read_bytes(vendor_length).decode('utf-8')
+        self.vendor_string = str(stream.read_bytes(vendor_length), 'utf-8')
 
         comments_length = unpack("<I", stream.read_bytes(4))[0]
         self.tags = {}  # type: ignore
 
         for _ in range(comments_length):
             comment_length = unpack("<I", stream.read_bytes(4))[0]
-            comment = stream.read_bytes(comment_length).decode('utf-8')
-            tag, value = comment.split('=')
+            comment = str(stream.read_bytes(comment_length), 'utf-8')
+            tag, value = comment.split('=', 1)
 
             if tag not in self.tags:
                 self.tags[tag] = []
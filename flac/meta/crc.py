@@ -0,0 +1,62 @@
+import sys
+from array import array
+from typing import List, Optional
+
+
+def _make_table(width: int, polynomial: int) -> List[int]:
+    top = 1 << (width - 1)
+    mask = (1 << width) - 1
+    table = []
+    for byte in range(256):
+        crc = byte << (width - 8)
+        for _ in range(8):
+            crc = ((crc << 1) ^ polynomial) if crc & top else crc << 1
+        table.append(crc & mask)
+    return table
+
+
+CRC8_TABLE = _make_table(8, 0x07)
+
+
+def crc8(data: bytes, crc: int = 0) -> int:
+    """CRC-8 заголовка фрейма (полином x^8 + x^2 + x + 1)
+    """
+    table = CRC8_TABLE
+    for byte in data:
+        crc = table[crc ^ byte]
+    return crc
+
+
+CRC16_TABLE = _make_table(16, 0x8005)
+_crc16_word_table = None  # type: Optional[List[int]]
+
+
+def _word_table() -> List[int]:
+    """Таблица CRC-16 сразу для двух байт (65536 значений). Строится при
+    первом вызове crc16 из байтовой таблицы
+    """
+    global _crc16_word_table
+    if _crc16_word_table is None:
+        table = CRC16_TABLE
+        _crc16_word_table = [
+            ((table[hi] << 8) & 0xFFFF) ^ table[(table[hi] >> 8) ^ lo]
+            for hi in range(256) for lo in range(256)]
+    return _crc16_word_table
+
+
+def crc16(data: bytes, crc: int = 0) -> int:
+    """CRC-16 фрейма (полином x^16 + x^15 + x^2 + 1). Данные
+    обрабатываются по два байта, так что на каждые 16 бит приходится
+    одно обращение к таблице
+    """
+    table = _word_table()
+    even = len(data) & ~1
+    words = array('H')
+    words.frombytes(data[:even])
+    if sys.byteorder == 'little':
+        words.byteswap()
+    for word in words:
+        crc = table[crc ^ word]
+    if even < len(data):
+        crc = ((crc << 8) & 0xFFFF) ^ CRC16_TABLE[(crc >> 8) ^ data[-1]]
+    return crc
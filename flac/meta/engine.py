@@ -0,0 +1,286 @@
+import sys
+from array import array
+from typing import List, Sequence
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from .pcm import PcmFormat, pack, pack_numpy
+from .predictors import (FIXED_KERNELS, lpc_kernel, restore_fixed,
+                         restore_fixed_numpy, restore_lpc)
+
+
+class PythonEngine:
+    """Поканальные операции над блоком сэмплов на чистом python
+    """
+    name = 'python'
+
+    def reserve(self, max_block_size: int, bits_per_sample: int):
+        """Подготовиться к блокам до max_block_size сэмплов
+        """
+
+    def start_frame(self, block_size: int, channels: int):
+        """Начинается новый фрейм: блоки прошлого фрейма больше не нужны
+        """
+
+    def constant(self, value: int, block_size: int) -> List[int]:
+        return [value] * block_size
+
+    def verbatim(self, samples: List[int]) -> List[int]:
+        return samples
+
+    def restore_fixed(self, warmup: List[int],
+                      residuals: Sequence[int]) -> List[int]:
+        """Восстановить FIXED субфрейм по warmup сэмплам и остаткам
+        """
+        return restore_fixed(warmup, residuals)
+
+    def restore_lpc(self, warmup: List[int], coefs: Sequence[int],
+                    shift: int, residuals: Sequence[int]) -> List[int]:
+        """Восстановить LPC субфрейм
+        """
+        return restore_lpc(warmup, coefs, shift, residuals)
+
+    def shift(self, samples: Sequence[int], bits: int) -> List[int]:
+        """Восстановить wasted bits
+        """
+        return [(s << bits) for s in samples]
+
+    def decorrelate(self, channel_assigment: int, first: Sequence[int],
+                    second: Sequence[int]) -> list:
+        """Восстановить левый и правый каналы из left/side, side/right
+        или mid/side
+        """
+        block_size = len(first)
+        if channel_assigment == 8:
+            left, diff = first, list(second)
+            for i in range(block_size):
+                diff[i] = left[i] - diff[i]
+            return [left, diff]
+
+        if channel_assigment == 9:
+            diff, right = list(first), second
+            for i in range(block_size):
+                diff[i] += right[i]
+            return [diff, right]
+
+        mid, side = first, second
+        left, right = [-1] * block_size, [-1] * block_size
+        for i in range(block_size):
+            left[i] = (((mid[i] << 1) | (side[i] & 1)) + side[i]) >> 1
+            right[i] = (((mid[i] << 1) | (side[i] & 1)) - side[i]) >> 1
+        return [left, right]
+
+    def pack(self, channels: Sequence[Sequence[int]], bits_per_sample: int,
+             fmt: PcmFormat) -> bytes:
+        """Перемежить каналы и упаковать в PCM формата fmt
+        """
+        return pack(channels, bits_per_sample, fmt)
+
+
+class NumpyEngine:
+    """Те же операции, но над массивами numpy целиком
+    """
+    name = 'numpy'
+
+    def reserve(self, max_block_size: int, bits_per_sample: int):
+        pass
+
+    def start_frame(self, block_size: int, channels: int):
+        pass
+
+    def constant(self, value: int, block_size: int) -> List[int]:
+        return [value] * block_size
+
+    def verbatim(self, samples: List[int]) -> List[int]:
+        return samples
+
+    def restore_fixed(self, warmup: List[int], residuals: Sequence[int]):
+        return restore_fixed_numpy(warmup, residuals)
+
+    def restore_lpc(self, warmup: List[int], coefs: Sequence[int],
+                    shift: int, residuals: Sequence[int]) -> List[int]:
+        # рекурсивный фильтр не векторизуется, остаётся ядро на python
+        return restore_lpc(warmup, coefs, shift, residuals)
+
+    def shift(self, samples, bits: int):
+        return numpy.asarray(samples, dtype=numpy.int64) << bits
+
+    def decorrelate(self, channel_assigment: int, first, second) -> list:
+        first = numpy.asarray(first, dtype=numpy.int64)
+        second = numpy.asarray(second, dtype=numpy.int64)
+
+        if channel_assigment == 8:
+            return [first, first - second]
+
+        if channel_assigment == 9:
+            return [first + second, second]
+
+        mid = (first << 1) | (second & 1)
+        return [(mid + second) >> 1, (mid - second) >> 1]
+
+    def pack(self, channels, bits_per_sample: int,
+             fmt: PcmFormat) -> bytes:
+        return pack_numpy(channels, bits_per_sample, fmt)
+
+
+class ArrayEngine(PythonEngine):
+    """Движок на чистом python без списков: каналы декодируются в
+    заранее выделенные array('i') (или array('q') для 32 бит на сэмпл),
+    которые переиспользуются от фрейма к фрейму. Блоки - memoryview на
+    эти буферы и действительны только до следующего фрейма.
+
+    Буферы принадлежат движку, поэтому один ArrayEngine нельзя делить
+    между одновременно декодируемыми Flac
+    """
+    name = 'array'
+
+    def __init__(self):
+        self._typecode = 'i'
+        self._size = 0
+        self._buffers = []  # type: List[array]
+        self._next = 0
+        self._interleaved = array('i')
+
+    def reserve(self, max_block_size: int, bits_per_sample: int):
+        # side канал шире на бит, так что 'i' хватает до 31 бита
+        typecode = 'i' if bits_per_sample < 32 else 'q'
+        if typecode != self._typecode:
+            self._typecode = typecode
+            self._buffers = []
+        self._grow(max_block_size)
+
+    def _grow(self, size: int):
+        if size > self._size:
+            self._size = size
+            self._buffers = []
+
+    def start_frame(self, block_size: int, channels: int):
+        self._grow(block_size)
+        while len(self._buffers) < channels:
+            self._buffers.append(array(self._typecode, [0]) * self._size)
+        self._next = 0
+
+    def _fill(self, values: Sequence[int]) -> memoryview:
+        """Скопировать values в начало следующего свободного буфера
+        фрейма
+        """
+        buffer = self._buffers[self._next]
+        self._next += 1
+        size = len(values)
+        if isinstance(values, array) and values.typecode == self._typecode:
+            memoryview(buffer)[:size] = memoryview(values)
+        else:
+            buffer[:size] = array(self._typecode, values)
+        return memoryview(buffer)[:size]
+
+    def constant(self, value: int, block_size: int) -> memoryview:
+        return self._fill(array(self._typecode, [value]) * block_size)
+
+    def verbatim(self, samples: List[int]) -> memoryview:
+        return self._fill(samples)
+
+    def restore_fixed(self, warmup: List[int],
+                      residuals: Sequence[int]) -> memoryview:
+        order = len(warmup)
+        if order >= len(FIXED_KERNELS):
+            raise ValueError('Invalid fixed predictor order: {}'.format(order))
+        if order == 0:
+            return self._fill(residuals)
+        samples = self._fill(warmup)
+        size = order + len(residuals)
+        FIXED_KERNELS[order](samples.obj, residuals)
+        return memoryview(samples.obj)[:size]
+
+    def restore_lpc(self, warmup: List[int], coefs: Sequence[int],
+                    shift: int, residuals: Sequence[int]) -> memoryview:
+        if shift < 0:
+            raise ValueError('Invalid LPC shift: {}'.format(shift))
+        kernel = lpc_kernel(len(coefs))
+        samples = self._fill(warmup)
+        size = len(warmup) + len(residuals)
+        kernel(samples.obj, residuals, coefs, shift)
+        return memoryview(samples.obj)[:size]
+
+    def shift(self, samples: memoryview, bits: int) -> memoryview:
+        for i in range(len(samples)):
+            samples[i] <<= bits
+        return samples
+
+    def decorrelate(self, channel_assigment: int, first: memoryview,
+                    second: memoryview) -> list:
+        """Каналы восстанавливаются на месте, в тех же буферах
+        """
+        block_size = len(first)
+        if channel_assigment == 8:
+            for i in range(block_size):
+                second[i] = first[i] - second[i]
+        elif channel_assigment == 9:
+            for i in range(block_size):
+                first[i] += second[i]
+        else:
+            for i in range(block_size):
+                side = second[i]
+                mid = (first[i] << 1) | (side & 1)
+                first[i] = (mid + side) >> 1
+                second[i] = (mid - side) >> 1
+        return [first, second]
+
+    def pack(self, channels: Sequence[memoryview], bits_per_sample: int,
+             fmt: PcmFormat) -> bytes:
+        """Целые форматы без сдвига собираются срезами с шагом из
+        буферов каналов и обрезкой байт контейнера, без разбора сэмплов
+        """
+        justified = fmt.justify and fmt.bits != bits_per_sample
+        if fmt.is_float or justified or self._typecode != 'i':
+            return pack(channels, bits_per_sample, fmt)
+
+        count = len(channels)
+        size = len(channels[0]) * count
+        if len(self._interleaved) != size:
+            self._interleaved = array('i', [0]) * size
+        interleaved = self._interleaved
+        for i, samples in enumerate(channels):
+            interleaved[i::count] = samples.obj[:len(samples)]
+        if sys.byteorder == 'big':
+            interleaved.byteswap()
+        data = bytearray(interleaved)
+        # из 4-байтных little-endian сэмплов остаются младшие байты
+        for width in range(3, fmt.sample_width - 1, -1):
+            del data[width::width + 1]
+        if fmt.unsigned:
+            data = data.translate(_TO_UNSIGNED)
+        return bytes(data)
+
+
+# +128 к младшему байту 8-битного сэмпла
+_TO_UNSIGNED = bytes((b + 128) & 0xFF for b in range(256))
+
+
+def default_engine():
+    """NumpyEngine, если установлен numpy, иначе ArrayEngine. Движок
+    создаётся для каждого Flac отдельно
+    """
+    if numpy is not None:
+        return NumpyEngine()
+    return ArrayEngine()
+
+
+class ProfilingEngine:
+    """Обёртка над движком, которая добавляет время операций к этапам
+    DecodeStats
+    """
+    def __init__(self, engine, stats):
+        self.engine = engine
+        self.name = engine.name
+        self.reserve = engine.reserve
+        self.start_frame = engine.start_frame
+        self.constant = engine.constant
+        self.verbatim = engine.verbatim
+        self.restore_fixed = stats.timed('prediction', engine.restore_fixed)
+        self.restore_lpc = stats.timed('prediction', engine.restore_lpc)
+        self.decorrelate = stats.timed('decorrelation', engine.decorrelate)
+        self.shift = stats.timed('wasted_bits', engine.shift)
+        self.pack = stats.timed('packing', engine.pack)
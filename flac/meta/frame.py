@@ -0,0 +1,185 @@
+from typing import Optional, Sequence, Tuple
+
+from .bit_stream import BufferedBitStream
+from .blocks import Streaminfo
+from .crc import crc8
+
+SYNC_CODE = 0b11111111111110
+
+SAMPLE_RATES = {
+    1: 88200, 2: 176400, 3: 192000, 4: 8000, 5: 16000, 6: 22050,
+    7: 24000, 8: 32000, 9: 44100, 10: 48000, 11: 96000,
+}
+SAMPLE_SIZES = {1: 8, 2: 12, 4: 16, 5: 20, 6: 24, 7: 32}
+
+
+class FrameHeader:
+    def __init__(self, blocking_strategy: int, block_size: int,
+                 sample_rate: int, channel_assigment: int,
+                 bits_per_sample: int, number: int, sample_offset: int,
+                 raw: bytes, crc8: int):
+        self.blocking_strategy = blocking_strategy
+        self.block_size = block_size
+        self.sample_rate = sample_rate
+        self.channel_assigment = channel_assigment
+        self.bits_per_sample = bits_per_sample
+        self.number = number
+        self.sample_offset = sample_offset
+        self.raw = raw
+        self.crc8 = crc8
+
+    @property
+    def channels(self) -> int:
+        if self.channel_assigment <= 7:
+            return self.channel_assigment + 1
+        return 2
+
+
+def read_frame_header(stream: BufferedBitStream,
+                      streaminfo: Streaminfo) -> FrameHeader:
+    """Считать заголовок фрейма. Поток должен быть выровнен по байтам
+    """
+    raw = bytearray()
+
+    def read_byte() -> int:
+        byte = stream.read_uint(8)
+        raw.append(byte)
+        return byte
+
+    sync = (read_byte() << 8) | read_byte()
+    if sync >> 2 != SYNC_CODE:
+        raise ValueError('Invalid sync code')
+    blocking_strategy = sync & 1
+
+    byte = read_byte()
+    block_size_code, sample_rate_code = byte >> 4, byte & 0xF
+    byte = read_byte()
+    channel_assigment, sample_size_code = byte >> 4, (byte >> 1) & 0b111
+    if channel_assigment > 10:
+        raise ValueError(
+            'Invalid chanel assigment: {}'.format(channel_assigment))
+
+    # frame/sample number in "UTF-8" coding
+    number = read_byte()
+    length = 0
+    while number & (0x80 >> length):
+        length += 1
+    if length == 1 or length > 7:
+        raise ValueError('Invalid frame number')
+    number &= 0x7F >> length
+    for _ in range(length - 1):
+        byte = read_byte()
+        if byte >> 6 != 0b10:
+            raise ValueError('Invalid frame number')
+        number = (number << 6) | (byte & 0x3F)
+
+    if block_size_code == 1:
+        block_size = 192
+    elif 2 <= block_size_code <= 5:
+        block_size = 576 << (block_size_code - 2)
+    elif block_size_code == 6:
+        block_size = read_byte() + 1
+    elif block_size_code == 7:
+        block_size = ((read_byte() << 8) | read_byte()) + 1
+    elif 8 <= block_size_code <= 15:
+        block_size = 256 << (block_size_code - 8)
+    else:
+        raise ValueError('Invalid block size code')
+
+    if sample_rate_code == 0:
+        sample_rate = streaminfo.sample_rate
+    elif sample_rate_code == 12:
+        sample_rate = read_byte() * 1000
+    elif sample_rate_code == 13:
+        sample_rate = (read_byte() << 8) | read_byte()
+    elif sample_rate_code == 14:
+        sample_rate = ((read_byte() << 8) | read_byte()) * 10
+    elif sample_rate_code in SAMPLE_RATES:
+        sample_rate = SAMPLE_RATES[sample_rate_code]
+    else:
+        raise ValueError('Invalid sample rate code')
+
+    if sample_size_code == 0:
+        bits_per_sample = streaminfo.bits_per_sample
+    elif sample_size_code in SAMPLE_SIZES:
+        bits_per_sample = SAMPLE_SIZES[sample_size_code]
+    else:
+        raise ValueError('Invalid sample size code')
+
+    if blocking_strategy == 0:
+        sample_offset = number * streaminfo.max_block_size
+    else:
+        sample_offset = number
+
+    crc8 = stream.read_uint(8)
+    return FrameHeader(blocking_strategy, block_size, sample_rate,
+                       channel_assigment, bits_per_sample, number,
+                       sample_offset, bytes(raw), crc8)
+
+
+def sync_frame_header(stream: BufferedBitStream, streaminfo: Streaminfo,
+                      sample_offset: int) -> Tuple[int, FrameHeader]:
+    """Найти следующий корректный заголовок фрейма, начинающегося
+    с сэмпла sample_offset. Проверяются sync code, CRC-8 и номер
+    фрейма/сэмпла. Поток остаётся после заголовка
+    """
+    while True:
+        if not stream.find(b'\xff'):
+            raise EOFError()
+        offset = stream.tell()
+        try:
+            header = read_frame_header(stream, streaminfo)
+        except ValueError:
+            header = None
+        if header is not None and crc8(header.raw) == header.crc8 \
+                and header.sample_offset == sample_offset:
+            return offset, header
+        stream.seek(offset + 1)
+
+
+class Frame:
+    """Декодированный фрейм: перемежённые little-endian PCM данные
+    всех каналов
+    """
+    def __init__(self, data: bytes, sample_offset: int, block_size: int,
+                 byte_offset: int, channels: int, sample_width: int,
+                 crc_ok: Optional[bool] = None):
+        self.data = data
+        self.sample_offset = sample_offset
+        self.block_size = block_size
+        self.byte_offset = byte_offset
+        self.channels = channels
+        self.sample_width = sample_width
+        self.crc_ok = crc_ok  # None, если CRC не проверялся
+
+    def slice(self, start: int, end: int) -> 'Frame':
+        """Фрейм только с сэмплами [start, end) этого фрейма
+        """
+        start = max(start, 0)
+        end = min(end, self.block_size)
+        width = self.channels * self.sample_width
+        return Frame(self.data[start * width:end * width],
+                     self.sample_offset + start, max(end - start, 0),
+                     self.byte_offset, self.channels, self.sample_width,
+                     self.crc_ok)
+
+    def select_channels(self, channels: Sequence[int]) -> 'Frame':
+        """Фрейм только с каналами channels (номера с нуля, в заданном
+        порядке). Байты копируются срезами с шагом, без разбора сэмплов
+        """
+        for c in channels:
+            if not 0 <= c < self.channels:
+                raise ValueError('Channel {} is out of range'.format(c))
+        width = self.sample_width
+        step, out_step = self.channels * width, len(channels) * width
+        data = bytearray(self.block_size * out_step)
+        for i, c in enumerate(channels):
+            for b in range(width):
+                data[i * width + b::out_step] = \
+                    self.data[c * width + b::step]
+        return Frame(bytes(data), self.sample_offset, self.block_size,
+                     self.byte_offset, len(channels), width, self.crc_ok)
+
+    def __repr__(self):
+        return '<Frame sample_offset={} block_size={} byte_offset={}>'.format(
+            self.sample_offset, self.block_size, self.byte_offset)
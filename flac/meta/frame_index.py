@@ -0,0 +1,138 @@
+import hashlib
+import json
+import os
+import struct
+import sys
+from array import array
+from bisect import bisect_right
+from binascii import hexlify
+from typing import Optional, Tuple
+
+from .bit_stream import BufferedBitStream
+from .blocks import Streaminfo
+from .frame import sync_frame_header
+
+INDEX_MAGIC = b'FLACIDX1'
+
+
+class FrameIndex:
+    """Индекс фреймов: смещение в сэмплах, смещение в байтах от начала
+    файла и размер блока для каждого фрейма
+    """
+    def __init__(self):
+        self.sample_offsets = array('Q')
+        self.byte_offsets = array('Q')
+        self.block_sizes = array('I')
+
+    def append(self, sample_offset: int, byte_offset: int, block_size: int):
+        self.sample_offsets.append(sample_offset)
+        self.byte_offsets.append(byte_offset)
+        self.block_sizes.append(block_size)
+
+    def __len__(self):
+        return len(self.sample_offsets)
+
+    def __getitem__(self, i: int) -> Tuple[int, int, int]:
+        return (self.sample_offsets[i], self.byte_offsets[i],
+                self.block_sizes[i])
+
+    def find(self, sample: int) -> int:
+        """Номер фрейма, содержащего сэмпл sample, или -1
+        """
+        i = bisect_right(self.sample_offsets, sample) - 1
+        if i < 0 or sample >= self.sample_offsets[i] + self.block_sizes[i]:
+            return -1
+        return i
+
+    @property
+    def total_samples(self) -> int:
+        if len(self) == 0:
+            return 0
+        return self.sample_offsets[-1] + self.block_sizes[-1]
+
+    @classmethod
+    def scan(cls, stream: BufferedBitStream, audio_offset: int,
+             streaminfo: Streaminfo) -> 'FrameIndex':
+        """Пройти по заголовкам фреймов, не декодируя субфреймы
+        """
+        index = cls._scan(stream, audio_offset, streaminfo,
+                          streaminfo.min_frame_size)
+        if streaminfo.min_frame_size > 0 and \
+                index.total_samples != streaminfo.total_samples > 0:
+            # min_frame_size в STREAMINFO оказался неверным
+            index = cls._scan(stream, audio_offset, streaminfo, 0)
+        return index
+
+    @classmethod
+    def _scan(cls, stream: BufferedBitStream, audio_offset: int,
+              streaminfo: Streaminfo, min_frame_size: int) -> 'FrameIndex':
+        index = cls()
+        stream.seek(audio_offset)
+        sample_offset = 0
+        try:
+            while True:
+                offset, header = sync_frame_header(stream, streaminfo,
+                                                   sample_offset)
+                index.append(sample_offset, offset, header.block_size)
+                sample_offset += header.block_size
+                # следующий фрейм не может начаться раньше min_frame_size
+                stream.seek(offset + max(min_frame_size,
+                                         len(header.raw) + 1))
+        except EOFError:
+            pass
+        return index
+
+    def save(self, filename: str, key: dict):
+        arrays = [self.sample_offsets, self.byte_offsets, self.block_sizes]
+        if sys.byteorder == 'big':
+            arrays = [array(a.typecode, a) for a in arrays]
+            for a in arrays:
+                a.byteswap()
+        key_data = json.dumps(key, sort_keys=True).encode('utf-8')
+
+        tmp_filename = '{}.{}.tmp'.format(filename, os.getpid())
+        with open(tmp_filename, 'wb') as f:
+            f.write(INDEX_MAGIC)
+            f.write(struct.pack('<II', len(key_data), len(self)))
+            f.write(key_data)
+            for a in arrays:
+                a.tofile(f)
+        os.replace(tmp_filename, filename)
+
+    @classmethod
+    def load(cls, filename: str, key: dict) -> Optional['FrameIndex']:
+        """Загрузить индекс, если он есть и построен для того же файла
+        """
+        try:
+            with open(filename, 'rb') as f:
+                if f.read(len(INDEX_MAGIC)) != INDEX_MAGIC:
+                    return None
+                key_len, count = struct.unpack('<II', f.read(8))
+                if json.loads(f.read(key_len).decode('utf-8')) != key:
+                    return None
+                index = cls()
+                for a in [index.sample_offsets, index.byte_offsets,
+                          index.block_sizes]:
+                    a.fromfile(f, count)
+                    if sys.byteorder == 'big':
+                        a.byteswap()
+                return index
+        except (OSError, EOFError, ValueError, struct.error):
+            return None
+
+
+def index_key(filename: str, streaminfo: Streaminfo) -> dict:
+    """Ключ кэша: путь, размер, время изменения и MD5 из STREAMINFO
+    """
+    stat = os.stat(filename)
+    return {
+        'path': os.path.abspath(filename),
+        'size': stat.st_size,
+        'mtime': stat.st_mtime_ns,
+        'md5': hexlify(streaminfo.md5).decode(),
+    }
+
+
+def index_cache_filename(cache_dir: str, filename: str) -> str:
+    name = hashlib.sha1(os.path.abspath(filename).encode('utf-8')).hexdigest()
+    return os.path.join(cache_dir, name + '.idx')
@@ -1,45 +1,109 @@
-import struct
+from array import array
+import io
+import mmap
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
 from os.path import getsize
-from typing import Generator, List, Tuple
+from time import perf_counter
+from typing import (BinaryIO, Generator, Iterable, List, Optional,
+                    Tuple)
 
-from .bit_stream import BitStream
+from .bit_stream import BufferedBitStream, MemoryBitStream
 from .blocks import *
+from .crc import crc8, crc16
+from .engine import ProfilingEngine, default_engine
+from .frame import (Frame, FrameHeader, read_frame_header,
+                    sync_frame_header)
+from .frame_index import FrameIndex, index_cache_filename, index_key
+from .pcm import PcmFormat, container_format
+from .stats import DecodeStats
 
 
 FLAC_MARKER = b'fLaC'
 block_types = {
     0: Streaminfo,
+    1: Padding,
     2: Application,
-    # 3: "SEEKTABLE",
+    3: SeekTable,
     4: VorbisComment,
-    # 5: "CUESHEET",
+    5: CueSheet,
     6: Picture,
 }
 
-FIXED_SUBFRAME_COEFFS = [
-    [],
-    [1],
-    [2, -1],
-    [3, -3, 1],
-    [4, -6, 4, 1],
-]  # type: List[List[int]]
-
 
 class Flac:
-    def __init__(self, filename: str):
+    _stats = None  # type: Optional[DecodeStats]
+
+    def __init__(self, filename: str, engine=None,
+                 index_cache: Optional[str] = None, use_mmap: bool = False):
+        """index_cache - каталог для кэша индекса фреймов. По умолчанию
+        берётся из переменной окружения FLAC_INDEX_CACHE.
+        use_mmap - читать файл через mmap, а не блоками через read()
+        """
+        self._init(engine, filename, index_cache, use_mmap)
         self._f = open(filename, 'rb')
-        self.size = getsize(filename)
-        self._stream = BitStream(self._f)
-
+        self.size = getsize(filename)  # type: Optional[int]
+        if use_mmap:
+            self._mmap = mmap.mmap(self._f.fileno(), 0,
+                                   access=mmap.ACCESS_READ)
+            self._stream = MemoryBitStream(self._mmap)
+        else:
+            self._stream = BufferedBitStream(self._f)
+        self._read_metadata()
+
+    @classmethod
+    def from_stream(cls, stream: BinaryIO, engine=None) -> 'Flac':
+        """Flac поверх открытого потока, в том числе несмещаемого: pipe,
+        сокет, stdin. Поток читается блоками, так что память не зависит
+        от его длины. Индекс фреймов и seek доступны только для
+        смещаемых потоков, decode_parallel - только для файлов.
+        Поток не закрывается вместе с Flac
+        """
+        flac = cls.__new__(cls)
+        flac._init(engine, None, None, False)
+        flac._f = None
+        flac.size = None
+        flac._stream = BufferedBitStream(stream)
+        flac._read_metadata()
+        return flac
+
+    def _init(self, engine, filename: Optional[str],
+              index_cache: Optional[str], use_mmap: bool):
+        self._base_engine = engine or default_engine()
+        self._engine = self._base_engine
+        self._filename = filename
+        self._index_cache = index_cache or os.environ.get('FLAC_INDEX_CACHE')
+        self._frame_index = None  # type: Optional[FrameIndex]
+        self._use_mmap = use_mmap
+        self._mmap = None
+
+    def _read_metadata(self):
         if self._stream.read_bytes(4) != FLAC_MARKER:
             raise ValueError('Bad flac file')
 
         blocks = self._parse_metadata_blocks()
         self._streaminfo = blocks[0]
         self._blocks = blocks[1:]
+        self._audio_offset = self._stream.tell()
+        self._skip_samples = 0
+        self._base_engine.reserve(self._streaminfo.max_block_size,
+                                  self._streaminfo.bits_per_sample)
+        # формат Frame.data, например pcm.FORMATS['float32']
+        self.pcm_format = container_format(
+            self.sample_width)  # type: PcmFormat
 
     def __del__(self):
-        self._f.close()
+        if getattr(self, '_mmap', None) is not None:
+            self._stream.close()
+            try:
+                self._mmap.close()
+            except BufferError:
+                # на mmap ещё ссылаются memoryview картинок и т.п.
+                pass
+        if getattr(self, '_f', None) is not None:
+            self._f.close()
 
     def _parse_metadata_blocks(self) -> List[MetadataBlock]:
         blocks = []
@@ -55,10 +119,33 @@ class Flac:
         is_last = self._stream.read_uint(1)
         type = self._stream.read_uint(7)
         size = self._stream.read_uint(24)
+        offset = self._stream.tell()
 
         if type in block_types:
-            return block_types[type](size, is_last == 1, self._stream)
-        return Unknown(size, is_last == 1, self._stream)
+            block = block_types[type](size, is_last == 1, self._stream)
+        else:
+            block = Unknown(size, is_last == 1, self._stream)
+        block.offset = offset
+        block.block_type = type
+        return block
+
+    @property
+    def stats(self) -> Optional[DecodeStats]:
+        """Статистика декодирования. По умолчанию None и не собирается;
+        чтобы собирать, присвойте DecodeStats()
+        """
+        return self._stats
+
+    @stats.setter
+    def stats(self, stats: Optional[DecodeStats]):
+        self._stats = stats
+        self._engine = self._base_engine
+        self.__dict__.pop('_decode_residuals', None)
+        if stats is not None:
+            # без статистики декодер работает без обёрток
+            self._engine = ProfilingEngine(self._base_engine, stats)
+            self._decode_residuals = stats.timed(
+                'residuals', self._decode_residuals)
 
     @property
     def sample_width(self):
@@ -76,6 +163,54 @@ class Flac:
     def total_samples(self):
         return self._streaminfo.total_samples
 
+    @property
+    def duration(self) -> float:
+        """Длительность в секундах
+        """
+        total_samples = self.total_samples or self.frame_index.total_samples
+        return total_samples / self.sample_rate
+
+    @property
+    def frame_index(self) -> FrameIndex:
+        """Индекс фреймов. Строится проходом по заголовкам при первом
+        обращении, или загружается из кэша, если он задан
+        """
+        if self._frame_index is not None:
+            return self._frame_index
+
+        if self._filename is None:
+            if not self._stream.seekable():
+                raise io.UnsupportedOperation(
+                    'Frame index needs a seekable stream')
+            position = self._stream.tell()
+            self._frame_index = FrameIndex.scan(
+                self._stream, self._audio_offset, self._streaminfo)
+            self._stream.seek(position)
+            return self._frame_index
+
+        cache_filename, key = None, None
+        if self._index_cache is not None:
+            cache_filename = index_cache_filename(self._index_cache,
+                                                  self._filename)
+            key = index_key(self._filename, self._streaminfo)
+            self._frame_index = FrameIndex.load(cache_filename, key)
+            if self._frame_index is not None:
+                return self._frame_index
+
+        if self._mmap is not None:
+            self._frame_index = FrameIndex.scan(
+                MemoryBitStream(self._mmap), self._audio_offset,
+                self._streaminfo)
+        else:
+            with open(self._filename, 'rb') as f:
+                self._frame_index = FrameIndex.scan(
+                    BufferedBitStream(f), self._audio_offset,
+                    self._streaminfo)
+        if cache_filename is not None:
+            os.makedirs(self._index_cache, exist_ok=True)
+            self._frame_index.save(cache_filename, key)
+        return self._frame_index
+
     @property
     def metadata_blocks(self):
         blocks = [self._streaminfo]
@@ -95,97 +230,241 @@ class Flac:
     def applications(self):
         return list(filter(lambda b: isinstance(b, Application), self._blocks))
 
+    @property
+    def seektable(self) -> Optional[SeekTable]:
+        for block in self._blocks:
+            if isinstance(block, SeekTable):
+                return block
+        return None
+
+    @property
+    def cuesheet(self) -> Optional[CueSheet]:
+        for block in self._blocks:
+            if isinstance(block, CueSheet):
+                return block
+        return None
+
+    def seek(self, sample: int):
+        """Перейти к сэмплу sample. Следующий фрейм из iter_frames
+        начнётся ровно с него.
+
+        Если есть SEEKTABLE, ближайшая точка даёт смещение фрейма, а
+        фреймы до нужного пропускаются по заголовкам без декодирования.
+        Иначе нужный фрейм берётся из индекса фреймов
+        """
+        if not self._stream.seekable():
+            raise io.UnsupportedOperation('Stream is not seekable')
+        if sample < 0 or 0 < self.total_samples <= sample:
+            raise ValueError('Sample {} is out of range'.format(sample))
+        self._skip_samples = 0
+
+        seektable = self.seektable
+        if seektable is None or self._frame_index is not None:
+            i = self.frame_index.find(sample)
+            if i < 0:
+                raise ValueError('Sample {} is out of range'.format(sample))
+            sample_offset, byte_offset, _ = self.frame_index[i]
+            self._stream.seek(byte_offset)
+            self._skip_samples = sample - sample_offset
+            return
+
+        sample_offset, byte_offset = 0, 0
+        point = seektable.find(sample)
+        if point is not None:
+            sample_offset, byte_offset = point.sample_number, point.offset
+
+        self._stream.seek(self._audio_offset + byte_offset)
+        try:
+            offset, header = sync_frame_header(
+                self._stream, self._streaminfo, sample_offset)
+            while header.sample_offset + header.block_size <= sample:
+                offset, header = sync_frame_header(
+                    self._stream, self._streaminfo,
+                    header.sample_offset + header.block_size)
+        except EOFError:
+            return
+
+        self._stream.seek(offset)
+        self._skip_samples = sample - header.sample_offset
+
+    def iter_frames(self, check_crc: bool = False
+                    ) -> Generator[Frame, None, None]:
+        """Декодировать аудиоданные по фреймам. Каждый фрейм содержит
+        перемежённые PCM данные всех каналов. С check_crc у фреймов
+        заполняется crc_ok по CRC-8 заголовка и CRC-16 всего фрейма
+        """
+        bits, fmt = self.sample_width, self.pcm_format
+        while True:
+            byte_offset = self._stream.tell()
+            stats = self._stats
+            if stats is not None:
+                start = perf_counter()
+            try:
+                header, blocks, crc_ok = self._decode_frame(check_crc)
+            except EOFError:
+                return
+            frame = Frame(self._engine.pack(blocks, bits, fmt),
+                          header.sample_offset, header.block_size,
+                          byte_offset, len(blocks), fmt.sample_width, crc_ok)
+            if stats is not None:
+                stats.add_frame(header.block_size * len(blocks),
+                                self._stream.tell() - byte_offset,
+                                perf_counter() - start)
+            if self._skip_samples:
+                frame = frame.slice(self._skip_samples, frame.block_size)
+                self._skip_samples = 0
+            yield frame
+
+    def read_range(self, start: int, end: Optional[int] = None,
+                   check_crc: bool = False) -> Generator[Frame, None, None]:
+        """Фреймы с сэмплами [start, end). Через seek декодируются только
+        фреймы, пересекающиеся с диапазоном, первый и последний
+        обрезаются по его границам. В несмещаемом потоке фреймы до
+        start декодируются и отбрасываются
+        """
+        start, end = self._check_range(start, end)
+        if start == end:
+            return
+        if start > 0 and self._stream.seekable():
+            self.seek(start)
+        elif start == 0 and self._stream.seekable():
+            self._stream.seek(self._audio_offset)
+            self._skip_samples = 0
+        yield from _clip_frames(self.iter_frames(check_crc), start, end)
+
+    def decode_parallel(self, workers: Optional[int] = None,
+                        frames_per_task: int = 32, start: int = 0,
+                        end: Optional[int] = None
+                        ) -> Generator[Frame, None, None]:
+        """Декодировать файл (или сэмплы [start, end)) в пуле процессов.
+        Индекс фреймов делится на непрерывные диапазоны по
+        frames_per_task фреймов, каждый процесс открывает файл сам.
+        Фреймы отдаются по порядку, одновременно в работе не больше
+        2 * workers диапазонов
+        """
+        if self._filename is None:
+            raise io.UnsupportedOperation(
+                'Parallel decoding needs a file, not a stream')
+        start, end = self._check_range(start, end)
+        if start == end:
+            return
+        workers = workers or os.cpu_count() or 1
+        index = self.frame_index
+        first, last = 0, len(index)
+        if start > 0:
+            first = index.find(start)
+            if first < 0:
+                raise ValueError('Sample {} is out of range'.format(start))
+        if end is not None and index.find(end - 1) >= 0:
+            last = index.find(end - 1) + 1
+        ranges = [(index.byte_offsets[i], min(frames_per_task, last - i))
+                  for i in range(first, last, frames_per_task)]
+
+        with ProcessPoolExecutor(workers) as executor:
+            pending = deque()  # type: ignore
+            try:
+                for byte_offset, count in ranges:
+                    pending.append(executor.submit(
+                        _decode_frames, self._filename, self._base_engine,
+                        self._use_mmap, self.pcm_format, byte_offset,
+                        count))
+                    if len(pending) >= 2 * workers:
+                        yield from _clip_frames(
+                            pending.popleft().result(), start, end)
+                while pending:
+                    yield from _clip_frames(
+                        pending.popleft().result(), start, end)
+            finally:
+                for future in pending:
+                    future.cancel()
+
+    def _check_range(self, start: int, end: Optional[int]
+                     ) -> Tuple[int, Optional[int]]:
+        """Проверить диапазон сэмплов и ограничить end длиной файла.
+        end=None - до конца файла
+        """
+        if start < 0 or (end is not None and end < start):
+            raise ValueError('Invalid sample range: [{}, {})'.format(
+                start, end))
+        if end is None or 0 < self.total_samples < end:
+            end = self.total_samples or None
+        if end is not None and start > end:
+            raise ValueError('Sample {} is out of range'.format(start))
+        return start, end
+
     @property
     def data(self) -> Generator[bytes, None, None]:
-        added_val = 128 if self.sample_width == 8 else 0
-        sample_width = self.sample_width // 8
+        sample_width = self.pcm_format.sample_width
 
-        for blocks in self._audio_data:
-            block_size = len(blocks[0])
-            for i in range(block_size):
-                for j in range(self.channels):
-                    yield struct.pack(
-                        '<i', blocks[j][i] + added_val)[:sample_width]
+        for frame in self.iter_frames():
+            data = frame.data
+            for i in range(0, len(data), sample_width):
+                yield data[i:i + sample_width]
+
+    def iter_blocks(self) -> Generator[Tuple[FrameHeader, list], None, None]:
+        """Декодированные каналы фреймов без упаковки в PCM. С ArrayEngine
+        это memoryview на буферы движка, их перезаписывает следующий фрейм
+        """
+        while True:
+            try:
+                header, blocks, _ = self._decode_frame()
+            except EOFError:
+                return
+            yield header, blocks
 
     @property
     def _audio_data(self) -> Generator[List[List[int]], None, None]:
         try:
             while True:
-                yield self._decode_frame(self.sample_width)
+                yield self._decode_frame()[1]
         except EOFError:
             pass
 
-    def _decode_frame(self, bits_per_sample: int) -> List[List[int]]:
-        sync_code = self._stream.read_uint(14)
-        if sync_code != 0b11111111111110:
-            raise ValueError('Invalid sync code')
-
-        self._stream.read_uint(1)  # reserved bit
-        self._stream.read_uint(1)  # block strategy
-        block_size_code = self._stream.read_uint(4)
-        sample_rate_code = self._stream.read_uint(4)
-        channel_assigment = self._stream.read_uint(4)
-        self._stream.read_uint(3)  # sample size
-        self._stream.read_uint(1)  # reserved bit
-
-        temp = self._stream.read_uint(8)
-        while temp >= 0b11000000:
-            self._stream.read_uint(8)
-            temp = (temp << 1) & 0xFF
-
-        if block_size_code == 1:
-            block_size = 192
-        elif 2 <= block_size_code <= 5:
-            block_size = 576 << (block_size_code - 2)
-        elif block_size_code == 6:
-            block_size = self._stream.read_uint(8) + 1
-        elif block_size_code == 7:
-            block_size = self._stream.read_uint(16) + 1
-        elif 8 <= block_size_code <= 15:
-            block_size = 256 << (block_size_code - 8)
-
-        if sample_rate_code == 12:
-            self._stream.read_uint(8)
-        elif sample_rate_code in [13, 14]:
-            self._stream.read_uint(16)
-
-        self._stream.read_uint(8)  # crc-8
-
-        blocks = self._decode_subframes(block_size, bits_per_sample,
-                                        channel_assigment)
+    def _decode_frame(self, check_crc: bool = False
+                      ) -> Tuple[FrameHeader, List[List[int]],
+                                 Optional[bool]]:
+        stats = self._stats
+        if check_crc:
+            self._stream.start_capture()
+        if stats is not None:
+            start = perf_counter()
+        header = read_frame_header(self._stream, self._streaminfo)
+        if stats is not None:
+            stats.stage_seconds['header'] += perf_counter() - start
+
+        blocks = self._decode_subframes(header.block_size,
+                                        header.bits_per_sample,
+                                        header.channel_assigment)
         self._stream._clear_buffer()  # align to byte
-        self._stream.read_uint(16)  # crc-16
+        crc_ok = None
+        if check_crc:
+            data = self._stream.end_capture()
+            frame_crc = self._stream.read_uint(16)
+            if stats is not None:
+                start = perf_counter()
+            crc_ok = crc8(header.raw) == header.crc8 and \
+                crc16(data) == frame_crc
+            if stats is not None:
+                stats.stage_seconds['crc'] += perf_counter() - start
+        else:
+            self._stream.read_uint(16)  # crc-16
 
-        return blocks
+        return header, blocks, crc_ok
 
     def _decode_subframes(self, block_size: int, bits_per_sample: int,
                           channel_assigment: int) -> List[List[int]]:
+        self._engine.start_frame(
+            block_size, 2 if channel_assigment > 7 else channel_assigment + 1)
         if 0 <= channel_assigment <= 7:
             return [self._decode_subframe(block_size, bits_per_sample)
                     for _ in range(channel_assigment + 1)]
 
-        if channel_assigment == 8:
-            left = self._decode_subframe(block_size, bits_per_sample)
-            diff = self._decode_subframe(block_size, bits_per_sample + 1)
-            for i in range(block_size):
-                diff[i] = left[i] - diff[i]
-            return [left, diff]
-
-        if channel_assigment == 9:
-            diff = self._decode_subframe(block_size, bits_per_sample + 1)
-            right = self._decode_subframe(block_size, bits_per_sample)
-            for i in range(block_size):
-                diff[i] += right[i]
-            return [diff, right]
-
-        if channel_assigment == 10:
-            mid = self._decode_subframe(block_size, bits_per_sample)
-            side = self._decode_subframe(block_size, bits_per_sample + 1)
-            left, right = [-1] * block_size, [-1] * block_size
-            for i in range(block_size):
-                left[i] = (((mid[i] << 1) | (side[i] & 1)) + side[i]) >> 1
-                right[i] = (((mid[i] << 1) | (side[i] & 1)) - side[i]) >> 1
-            return [left, right]
+        if 8 <= channel_assigment <= 10:
+            first = self._decode_subframe(
+                block_size, bits_per_sample + (channel_assigment == 9))
+            second = self._decode_subframe(
+                block_size, bits_per_sample + (channel_assigment != 9))
+            return self._engine.decorrelate(channel_assigment, first, second)
 
         raise ValueError(
             'Invalid chanel assigment: {}'.format(channel_assigment))
@@ -200,14 +479,18 @@ class Flac:
             while self._stream.read_uint(1) == 0:
                 wasted_bits_per_sample += 1
         bits_per_sample -= wasted_bits_per_sample
+        if self._stats is not None:
+            self._stats.add_subframe(subframe_type, wasted_bits_per_sample)
 
         if subframe_type == 0:
             # CONSTANT subframe
-            result = [self._stream.read_sint(bits_per_sample)] * block_size
+            result = self._engine.constant(
+                self._stream.read_sint(bits_per_sample), block_size)
         elif subframe_type == 1:
             # VERBATIM subframe
-            result = [self._stream.read_sint(bits_per_sample)
-                      for _ in range(block_size)]
+            result = self._engine.verbatim(
+                [self._stream.read_sint(bits_per_sample)
+                 for _ in range(block_size)])
         elif 8 <= subframe_type <= 12:
             result = self._decode_fixed_subframe(subframe_type - 8,
                                                  block_size, bits_per_sample)
@@ -220,7 +503,7 @@ class Flac:
             raise ValueError('Invalid subframe type: {}'.format(subframe_type))
 
         if wasted_bits_per_sample > 0:
-            return [(s << wasted_bits_per_sample) for s in result]
+            return self._engine.shift(result, wasted_bits_per_sample)
         return result
 
     def _decode_lpc_subframe(self, lpc_order: int, block_size: int,
@@ -232,33 +515,18 @@ class Flac:
         coefs = [self._stream.read_sint(qlp_precision)
                  for _ in range(lpc_order)]
         residuals = self._decode_residuals(block_size, lpc_order)
-
-        result = warmup_samples + [-1] * len(residuals)
-        for i in range(lpc_order, len(result)):
-            residual = residuals[i - lpc_order]
-            s = sum(coef * result[i - j - 1] for (j, coef) in enumerate(coefs))
-            s >>= qlp_shift_needed
-            result[i] = s + residual
-
-        return result
+        return self._engine.restore_lpc(warmup_samples, coefs,
+                                        qlp_shift_needed, residuals)
 
     def _decode_fixed_subframe(self, lpc_order: int, block_size: int,
                                bits_per_sample: int) -> List[int]:
         warmup_samples = [self._stream.read_sint(bits_per_sample)
                           for _ in range(lpc_order)]
-        coefs = FIXED_SUBFRAME_COEFFS[lpc_order]
         residuals = self._decode_residuals(block_size, lpc_order)
-
-        result = warmup_samples + [-1] * len(residuals)
-        for i in range(lpc_order, len(result)):
-            residual = residuals[i - lpc_order]
-            s = sum(coef * result[i - j - 1] for (j, coef) in enumerate(coefs))
-            result[i] = s + residual
-
-        return result
+        return self._engine.restore_fixed(warmup_samples, residuals)
 
     def _decode_residuals(self, block_size: int,
-                          predictor_order: int) -> List[int]:
+                          predictor_order: int) -> array:
         coding_method = self._stream.read_uint(2)
         if coding_method not in [0, 1]:
             raise ValueError('Invalid coding method: {}'.format(coding_method))
@@ -267,12 +535,15 @@ class Flac:
 
         partion_order = self._stream.read_uint(4)
         partions_count = 1 << partion_order
+        stats = self._stats
+        if stats is not None:
+            stats.rice_partitions += partions_count
 
         if block_size % partions_count != 0:
             raise ValueError('Block size is not devisible by '
                              'number of rice partions')
 
-        result = []  # type: ignore
+        result = array('i')
         for i in range(partions_count):
             samples_in_partion = block_size >> partion_order
             if i == 0:
@@ -281,9 +552,50 @@ class Flac:
             rice_parameter = self._stream.read_uint(rice_parameter_len)
 
             if rice_parameter == rice_escape_code:
-                rice_parameter = self._stream.read_uint(5)
-
-            result += [self._stream.read_rice_int(rice_parameter)
-                       for _ in range(samples_in_partion)]
+                # partition is stored as unencoded binary samples
+                if stats is not None:
+                    stats.escape_partitions += 1
+                bits = self._stream.read_uint(5)
+                if bits == 0:
+                    result.extend([0] * samples_in_partion)
+                else:
+                    result.extend(self._stream.read_sint(bits)
+                                  for _ in range(samples_in_partion))
+                continue
+
+            result.extend(self._stream.read_rice_partition(
+                samples_in_partion, rice_parameter))
 
         return result
+
+
+def _clip_frames(frames: Iterable[Frame], start: int,
+                 end: Optional[int]) -> Generator[Frame, None, None]:
+    """Оставить из фреймов только сэмплы [start, end)
+    """
+    for frame in frames:
+        frame_end = frame.sample_offset + frame.block_size
+        if end is not None and frame.sample_offset >= end:
+            return
+        if frame_end <= start:
+            continue
+        if frame.sample_offset < start or \
+                (end is not None and frame_end > end):
+            frame = frame.slice(start - frame.sample_offset,
+                                (end or frame_end) - frame.sample_offset)
+        yield frame
+        if end is not None and frame_end >= end:
+            # не декодировать лишний фрейм после конца диапазона
+            return
+
+
+def _decode_frames(filename: str, engine, use_mmap: bool,
+                   pcm_format: PcmFormat, byte_offset: int,
+                   count: int) -> List[Frame]:
+    """Декодировать count фреймов, начиная с byte_offset (в процессе
+    из пула decode_parallel)
+    """
+    flac = Flac(filename, engine, use_mmap=use_mmap)
+    flac.pcm_format = pcm_format
+    flac._stream.seek(byte_offset)
+    return list(islice(flac.iter_frames(), count))
@@ -0,0 +1,132 @@
+"""Упаковка декодированных каналов в выходной PCM. Блок упаковывается
+целиком: через array на чистом python или через numpy
+"""
+import sys
+from array import array
+from typing import Sequence
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class PcmFormat:
+    """Формат выходных сэмплов. justify - выравнивать сэмплы по старшим
+    битам контейнера (12-битный сэмпл в s16le сдвигается на 4 бита, как
+    в WAV), иначе значение пишется как есть, с расширением знака
+    """
+    def __init__(self, name: str, sample_width: int, is_float: bool = False,
+                 unsigned: bool = False, justify: bool = True):
+        self.name = name
+        self.sample_width = sample_width
+        self.is_float = is_float
+        self.unsigned = unsigned
+        self.justify = justify
+
+    @property
+    def bits(self) -> int:
+        return self.sample_width * 8
+
+    def __eq__(self, other):
+        return isinstance(other, PcmFormat) and \
+            self.__dict__ == other.__dict__
+
+    def __hash__(self):
+        return hash(self.name)
+
+    def __repr__(self):
+        return '<PcmFormat {}>'.format(self.name)
+
+
+U8 = PcmFormat('u8', 1, unsigned=True)
+S16LE = PcmFormat('s16le', 2)
+S24LE = PcmFormat('s24le', 3)
+S32LE = PcmFormat('s32le', 4)
+FLOAT32 = PcmFormat('float32', 4, is_float=True)
+
+FORMATS = {f.name: f for f in [U8, S16LE, S24LE, S32LE, FLOAT32]}
+
+
+def container_format(bits_per_sample: int) -> PcmFormat:
+    """Целочисленный формат наименьшего контейнера для bits_per_sample,
+    как в WAV: 8 бит беззнаковые, остальные со знаком
+    """
+    if not 0 < bits_per_sample <= 32:
+        raise ValueError(
+            'Unsupported bits per sample: {}'.format(bits_per_sample))
+    return [U8, S16LE, S24LE, S32LE][(bits_per_sample - 1) // 8]
+
+
+def md5_format(bits_per_sample: int) -> PcmFormat:
+    """Формат, по которому считается MD5 в STREAMINFO: сэмплы со знаком
+    в (bits_per_sample + 7) // 8 байтах без выравнивания
+    """
+    width = (bits_per_sample + 7) // 8
+    return PcmFormat('md5', width, justify=False)
+
+
+def _shift(bits_per_sample: int, fmt: PcmFormat) -> int:
+    return fmt.bits - bits_per_sample if fmt.justify else 0
+
+
+def _interleave(channels: Sequence[Sequence[int]]) -> list:
+    count = len(channels)
+    if count == 1:
+        return list(channels[0])
+    result = [0] * (len(channels[0]) * count)
+    for i, samples in enumerate(channels):
+        result[i::count] = samples
+    return result
+
+
+def pack(channels: Sequence[Sequence[int]], bits_per_sample: int,
+         fmt: PcmFormat) -> bytes:
+    """Перемежить каналы и упаковать в little-endian PCM формата fmt
+    """
+    samples = _interleave(channels)
+    if fmt.is_float:
+        scale = 1 / (1 << (bits_per_sample - 1))
+        packed = array('f', [s * scale for s in samples])
+    else:
+        shift = _shift(bits_per_sample, fmt)
+        offset = 128 if fmt.unsigned else 0
+        if shift > 0:
+            samples = [(s << shift) + offset for s in samples]
+        elif shift < 0:
+            samples = [(s >> -shift) + offset for s in samples]
+        elif offset:
+            samples = [s + offset for s in samples]
+        typecode = {1: 'B' if fmt.unsigned else 'b', 2: 'h', 3: 'i',
+                    4: 'i'}[fmt.sample_width]
+        packed = array(typecode, samples)
+    if sys.byteorder == 'big':
+        packed.byteswap()
+    if fmt.sample_width != 3:
+        return packed.tobytes()
+    # из 4-байтных little-endian сэмплов выбрасываются старшие байты
+    data = bytearray(packed.tobytes())
+    del data[3::4]
+    return bytes(data)
+
+
+def pack_numpy(channels, bits_per_sample: int, fmt: PcmFormat) -> bytes:
+    samples = numpy.stack(
+        [numpy.asarray(c, dtype=numpy.int64) for c in channels], axis=1)
+    if fmt.is_float:
+        scale = 1 / (1 << (bits_per_sample - 1))
+        return (samples * scale).astype('<f4').tobytes()
+
+    shift = _shift(bits_per_sample, fmt)
+    if shift > 0:
+        samples <<= shift
+    elif shift < 0:
+        samples >>= -shift
+    if fmt.unsigned:
+        samples += 128
+    if fmt.sample_width == 3:
+        return samples.astype('<i4').view(numpy.uint8) \
+            .reshape(-1, 4)[:, :3].tobytes()
+    dtype = {1: 'u1' if fmt.unsigned else 'i1', 2: '<i2',
+             4: '<i4'}[fmt.sample_width]
+    return samples.astype(dtype).tobytes()
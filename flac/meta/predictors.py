@@ -0,0 +1,146 @@
+"""Восстановление сэмплов FIXED и LPC субфреймов по остаткам.
+
+Для каждого порядка используется отдельное ядро: история предсказателя
+хранится в локальных переменных, а результат пишется в заранее
+выделенный список, так что в цикле по сэмплам нет ни срезов, ни
+генераторов
+"""
+from functools import lru_cache
+from typing import Callable, List, Sequence
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+FIXED_COEFFS = [
+    [],
+    [1],
+    [2, -1],
+    [3, -3, 1],
+    [4, -6, 4, -1],
+]  # type: List[List[int]]
+
+MAX_LPC_ORDER = 32
+
+
+def _fixed0(samples: list, residuals: Sequence[int]):
+    samples[:] = residuals
+
+
+def _fixed1(samples: list, residuals: Sequence[int]):
+    s1 = samples[0]
+    for i, r in enumerate(residuals, 1):
+        s1 += r
+        samples[i] = s1
+
+
+def _fixed2(samples: list, residuals: Sequence[int]):
+    s2, s1 = samples[0], samples[1]
+    for i, r in enumerate(residuals, 2):
+        s = 2 * s1 - s2 + r
+        samples[i] = s
+        s2 = s1
+        s1 = s
+
+
+def _fixed3(samples: list, residuals: Sequence[int]):
+    s3, s2, s1 = samples[0], samples[1], samples[2]
+    for i, r in enumerate(residuals, 3):
+        s = 3 * (s1 - s2) + s3 + r
+        samples[i] = s
+        s3 = s2
+        s2 = s1
+        s1 = s
+
+
+def _fixed4(samples: list, residuals: Sequence[int]):
+    s4, s3, s2, s1 = samples[0], samples[1], samples[2], samples[3]
+    for i, r in enumerate(residuals, 4):
+        s = 4 * (s1 + s3) - 6 * s2 - s4 + r
+        samples[i] = s
+        s4 = s3
+        s3 = s2
+        s2 = s1
+        s1 = s
+
+
+FIXED_KERNELS = [_fixed0, _fixed1, _fixed2, _fixed3, _fixed4]
+
+
+def restore_fixed(warmup: List[int], residuals: Sequence[int]) -> List[int]:
+    """Восстановить FIXED субфрейм порядка len(warmup)
+    """
+    order = len(warmup)
+    if order >= len(FIXED_KERNELS):
+        raise ValueError('Invalid fixed predictor order: {}'.format(order))
+    samples = warmup + [0] * len(residuals)
+    FIXED_KERNELS[order](samples, residuals)
+    return samples
+
+
+def restore_fixed_numpy(warmup: List[int], residuals: Sequence[int]):
+    """То же через numpy: FIXED предсказатель порядка k обращается
+    k кратным cumsum, если начало последовательности заменить
+    разностями warmup сэмплов. Все промежуточные значения - разности
+    исходного сигнала, поэтому int64 хватает для 32 бит на сэмпл
+    """
+    order = len(warmup)
+    if order >= len(FIXED_KERNELS):
+        raise ValueError('Invalid fixed predictor order: {}'.format(order))
+    head = numpy.array(warmup, dtype=numpy.int64)
+    for _ in range(order):
+        head[1:] = numpy.diff(head)
+    samples = numpy.concatenate(
+        [head, numpy.asarray(residuals, dtype=numpy.int64)])
+    for _ in range(order):
+        numpy.cumsum(samples, out=samples)
+    return samples
+
+
+def _lpc_kernel_source(order: int) -> str:
+    coefs = ['c{}'.format(j) for j in range(order)]
+    history = ['s{}'.format(j + 1) for j in range(order)]
+    lines = [
+        'def _lpc{}(samples, residuals, coefs, shift):'.format(order),
+        '    {}, = coefs'.format(', '.join(coefs)),
+        '    {}, = samples[{}::-1]'.format(', '.join(history), order - 1),
+        '    for i, r in enumerate(residuals, {}):'.format(order),
+        '        s = (({}) >> shift) + r'.format(' + '.join(
+            '{} * {}'.format(c, s) for c, s in zip(coefs, history))),
+        '        samples[i] = s',
+    ]
+    lines.extend('        {} = {}'.format(history[j], history[j - 1])
+                 for j in range(order - 1, 0, -1))
+    lines.append('        s1 = s')
+    return '\n'.join(lines) + '\n'
+
+
+@lru_cache(maxsize=None)
+def lpc_kernel(order: int) -> Callable:
+    """Ядро LPC для порядка order: предсказание развёрнуто в одно
+    выражение, коэффициенты и история лежат в локальных переменных
+    """
+    if not 1 <= order <= MAX_LPC_ORDER:
+        raise ValueError('Invalid LPC order: {}'.format(order))
+    namespace = {}  # type: dict
+    exec(compile(_lpc_kernel_source(order), '<lpc{}>'.format(order), 'exec'),
+         namespace)
+    return namespace['_lpc{}'.format(order)]
+
+
+def restore_lpc(warmup: List[int], coefs: Sequence[int], shift: int,
+                residuals: Sequence[int]) -> List[int]:
+    """Восстановить LPC субфрейм. coefs[0] - коэффициент при
+    предыдущем сэмпле
+    """
+    if shift < 0:
+        raise ValueError('Invalid LPC shift: {}'.format(shift))
+    samples = warmup + [0] * len(residuals)
+    lpc_kernel(len(coefs))(samples, residuals, coefs, shift)
+    return samples
+
+
+# самые частые порядки компилируются сразу при импорте
+for _order in range(1, 13):
+    lpc_kernel(_order)
@@ -0,0 +1,93 @@
+from collections import Counter
+from time import perf_counter
+from typing import Callable
+
+# этапы декодирования фрейма, время которых меряется отдельно. Остальное
+# время фрейма - чтение битов вне Rice: заголовки субфреймов, warmup
+# сэмплы, CONSTANT и VERBATIM субфреймы
+STAGES = ['header', 'residuals', 'prediction', 'decorrelation',
+          'wasted_bits', 'packing', 'crc']
+
+
+class DecodeStats:
+    """Счётчики и время этапов декодирования. Собираются, только если
+    присвоить объект Flac.stats, иначе декодер их не трогает
+    """
+    def __init__(self):
+        self.frames = 0
+        self.samples = 0  # значения всех каналов
+        self.bytes = 0
+        self.seconds = 0.0  # декодирование фреймов целиком
+        self.stage_seconds = dict.fromkeys(STAGES, 0.0)
+        self.subframes = Counter()  # type: Counter
+        self.fixed_orders = Counter()  # type: Counter
+        self.lpc_orders = Counter()  # type: Counter
+        self.wasted_subframes = 0
+        self.rice_partitions = 0
+        self.escape_partitions = 0
+
+    def add_frame(self, samples: int, size: int, seconds: float):
+        self.frames += 1
+        self.samples += samples
+        self.bytes += size
+        self.seconds += seconds
+
+    def add_subframe(self, subframe_type: int, wasted_bits: int):
+        if subframe_type == 0:
+            self.subframes['constant'] += 1
+        elif subframe_type == 1:
+            self.subframes['verbatim'] += 1
+        elif 8 <= subframe_type <= 12:
+            self.subframes['fixed'] += 1
+            self.fixed_orders[subframe_type - 8] += 1
+        elif subframe_type >= 32:
+            self.subframes['lpc'] += 1
+            self.lpc_orders[subframe_type - 31] += 1
+        if wasted_bits:
+            self.wasted_subframes += 1
+
+    def timed(self, stage: str, func: Callable) -> Callable:
+        """func, время вызовов которой добавляется к этапу stage
+        """
+        stage_seconds = self.stage_seconds
+
+        def timed(*args):
+            start = perf_counter()
+            try:
+                return func(*args)
+            finally:
+                stage_seconds[stage] += perf_counter() - start
+        return timed
+
+    @property
+    def other_seconds(self) -> float:
+        return max(self.seconds - sum(self.stage_seconds.values()), 0.0)
+
+    def __str__(self):
+        speed = self.samples / self.seconds if self.seconds else 0
+        lines = [
+            'frames: {}, samples: {}, read: {:.1f} KiB, '
+            'decoding: {:.3f}s ({:.0f} samples/s)'.format(
+                self.frames, self.samples, self.bytes / 1024, self.seconds,
+                speed),
+            'subframes: {}, with wasted bits: {}'.format(
+                _format_counter(self.subframes), self.wasted_subframes),
+            'fixed orders: {}'.format(_format_counter(self.fixed_orders)),
+            'lpc orders: {}'.format(_format_counter(self.lpc_orders)),
+            'rice partitions: {}, escaped: {}'.format(
+                self.rice_partitions, self.escape_partitions),
+        ]
+        stages = list(self.stage_seconds.items())
+        stages.append(('other bits', self.other_seconds))
+        for stage, seconds in stages:
+            share = seconds / self.seconds * 100 if self.seconds else 0
+            lines.append('  {:<14} {:8.3f}s {:5.1f}%'.format(
+                stage, seconds, share))
+        return '\n'.join(lines)
+
+
+def _format_counter(counter: Counter) -> str:
+    if not counter:
+        return '-'
+    return ', '.join('{}: {}'.format(k, v) for k, v in sorted(
+        counter.items(), key=lambda kv: (-kv[1], str(kv[0]))))
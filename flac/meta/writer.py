@@ -0,0 +1,261 @@
+"""Запись метаданных. Если новые блоки помещаются в место, которое
+занимали старые метаданные вместе с PADDING, переписывается только эта
+область в начале файла. Иначе файл копируется потоком во временный
+рядом с ним, с новым PADDING про запас, и подменяет исходный
+"""
+import os
+import shutil
+import struct
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .metadata import FLAC_MARKER, Flac
+
+STREAMINFO = 0
+PADDING = 1
+VORBIS_COMMENT = 4
+PICTURE = 6
+
+MAX_BLOCK_SIZE = (1 << 24) - 1
+DEFAULT_PADDING = 8192
+COPY_CHUNK_SIZE = 1 << 20
+
+
+def block_header(block_type: int, size: int, is_last: bool = False) -> bytes:
+    if size > MAX_BLOCK_SIZE:
+        raise ValueError('Metadata block is too large: {} bytes'.format(size))
+    return struct.pack('>I', (is_last << 31) | (block_type << 24) | size)
+
+
+def vorbis_comment_data(vendor: str, tags: Dict[str, List[str]]) -> bytes:
+    """Тело блока VORBIS_COMMENT
+    """
+    vendor_data = vendor.encode('utf-8')
+    comments = ['{}={}'.format(tag, value).encode('utf-8')
+                for tag, values in tags.items() for value in values]
+    parts = [struct.pack('<I', len(vendor_data)), vendor_data,
+             struct.pack('<I', len(comments))]
+    for comment in comments:
+        parts.append(struct.pack('<I', len(comment)))
+        parts.append(comment)
+    return b''.join(parts)
+
+
+def picture_data(image_data: bytes, mime_type: str, description: str = '',
+                 picture_type: int = 3, width: int = 0, height: int = 0,
+                 color_depth: int = 0, used_colors: int = 0) -> bytes:
+    """Тело блока PICTURE. picture_type 3 - обложка
+    """
+    mime = mime_type.encode('ascii')
+    desc = description.encode('utf-8')
+    return b''.join([
+        struct.pack('>II', picture_type, len(mime)), mime,
+        struct.pack('>I', len(desc)), desc,
+        struct.pack('>IIIII', width, height, color_depth, used_colors,
+                    len(image_data)),
+        image_data,
+    ])
+
+
+class MetadataEditor:
+    """Правка тегов и картинок flac файла. Блоки, кроме VORBIS_COMMENT,
+    считываются как есть и записываются обратно без изменений, старые
+    PADDING объединяются в один в конце метаданных
+    """
+    def __init__(self, filename: str):
+        self.filename = filename
+        flac = Flac(filename)
+        self.audio_offset = flac._audio_offset
+        self.vendor = 'hexlify/flac'
+        self.tags = {}  # type: Dict[str, List[str]]
+        # (тип, тело) блоков, None - место VORBIS_COMMENT
+        self._blocks = []  # type: List[Tuple[int, Optional[bytes]]]
+        with open(filename, 'rb') as f:
+            for block in [flac._streaminfo] + flac._blocks:
+                if block.block_type == PADDING:
+                    continue
+                if block.block_type == VORBIS_COMMENT and \
+                        (VORBIS_COMMENT, None) not in self._blocks:
+                    self.vendor = block.vendor_string
+                    self.tags = {k: list(v) for k, v in block.tags.items()}
+                    self._blocks.append((VORBIS_COMMENT, None))
+                    continue
+                f.seek(block.offset)
+                self._blocks.append((block.block_type, f.read(block.size)))
+        if (VORBIS_COMMENT, None) not in self._blocks:
+            self._blocks.insert(1, (VORBIS_COMMENT, None))
+
+    def _find_tag(self, tag: str) -> Optional[str]:
+        # имена полей в vorbis comment не зависят от регистра
+        for key in self.tags:
+            if key.upper() == tag.upper():
+                return key
+        return None
+
+    def get_tag(self, tag: str) -> List[str]:
+        key = self._find_tag(tag)
+        return list(self.tags[key]) if key is not None else []
+
+    def set_tag(self, tag: str, values: Iterable[str]):
+        key = self._find_tag(tag) or tag
+        self.remove_tag(tag)
+        values = list(values)
+        if values:
+            self.tags[key] = values
+
+    def add_tag(self, tag: str, value: str):
+        key = self._find_tag(tag) or tag
+        self.tags.setdefault(key, []).append(value)
+
+    def remove_tag(self, tag: str):
+        key = self._find_tag(tag)
+        if key is not None:
+            del self.tags[key]
+
+    @property
+    def pictures(self) -> List[bytes]:
+        """Тела блоков PICTURE
+        """
+        return [data for block_type, data in self._blocks
+                if block_type == PICTURE]
+
+    def add_picture(self, image_data: bytes, mime_type: str, **kwargs):
+        """kwargs - остальные поля picture_data
+        """
+        self._blocks.append(
+            (PICTURE, picture_data(image_data, mime_type, **kwargs)))
+
+    def remove_pictures(self, picture_type: Optional[int] = None):
+        """Удалить картинки типа picture_type или все
+        """
+        self._blocks = [
+            (block_type, data) for block_type, data in self._blocks
+            if block_type != PICTURE or (
+                picture_type is not None and
+                struct.unpack('>I', data[:4])[0] != picture_type)]
+
+    def metadata(self) -> bytes:
+        """Все блоки метаданных без PADDING, последний без флага is_last
+        """
+        parts = []
+        for block_type, data in self._blocks:
+            if data is None:
+                data = vorbis_comment_data(self.vendor, self.tags)
+            parts.append(block_header(block_type, len(data)))
+            parts.append(data)
+        return b''.join(parts)
+
+    def save(self, padding: int = DEFAULT_PADDING) -> 'EditResult':
+        """Записать метаданные. На месте, если они помещаются в старую
+        область метаданных, иначе потоковой копией файла с padding байт
+        PADDING
+        """
+        metadata = self.metadata()
+        available = self.audio_offset - len(FLAC_MARKER)
+        free = available - len(metadata)
+        result = EditResult(self.filename)
+        if free == 0 or free >= 4:
+            with open(self.filename, 'r+b') as f:
+                f.seek(len(FLAC_MARKER))
+                data = _finish(metadata, free)
+                f.write(data)
+            result.in_place = True
+            result.written = len(data)
+        else:
+            result.written = self._rewrite(_finish(metadata, padding + 4))
+        self.audio_offset = len(FLAC_MARKER) + result.written
+        return result
+
+    def _rewrite(self, metadata: bytes) -> int:
+        """Скопировать файл с новыми метаданными. Возвращает число
+        записанных байт метаданных
+        """
+        directory = os.path.dirname(os.path.abspath(self.filename))
+        fd, temp = tempfile.mkstemp(suffix='.flac', dir=directory)
+        try:
+            with os.fdopen(fd, 'wb') as dst, open(self.filename, 'rb') as src:
+                dst.write(FLAC_MARKER)
+                dst.write(metadata)
+                src.seek(self.audio_offset)
+                shutil.copyfileobj(src, dst, COPY_CHUNK_SIZE)
+            shutil.copymode(self.filename, temp)
+            os.replace(temp, self.filename)
+        except BaseException:
+            os.remove(temp)
+            raise
+        return len(metadata)
+
+
+def _finish(metadata: bytes, free: int) -> bytes:
+    """Дополнить метаданные блоками PADDING на free байт (вместе с
+    заголовками) и выставить is_last у последнего блока. Больше
+    MAX_BLOCK_SIZE в один блок не помещается, поэтому место делится на
+    несколько
+    """
+    if free == 0:
+        last = _last_block_offset(metadata)
+        header = bytearray(metadata[last:last + 4])
+        header[0] |= 0x80
+        return metadata[:last] + bytes(header) + metadata[last + 4:]
+    parts = [metadata]
+    while free:
+        size = min(free - 4, MAX_BLOCK_SIZE)
+        if 0 < free - 4 - size < 4:
+            # остатка не хватит даже на заголовок следующего блока
+            size -= 4
+        free -= 4 + size
+        parts.append(block_header(PADDING, size, free == 0))
+        parts.append(bytes(size))
+    return b''.join(parts)
+
+
+def _last_block_offset(metadata: bytes) -> int:
+    offset = 0
+    while True:
+        size = struct.unpack('>I', metadata[offset:offset + 4])[0] & \
+            MAX_BLOCK_SIZE
+        if offset + 4 + size == len(metadata):
+            return offset
+        offset += 4 + size
+
+
+class EditResult:
+    def __init__(self, path: str):
+        self.path = path
+        self.in_place = False
+        self.written = 0  # байт метаданных (при копии файл пишется весь)
+        self.error = None  # type: Optional[str]
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def __str__(self):
+        if self.error is not None:
+            return '{}: ERROR {}'.format(self.path, self.error)
+        how = 'in place' if self.in_place else 'rewritten'
+        return '{}: {}, {} bytes of metadata'.format(
+            self.path, how, self.written)
+
+
+def edit_files(paths: Iterable[str], edit: Callable[[MetadataEditor], None],
+               workers: Optional[int] = None,
+               padding: int = DEFAULT_PADDING) -> Iterator[EditResult]:
+    """Применить edit к метаданным каждого файла и сохранить. Файлы
+    обрабатываются в пуле потоков (работа в основном - ввод-вывод),
+    результаты отдаются в порядке paths
+    """
+    def process(path: str) -> EditResult:
+        try:
+            editor = MetadataEditor(path)
+            edit(editor)
+            return editor.save(padding)
+        except Exception as e:
+            result = EditResult(path)
+            result.error = '{}: {}'.format(type(e).__name__, e)
+            return result
+
+    with ThreadPoolExecutor(workers or min(8, os.cpu_count() or 1)) \
+            as executor:
+        yield from executor.map(process, paths)
@@ -33,18 +33,22 @@ class PlayerForm(FormBaseNew):
     ]
 
     def while_waiting(self):
+        self._show_tags()
+        self.progress.out_of = self.song.duration
         self.progress.value = self.song.current_time
+        self.stats.value = 'latency {:.0f} ms, underruns {}'.format(
+            self.song.latency * 1000, self.song.underruns)
         self.display()
 
     def create(self):
         self.song = self.parentApp.song  # type: Song
-        self.add(TitleFixedText, name='Name: ', value=self.song.title or '???')
-        self.add(TitleFixedText, name='Album: ',
-                 value=self.song.album or '???')
-        self.add(TitleFixedText, name='Artist: ',
-                 value=self.song.artist or '???')
+        self.title_text = self.add(TitleFixedText, name='Name: ')
+        self.album_text = self.add(TitleFixedText, name='Album: ')
+        self.artist_text = self.add(TitleFixedText, name='Artist: ')
+        self._show_tags()
         # self.goto = self.add(Goto, name='Go to: ')
         self.progress = self.add(DurationSlider, out_of=self.song.duration)
+        self.stats = self.add(TitleFixedText, name='Output: ', value='')
         self.add(Pager, values=PlayerForm.HELP_MESSAGE)
         handlers = {
             ' ': self.h_pause,
@@ -56,6 +60,12 @@ class PlayerForm(FormBaseNew):
             'q': self.h_quit}
         self.handlers = handlers
 
+    def _show_tags(self):
+        # в плейлисте трек меняется во время проигрывания
+        self.title_text.value = self.song.title or '???'
+        self.album_text.value = self.song.album or '???'
+        self.artist_text.value = self.song.artist or '???'
+
     def h_pause(self, _):
         if self.song.is_paused:
             self.song.play()
@@ -0,0 +1,153 @@
+from collections import deque
+from itertools import chain
+from threading import Thread
+from typing import Callable, Iterator, List, Optional
+
+from .meta import Flac, Frame
+from .song import Song
+
+LOOKAHEAD_DURATION = 1000
+
+
+def same_format(first: Flac, second: Flac) -> bool:
+    return (first.sample_rate, first.channels, first.pcm_format) == \
+        (second.sample_rate, second.channels, second.pcm_format)
+
+
+class Preload(Thread):
+    """Открыть следующий трек и заранее декодировать его первые
+    LOOKAHEAD_DURATION мс в фоновом потоке
+    """
+    def __init__(self, index: int, filename: str, opener: Callable):
+        super().__init__(daemon=True)
+        self.index = index
+        self._filename = filename
+        self._opener = opener
+        self.flac = None  # type: Optional[Flac]
+        self.error = None  # type: Optional[Exception]
+        self._frames = []  # type: List[Frame]
+        self._rest = iter(())  # type: Iterator[Frame]
+        self.start()
+
+    def run(self):
+        try:
+            self.flac = self._opener(self._filename)
+            self._rest = self.flac.iter_frames()
+            lookahead = self.flac.sample_rate * LOOKAHEAD_DURATION // 1000
+            decoded = 0
+            for frame in self._rest:
+                self._frames.append(frame)
+                decoded += frame.block_size
+                if decoded >= lookahead:
+                    break
+        except Exception as e:
+            self.error = e
+
+    def frames(self) -> Iterator[Frame]:
+        """Уже декодированные фреймы, затем остальные. Только после join
+        """
+        return chain(self._frames, self._rest)
+
+
+class Playlist(Song):
+    """Проигрывание нескольких файлов подряд. Пока играет трек, следующий
+    открывается и начинает декодироваться в Preload. Если формат
+    совпадает, декодер сразу продолжает писать в тот же кольцевой буфер,
+    и переход между треками проходит без паузы. Иначе аудиопоток
+    переоткрывается под новый формат.
+
+    Свойства Song (title, duration, current_time, seek) относятся к
+    треку, который сейчас слышен
+    """
+    def __init__(self, filenames: List[str], backend=None,
+                 opener: Callable = Flac):
+        self._filenames = list(filenames)
+        self._opener = opener
+        self.index = 0  # слышимый трек
+        self._decoding = None  # type: Optional[Flac]
+        self._decoding_index = 0
+        self._written_end = 0  # конец записанных в буфер сэмплов трека
+        # переходы, которые декодер уже записал в буфер:
+        # (номер трека, Flac, сэмпл конца предыдущего трека)
+        self._switches = deque()  # type: deque
+        self._preload = None  # type: Optional[Preload]
+        self._reopen_with = None  # type: Optional[Preload]
+        super().__init__(opener(self._filenames[0]), backend)
+
+    def __len__(self):
+        return len(self._filenames)
+
+    def seek(self, sample: int):
+        with self._lock:
+            self._switches.clear()
+        super().seek(sample)
+
+    def _preload_next(self, index: int):
+        self._preload = None
+        if index + 1 < len(self._filenames):
+            self._preload = Preload(index + 1, self._filenames[index + 1],
+                                    self._opener)
+
+    def _track_frames(self, frames: Iterator[Frame]) -> Iterator[Frame]:
+        for frame in frames:
+            self._written_end = frame.sample_offset + frame.block_size
+            yield frame
+
+    def _open_frames(self, start: int) -> Iterator[Frame]:
+        self._decoding = self._flac
+        self._decoding_index = self.index
+        self._written_end = start
+        # Preload следующего трека переиспользуется, пока его фреймы не
+        # отданы декодеру. Если декодер уже перешёл на следующий трек
+        # (переход был в _switches, теперь сброшен перемоткой), Preload
+        # указывает дальше, и следующий трек надо открыть заново
+        preload = self._preload
+        if preload is None or preload.index != self.index + 1:
+            self._preload_next(self.index)
+        return self._track_frames(self._flac.read_range(start))
+
+    def _next_frames(self, epoch: int) -> Optional[Iterator[Frame]]:
+        preload = self._preload
+        while preload is not None:
+            preload.join()
+            if preload.error is None:
+                break
+            # битый файл пропускаем
+            self._preload_next(preload.index)
+            preload = self._preload
+        if preload is None:
+            return None
+
+        with self._lock:
+            if epoch != self._buffer.epoch:
+                # была перемотка: декодер начнёт заново с _open_frames
+                return iter(())
+            if not same_format(self._decoding, preload.flac):
+                self._reopen_with = preload
+                return None
+            self._switches.append((preload.index, preload.flac,
+                                   self._written_end))
+            self._decoding = preload.flac
+            self._decoding_index = preload.index
+            self._written_end = 0
+            self._preload_next(preload.index)
+        return self._track_frames(preload.frames())
+
+    def _advance(self, samples: int):
+        self._position += samples
+        while self._switches and self._position >= self._switches[0][2]:
+            self.index, self._flac, end = self._switches.popleft()
+            self._position -= end
+
+    def _reopen(self) -> bool:
+        preload, self._reopen_with = self._reopen_with, None
+        if preload is None:
+            return False
+        with self._lock:
+            self.index = preload.index
+            self._position = 0
+            self._configure(preload.flac)
+            self._finished.clear()
+            self._seek_target = 0
+            self._seek_requested.set()
+        return True
@@ -0,0 +1,125 @@
+from threading import Condition
+from typing import Optional
+
+
+class RingBuffer:
+    """Кольцевой буфер байт фиксированного размера для одного писателя
+    (декодера) и одного читателя (вывода звука).
+
+    write блокируется, пока в буфере нет места, чтение не блокируется
+    никогда. clear сбрасывает данные (например, при перемотке) и
+    прерывает начатую запись, чтобы в буфер не попал хвост старого фрейма
+    """
+    def __init__(self, capacity: int):
+        self._data = bytearray(capacity)
+        self._view = memoryview(self._data)
+        self._start = 0
+        self._count = 0
+        self._epoch = 0
+        self._closed = False
+        self._cond = Condition()
+
+    @property
+    def capacity(self) -> int:
+        return len(self._data)
+
+    @property
+    def available(self) -> int:
+        """Сколько байт можно прочитать
+        """
+        return self._count
+
+    @property
+    def free(self) -> int:
+        return len(self._data) - self._count
+
+    @property
+    def finished(self) -> bool:
+        """Писатель закрыл буфер, и все данные прочитаны
+        """
+        return self._closed and self._count == 0
+
+    @property
+    def epoch(self) -> int:
+        """Номер очистки: растёт при каждом clear
+        """
+        return self._epoch
+
+    def write(self, data: bytes, epoch: Optional[int] = None,
+              timeout: Optional[float] = None) -> bool:
+        """Записать data целиком. Возвращает False, если буфер был очищен
+        после epoch (по умолчанию - после начала записи) или закрыт,
+        или истёк timeout
+        """
+        data = memoryview(data).cast('B')
+        capacity = len(self._data)
+        with self._cond:
+            if epoch is None:
+                epoch = self._epoch
+            while len(data) > 0:
+                while self._count == capacity and self._epoch == epoch \
+                        and not self._closed:
+                    if not self._cond.wait(timeout):
+                        return False
+                if self._epoch != epoch or self._closed:
+                    return False
+                end = (self._start + self._count) % capacity
+                size = min(len(data), capacity - self._count,
+                           capacity - end)
+                self._view[end:end + size] = data[:size]
+                self._count += size
+                data = data[size:]
+                self._cond.notify_all()
+        return True
+
+    def read_into(self, buffer) -> int:
+        """Прочитать в buffer столько байт, сколько есть (но не больше
+        его размера). Возвращает число прочитанных байт
+        """
+        buffer = memoryview(buffer).cast('B')
+        capacity = len(self._data)
+        with self._cond:
+            total = min(len(buffer), self._count)
+            done = 0
+            while done < total:
+                size = min(total - done, capacity - self._start)
+                buffer[done:done + size] = \
+                    self._view[self._start:self._start + size]
+                self._start = (self._start + size) % capacity
+                self._count -= size
+                done += size
+            if total:
+                self._cond.notify_all()
+        return total
+
+    def read(self, n: int) -> bytes:
+        buffer = bytearray(min(n, self._count))
+        return bytes(buffer[:self.read_into(buffer)])
+
+    def wait(self, n: int, timeout: Optional[float] = None) -> bool:
+        """Дождаться, пока для чтения будет хотя бы n байт (или буфер
+        будет закрыт)
+        """
+        with self._cond:
+            return self._cond.wait_for(
+                lambda: self._count >= n or self._closed, timeout)
+
+    def clear(self):
+        """Сбросить данные и прервать текущую запись. Снимает закрытие
+        """
+        with self._cond:
+            self._start = 0
+            self._count = 0
+            self._epoch += 1
+            self._closed = False
+            self._cond.notify_all()
+
+    def close(self, epoch: Optional[int] = None):
+        """Больше данных не будет. Если буфер был очищен после epoch,
+        закрытие игнорируется
+        """
+        with self._cond:
+            if epoch is not None and epoch != self._epoch:
+                return
+            self._closed = True
+            self._cond.notify_all()
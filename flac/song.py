@@ -1,35 +1,64 @@
-from threading import Thread
-from typing import Optional, TextIO
+from threading import Event, Lock, Thread
+from typing import Iterator, Optional
 
-from pyaudio import PyAudio, paInt16, paInt32
-from pydub import AudioSegment
-
-from .meta import Flac
+from .audio import (COMPLETE, CONTINUE, OUTPUT_OVERFLOW, OUTPUT_UNDERFLOW,
+                    Gain, PyAudioBackend)
+from .meta import Flac, Frame
+from .ring_buffer import RingBuffer
 
 CHUNK_DURATION = 50
+BUFFER_DURATION = 2000
 
 
 class Song(Thread):
-    def __init__(self, flac: Flac):
-        self._flac = flac
-        self._segment = AudioSegment.from_file(flac._f)
-        self._audio = PyAudio()
-        self._stream = self._open_stream()
+    """Проигрывание flac файла. Поток-декодер пишет PCM в кольцевой буфер
+    на BUFFER_DURATION мс, а callback аудиопотока забирает из него куски
+    по CHUNK_DURATION мс. Память и время запуска не зависят от длины
+    трека. Сам поток Song только ждёт конца трека и закрывает вывод.
+
+    underruns - сколько раз callback не получил данных вовремя (в том
+    числе по флагу PortAudio), overruns - флаги переполнения от PortAudio
+    """
+    def __init__(self, flac: Flac, backend=None):
+        self._backend = backend or PyAudioBackend()
         self._is_paused = True
-        self._current_time = 0
+        self._gain = 1.0
+        self._gain_buffer = Gain()
+        self._volume = 0  # dB
         self.is_aborted = False
+        self.underruns = 0
+        self.overruns = 0
+
+        self._lock = Lock()
+        self._position = 0  # номер сэмпла, который будет отдан в вывод
+        self._seek_target = 0
+        self._seek_requested = Event()
+        self._seek_requested.set()
+        self._finished = Event()
+        self._configure(flac)
+        self._decoder = Thread(target=self._decode, daemon=True)
 
         Thread.__init__(self)
+        self._decoder.start()
         self.start()
 
-    def _open_stream(self):
-        if self._flac.sample_width not in [16, 24]:
-            raise ValueError("This sample width isn't supported")
-
-        format = paInt16 if self._flac.sample_width == 16 else paInt32
-        return self._audio.open(
-            format=format, channels=self._flac.channels,
-            rate=self._flac.sample_rate, output=True)
+    def _configure(self, flac: Flac):
+        """Буферы и аудиопоток под формат flac
+        """
+        self._flac = flac
+        self._sample_width = flac.pcm_format.sample_width
+        self._frame_size = flac.channels * self._sample_width
+        self._buffer = RingBuffer(self._bytes_for(BUFFER_DURATION))
+        frames_per_buffer = flac.sample_rate * CHUNK_DURATION // 1000
+        self._out = bytearray(frames_per_buffer * self._frame_size)
+        self._silence = bytes(len(self._out))
+        self._stream = self._backend.open(
+            flac.pcm_format.bits, flac.channels, flac.sample_rate,
+            frames_per_buffer, self._callback)
+
+    def _bytes_for(self, milliseconds: int) -> int:
+        return self._flac.sample_rate * milliseconds // 1000 * \
+            self._frame_size
 
     @property
     def is_paused(self):
@@ -42,30 +71,49 @@ class Song(Thread):
         self._is_paused = False
 
     def stop(self):
-        self._current_time = 0
+        self.current_time = 0
 
     def abort(self):
         self.is_aborted = True
+        self._buffer.close()
+        self._seek_requested.set()
+        self._finished.set()
 
     @property
     def duration(self):
-        return len(self._segment)
+        return int(self._flac.duration * 1000)
 
     @property
     def current_time(self):
-        return self._current_time
+        return self._position * 1000 // self._flac.sample_rate
 
     @current_time.setter
     def current_time(self, milliseconds: int):
-        if milliseconds < 0:
-            milliseconds = 0
-        if milliseconds >= len(self._segment):
-            milliseconds = len(self._segment) - 1
+        milliseconds = min(max(milliseconds, 0), self.duration - 1)
+        self.seek(milliseconds * self._flac.sample_rate // 1000)
 
-        self._current_time = milliseconds
+    @property
+    def latency(self) -> float:
+        """Задержка вывода в секундах: буфер звуковой карты плюс данные,
+        уже лежащие в кольцевом буфере
+        """
+        buffered = self._buffer.available / self._frame_size
+        return self._stream.get_output_latency() + \
+            buffered / self._flac.sample_rate
+
+    def seek(self, sample: int):
+        """Перейти к сэмплу: буфер сбрасывается, декодер продолжает с
+        фрейма, содержащего sample (через SEEKTABLE или индекс фреймов)
+        """
+        with self._lock:
+            self._buffer.clear()
+            self._position = sample
+            self._seek_target = sample
+            self._seek_requested.set()
 
     def change_volume(self, volume_change: int):
-        self._segment += volume_change
+        self._volume += volume_change
+        self._gain = 10 ** (self._volume / 20)
 
     def _get_tag(self, tag: str) -> Optional[str]:
         comments = self._flac.vorbis_comments
@@ -85,16 +133,93 @@ class Song(Thread):
     def artist(self) -> Optional[str]:
         return self._get_tag('ARTIST')
 
+    def _decode(self):
+        """Поток-декодер. Только он обращается к декодеру flac
+        """
+        frames = iter(())  # type: Iterator[Frame]
+        epoch = self._buffer.epoch
+        while not self.is_aborted:
+            if self._seek_requested.is_set():
+                with self._lock:
+                    self._seek_requested.clear()
+                    epoch = self._buffer.epoch
+                    frames = self._open_frames(self._seek_target)
+            frame = next(frames, None)
+            if frame is None:
+                next_frames = self._next_frames(epoch)
+                if next_frames is not None:
+                    frames = next_frames
+                    continue
+                self._buffer.close(epoch)
+                self._seek_requested.wait()
+                frames = iter(())
+                continue
+            self._buffer.write(frame.data, epoch)
+
+    def _open_frames(self, start: int) -> Iterator[Frame]:
+        """Фреймы текущего трека с сэмпла start. Вызывается декодером
+        под self._lock
+        """
+        return self._flac.read_range(start)
+
+    def _next_frames(self, epoch: int) -> Optional[Iterator[Frame]]:
+        """Фреймы, которые декодер продолжит писать в буфер после конца
+        трека без паузы, или None
+        """
+        return None
+
+    def _advance(self, samples: int):
+        """Отдано в вывод ещё samples сэмплов. Вызывается под self._lock
+        """
+        self._position += samples
+
+    def _reopen(self) -> bool:
+        """После конца данных: перенастроить вывод на следующий трек
+        другого формата. False - играть больше нечего
+        """
+        return False
+
+    def _callback(self, in_data, frame_count: int, time_info, status: int):
+        """Вызывается аудиопотоком. Данные читаются в заранее выделенный
+        буфер, на паузе отдаётся готовая тишина
+        """
+        if status & OUTPUT_UNDERFLOW:
+            self.underruns += 1
+        if status & OUTPUT_OVERFLOW:
+            self.overruns += 1
+
+        size = frame_count * self._frame_size
+        if size > len(self._out):
+            self._out = bytearray(size)
+            self._silence = bytes(size)
+        if self._is_paused or self.is_aborted:
+            if size == len(self._silence):
+                return self._silence, CONTINUE
+            return self._silence[:size], CONTINUE
+
+        out = memoryview(self._out)[:size]
+        with self._lock:
+            read = self._buffer.read_into(out)
+            self._advance(read // self._frame_size)
+            finished = self._buffer.finished
+        if read == 0 and finished:
+            self._finished.set()
+            return self._silence[:size], COMPLETE
+        if read < size:
+            if not finished:
+                self.underruns += 1
+            out[read:] = self._silence[:size - read]
+        if self._gain != 1.0:
+            self._gain_buffer.apply(out, self._sample_width, self._gain)
+        # PyAudio принимает из callback только неизменяемые байты
+        return out.tobytes(), CONTINUE
+
     def run(self):
-        while self._current_time <= len(self._segment) and not self.is_aborted:
-            if not self._is_paused:
-                data = self._segment[
-                    self._current_time:self._current_time+CHUNK_DURATION]._data
-                self._current_time += CHUNK_DURATION
-            else:
-                free = self._stream.get_write_available()
-                data = chr(0) * free
-            self._stream.write(data)
-
-        self._stream.stop_stream()
-        self._audio.terminate()
+        while True:
+            self._stream.start_stream()
+            self._finished.wait()
+            self._stream.stop_stream()
+            self._stream.close()
+            if self.is_aborted or not self._reopen():
+                break
+        self._backend.terminate()
@@ -0,0 +1,115 @@
+"""Нарезка образа диска по CUESHEET за один проход декодирования:
+фреймы идут подряд, а их части раздаются WAV файлам треков
+"""
+import os
+from typing import Callable, Generator, Iterable, List, Optional, Tuple
+
+from .meta import Flac, Frame
+from .meta.blocks import CueSheet
+from .wav import WAVE_FORMAT_IEEE_FLOAT, WAVE_FORMAT_PCM, WavWriter
+
+
+class TrackRange:
+    """Сэмплы [start, end) аудиотрека
+    """
+    def __init__(self, number: int, start: int, end: int):
+        self.number = number
+        self.start = start
+        self.end = end
+
+    def __repr__(self):
+        return 'TrackRange({}, {}, {})'.format(
+            self.number, self.start, self.end)
+
+
+def track_ranges(cuesheet: CueSheet, total_samples: int = 0
+                 ) -> List[TrackRange]:
+    """Диапазоны аудиотреков. Трек длится до начала (INDEX 01)
+    следующего, последний - до lead-out. Треки данных пропускаются
+    """
+    tracks = cuesheet.tracks[:-1]
+    if not tracks:
+        return []
+    ends = [t.start for t in tracks[1:]] + [cuesheet.lead_out.offset]
+    ranges = []
+    for track, end in zip(tracks, ends):
+        if total_samples:
+            end = min(end, total_samples)
+        if not track.is_audio or end <= track.start:
+            continue
+        ranges.append(TrackRange(track.number, track.start, end))
+    return ranges
+
+
+def route_frames(frames: Iterable[Frame], ranges: List[TrackRange]
+                 ) -> Generator[Tuple[TrackRange, Frame], None, None]:
+    """Разложить подряд идущие фреймы по трекам: (трек, часть фрейма).
+    Фрейм на границе треков режется на части, сэмплы вне треков
+    отбрасываются. Останавливается после конца последнего трека
+    """
+    i = 0
+    for frame in frames:
+        frame_start = frame.sample_offset
+        frame_end = frame_start + frame.block_size
+        while i < len(ranges):
+            track = ranges[i]
+            if track.end <= frame_start:
+                i += 1
+                continue
+            if track.start >= frame_end:
+                break
+            if track.start <= frame_start and frame_end <= track.end:
+                yield track, frame
+            else:
+                yield track, frame.slice(track.start - frame_start,
+                                         track.end - frame_start)
+            if track.end > frame_end:
+                break
+            i += 1
+        if i == len(ranges):
+            return
+
+
+def split_file(flac: Flac, directory: str,
+               name: Callable[[TrackRange], str] = None,
+               progress: Optional[Callable[[Frame], None]] = None
+               ) -> List[str]:
+    """Записать аудиотреки из CUESHEET в отдельные WAV файлы каталога
+    directory. Файл декодируется один раз, от начала первого трека до
+    конца последнего. Возвращает пути записанных файлов
+    """
+    cuesheet = flac.cuesheet
+    if cuesheet is None:
+        raise ValueError('File has no CUESHEET block')
+    ranges = track_ranges(cuesheet, flac.total_samples)
+    if not ranges:
+        return []
+    name = name or (lambda track: '{:02}.wav'.format(track.number))
+
+    fmt = flac.pcm_format
+    audio_format = WAVE_FORMAT_IEEE_FLOAT if fmt.is_float \
+        else WAVE_FORMAT_PCM
+    paths = []
+    current, f, wav = None, None, None
+    try:
+        frames = flac.read_range(ranges[0].start, ranges[-1].end)
+        for track, part in route_frames(frames, ranges):
+            if track is not current:
+                if f is not None:
+                    wav.close()
+                    f.close()
+                current = track
+                paths.append(os.path.join(directory, name(track)))
+                f = open(paths[-1], 'wb')
+                wav = WavWriter(f, flac.channels, flac.sample_rate,
+                                fmt.bits, track.end - track.start,
+                                audio_format)
+            wav.write(part.data)
+            if progress is not None:
+                progress(part)
+        if f is not None:
+            wav.close()
+    finally:
+        if f is not None:
+            f.close()
+    return paths
@@ -0,0 +1,100 @@
+import hashlib
+import os
+from binascii import hexlify
+from concurrent.futures import ProcessPoolExecutor
+from time import perf_counter
+from typing import Iterable, Iterator, List, Optional
+
+from .meta import Flac
+from .meta.pcm import md5_format
+
+
+class VerifyResult:
+    def __init__(self, path: str):
+        self.path = path
+        self.size = 0
+        self.frames = 0
+        self.samples = 0
+        self.expected_samples = 0
+        self.crc_errors = []  # type: List[int]
+        self.md5 = None  # type: Optional[str]
+        self.expected_md5 = None  # type: Optional[str]
+        self.error = None  # type: Optional[str]
+        self.seconds = 0.0
+
+    @property
+    def md5_ok(self) -> Optional[bool]:
+        """None, если MD5 не записан в STREAMINFO или не считался
+        """
+        if self.expected_md5 is None or self.md5 is None:
+            return None
+        return self.md5 == self.expected_md5
+
+    @property
+    def ok(self) -> bool:
+        return (self.error is None and not self.crc_errors and
+                self.md5_ok is not False and
+                self.expected_samples in (0, self.samples))
+
+    def __str__(self):
+        if self.ok:
+            return '{}: OK'.format(self.path)
+        problems = []
+        if self.error is not None:
+            problems.append(self.error)
+        if self.crc_errors:
+            problems.append('CRC mismatch in {} frames, first at byte {}'
+                            .format(len(self.crc_errors), self.crc_errors[0]))
+        if self.md5_ok is False:
+            problems.append('MD5 mismatch')
+        if self.expected_samples not in (0, self.samples):
+            problems.append('{} of {} samples decoded'.format(
+                self.samples, self.expected_samples))
+        return '{}: FAILED ({})'.format(self.path, '; '.join(problems))
+
+
+def verify_file(path: str, check_md5: bool = True) -> VerifyResult:
+    """Проверить CRC-8/CRC-16 всех фреймов и MD5 декодированного PCM
+    """
+    result = VerifyResult(path)
+    start = perf_counter()
+    try:
+        result.size = os.path.getsize(path)
+        flac = Flac(path)
+        info = flac._streaminfo
+        result.expected_samples = info.total_samples
+        if any(info.md5):
+            result.expected_md5 = hexlify(info.md5).decode()
+
+        md5 = hashlib.md5() if check_md5 else None
+        flac.pcm_format = md5_format(flac.sample_width)
+        for frame in flac.iter_frames(check_crc=True):
+            result.frames += 1
+            result.samples += frame.block_size
+            if not frame.crc_ok:
+                result.crc_errors.append(frame.byte_offset)
+            if md5 is not None:
+                md5.update(frame.data)
+        if md5 is not None:
+            result.md5 = md5.hexdigest()
+    except Exception as e:
+        result.error = '{}: {}'.format(type(e).__name__, e)
+    result.seconds = perf_counter() - start
+    return result
+
+
+def verify_files(paths: Iterable[str], workers: Optional[int] = None,
+                 check_md5: bool = True) -> Iterator[VerifyResult]:
+    """Проверить файлы в пуле процессов. Результаты отдаются в порядке
+    paths. При workers=1 файлы проверяются в текущем процессе
+    """
+    paths = list(paths)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        for path in paths:
+            yield verify_file(path, check_md5)
+        return
+
+    with ProcessPoolExecutor(workers) as executor:
+        yield from executor.map(verify_file, paths,
+                                [check_md5] * len(paths))
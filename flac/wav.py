@@ -0,0 +1,48 @@
+from struct import pack
+from typing import BinaryIO
+
+HEADER_SIZE = 44
+WAVE_FORMAT_PCM = 0x0001
+WAVE_FORMAT_IEEE_FLOAT = 0x0003
+
+
+def wav_header(channels: int, sample_rate: int, bits_per_sample: int,
+               data_len: int, audio_format: int = WAVE_FORMAT_PCM) -> bytes:
+    """Заголовок WAV (RIFF, fmt и data) для data_len байт данных
+    """
+    byte_width = (bits_per_sample + 7) // 8
+    return b''.join([
+        b'RIFF', pack('<I', data_len + 36), b'WAVE',
+        b'fmt ', pack('<IHHIIHH', 16, audio_format, channels, sample_rate,
+                      sample_rate * channels * byte_width,
+                      channels * byte_width, bits_per_sample),
+        b'data', pack('<I', data_len),
+    ])
+
+
+class WavWriter:
+    """Запись WAV файла. Размер данных в заголовке задаётся заранее по
+    числу сэмплов, а если записано другое число байт (длина потока не
+    была известна), заголовок исправляется при закрытии
+    """
+    def __init__(self, f: BinaryIO, channels: int, sample_rate: int,
+                 bits_per_sample: int, total_samples: int = 0,
+                 audio_format: int = WAVE_FORMAT_PCM):
+        self._f = f
+        self._data_len = total_samples * channels * \
+            ((bits_per_sample + 7) // 8)
+        self.written = 0
+        f.write(wav_header(channels, sample_rate, bits_per_sample,
+                           self._data_len, audio_format))
+
+    def write(self, data: bytes):
+        self._f.write(data)
+        self.written += len(data)
+
+    def close(self):
+        if self.written != self._data_len:
+            self._f.seek(4)
+            self._f.write(pack('<I', self.written + 36))
+            self._f.seek(HEADER_SIZE - 4)
+            self._f.write(pack('<I', self.written))
+            self._f.seek(0, 2)
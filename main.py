@@ -1,49 +1,97 @@
 import os
 import pickle
 import sys
-from binascii import hexlify
-from mimetypes import guess_extension
+from mimetypes import guess_extension, guess_type
 from os.path import isdir, isfile, join
-from struct import pack
-from time import sleep
-from typing import Generator, List, Tuple
+from time import perf_counter, sleep
+from typing import Generator, List, Optional, Tuple
 
 from npyscreen import blank_terminal
 
 from flac.argparser import make_parser
-from flac.meta import BitStream, Flac
+from flac.dump import dump_frames
+from flac.library import Library
+from flac.meta import FORMATS, BitStream, DecodeStats, Flac, Frame
+from flac.meta.writer import MetadataEditor, edit_files
 from flac.player import PlayerApp
-from flac.song import Song
-
-
-def convert_to_wav(flac: Flac, wav_filename):
-    with open(wav_filename, 'wb') as wav:
-        wav.write(b'RIFF')
-        byte_width = flac.sample_width // 8
-        data_len = flac.total_samples * flac.channels * (byte_width)
-        wav.write(pack('<I', data_len + 36))
-        wav.write(b'WAVE')
-        wav.write(b'fmt ')
-        wav.write(pack(
-            '<IHHIIHH', 16, 0x0001, flac.channels, flac.sample_rate,
-            flac.sample_rate * flac.channels * (byte_width),
-            flac.channels * (byte_width), flac.sample_width))
-        wav.write(b'data')
-        wav.write(pack('<I', data_len))
-
-        for i, chunk in enumerate(flac.data):
-            if i % 20 == 0:
-                progress = int(flac._f.tell() / flac.size * 100)
-                print('{}%'.format(progress), end='\r')
-            wav.write(chunk)
-
-
-def retrieve_data(flac: Flac):
+from flac.playlist import Playlist
+from flac.split import split_file, track_ranges
+from flac.verify import verify_files
+from flac.wav import WAVE_FORMAT_IEEE_FLOAT, WAVE_FORMAT_PCM, WavWriter
+
+
+def convert_to_wav(flac: Flac, wav_filename, jobs: int = 1,
+                   start: int = 0, end: Optional[int] = None):
+    # поток (stdin) декодируется только последовательно
+    if jobs > 1 and flac._filename is not None:
+        frames = flac.decode_parallel(jobs, start=start, end=end)
+    else:
+        frames = flac.read_range(start, end)
+    total = (end or flac.total_samples) - start
+
+    fmt = flac.pcm_format
+    with open(wav_filename, 'wb') as f:
+        wav = WavWriter(f, flac.channels, flac.sample_rate, fmt.bits,
+                        max(total, 0), WAVE_FORMAT_IEEE_FLOAT
+                        if fmt.is_float else WAVE_FORMAT_PCM)
+        for frame in frames:
+            print(format_progress(flac, frame, start, end), end='\r')
+            wav.write(frame.data)
+        wav.close()
+
+
+def format_progress(flac: Flac, frame: Frame, start: int = 0,
+                    end: Optional[int] = None) -> str:
+    """Прогресс по сэмплам, а если их число неизвестно - по байтам
+    файла или просто декодированные секунды
+    """
+    decoded = frame.sample_offset + frame.block_size
+    total = end or flac.total_samples
+    if total > start:
+        return '{}%'.format(int((decoded - start) / (total - start) * 100))
+    if flac.size:
+        return '{}%'.format(int(frame.byte_offset / flac.size * 100))
+    return '{:.1f}s'.format(decoded / flac.sample_rate)
+
+
+def seconds_to_samples(flac: Flac, seconds: Optional[float]
+                       ) -> Optional[int]:
+    if seconds is None:
+        return None
+    return int(round(seconds * flac.sample_rate))
+
+
+def retrieve_data(flac: Flac, raw: bool = False, start: int = 0,
+                  end: Optional[int] = None,
+                  channels: Optional[List[int]] = None):
+    sys.stdout.flush()
     try:
-        for chunk in flac.data:
-            sys.stdout.write(hexlify(chunk).decode())
-    except IOError:
-        pass
+        dump_frames(flac.read_range(start, end), sys.stdout.buffer, raw,
+                    channels)
+    except BrokenPipeError:
+        # читатель закрыл pipe: не ругаться ещё раз при выходе
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+
+
+def split_tracks(flac: Flac, path: str):
+    if flac.cuesheet is None:
+        print('File has no CUESHEET')
+        return
+    os.makedirs(path, exist_ok=True)
+    # прогресс - по сэмплам записываемых треков, а не всего файла
+    total = sum(t.end - t.start
+                for t in track_ranges(flac.cuesheet, flac.total_samples))
+    written = 0
+
+    def progress(part: Frame):
+        nonlocal written
+        written += part.block_size
+        print('{}%'.format(int(written / total * 100)), end='\r')
+
+    start = perf_counter()
+    paths = split_file(flac, path, progress=progress)
+    print()
+    print('{} tracks ({:.1f}s)'.format(len(paths), perf_counter() - start))
 
 
 def extract_covers(flac: Flac, path: str):
@@ -61,6 +109,62 @@ def extract_covers(flac: Flac, path: str):
             f.write(pic.image_data)
 
 
+def scan_library(path: str, cache: str, jobs: Optional[int]):
+    if not isdir(path):
+        print("Directory doesn't exist")
+        return
+
+    library = Library(cache)
+    start = perf_counter()
+    result = library.scan(path, jobs)
+    print('{} ({:.1f}s)'.format(result, perf_counter() - start))
+    library.close()
+
+
+def check_files(paths: List[str], jobs: Optional[int], check_md5: bool):
+    start = perf_counter()
+    size, failed = 0, 0
+    for result in verify_files(paths, jobs, check_md5):
+        print(result)
+        size += result.size
+        failed += not result.ok
+    seconds = perf_counter() - start
+    print('{} files, {} failed, {:.1f} MB in {:.1f}s ({:.2f} MB/s)'.format(
+        len(paths), failed, size / 1e6, seconds,
+        size / 1e6 / seconds if seconds else 0))
+    if failed:
+        sys.exit(1)
+
+
+def edit_tags(args):
+    sets, adds = args.set, args.add
+    cover = None
+    if args.cover is not None:
+        with open(args.cover, 'rb') as f:
+            cover = f.read()
+        mime_type = guess_type(args.cover)[0] or 'image/jpeg'
+
+    def edit(editor: MetadataEditor):
+        for tag in args.remove:
+            editor.remove_tag(tag)
+        for tag in {tag for tag, _ in sets}:
+            editor.set_tag(tag, [v for t, v in sets if t == tag])
+        for tag, value in adds:
+            editor.add_tag(tag, value)
+        if args.remove_covers:
+            editor.remove_pictures()
+        if cover is not None:
+            editor.remove_pictures(3)
+            editor.add_picture(cover, mime_type)
+
+    failed = 0
+    for result in edit_files(args.files, edit, args.jobs, args.padding):
+        print(result)
+        failed += not result.ok
+    if failed:
+        sys.exit(1)
+
+
 def print_all_meta(flac: Flac):
     print(str(flac._streaminfo) + '\n')
     for b in flac.metadata_blocks:
@@ -82,16 +186,35 @@ def print_tags_info(flac: Flac):
         print(str(b) + '\n')
 
 
+def print_cuesheet(flac: Flac):
+    if flac.cuesheet is not None:
+        print(flac.cuesheet)
+
+
 def print_streaminfo(flac: Flac):
     print(flac._streaminfo)
 
 
+def play_files(paths: List[str], use_mmap: bool):
+    missing = [path for path in paths if not isfile(path)]
+    if missing:
+        print("Flac file doesn't exist: " + ', '.join(missing))
+        return
+    playlist = Playlist(paths,
+                        opener=lambda path: Flac(path, use_mmap=use_mmap))
+    app = PlayerApp(playlist)
+    sleep(3)
+    os.system('clear')
+    app.run()
+
+
 meta_commands = {
     'all': print_all_meta,
     'info': print_streaminfo,
     'app': print_application_info,
     'pic': print_covers_info,
-    'tags': print_tags_info
+    'tags': print_tags_info,
+    'cue': print_cuesheet
 }
 
 
@@ -99,30 +222,59 @@ def main():
     parser = make_parser()
     args = parser.parse_args()
 
-    if not isfile(args.flac_file):
-        print("Flac file doesn't exist")
+    if args.command == 'scan':
+        scan_library(args.dir, args.cache, args.jobs)
         return
 
-    flac = Flac(args.flac_file)
+    if args.command == 'verify':
+        check_files(args.files, args.jobs, not args.no_md5)
+        return
+
+    if args.command == 'tag':
+        edit_tags(args)
+        return
 
     if args.command == 'play':
-        song = Song(flac)
-        app = PlayerApp(song)
-        sleep(3)
-        os.system('clear')
-        app.run()
+        play_files(args.flac_files, args.mmap)
+        return
+
+    if args.flac_file == '-':
+        flac = Flac.from_stream(sys.stdin.buffer)
+    elif not isfile(args.flac_file):
+        print("Flac file doesn't exist")
+        return
+    else:
+        flac = Flac(args.flac_file, use_mmap=args.mmap)
 
     if args.command == 'covers':
         extract_covers(flac, args.dir)
 
+    if args.command == 'split':
+        split_tracks(flac, args.dir)
+
     if args.command == 'meta':
         meta_commands[args.type](flac)
 
+    if args.command in ('conv', 'retr') and args.profile:
+        flac.stats = DecodeStats()
+
     if args.command == 'conv':
-        convert_to_wav(flac, args.wav_file)
+        if args.format is not None:
+            flac.pcm_format = FORMATS[args.format]
+        # статистика собирается только в текущем процессе
+        convert_to_wav(flac, args.wav_file,
+                       1 if args.profile else args.jobs,
+                       seconds_to_samples(flac, args.start) or 0,
+                       seconds_to_samples(flac, args.end))
+        print()
 
     if args.command == 'retr':
-        retrieve_data(flac)
+        retrieve_data(flac, args.raw,
+                      seconds_to_samples(flac, args.start) or 0,
+                      seconds_to_samples(flac, args.end), args.channels)
+
+    if flac.stats is not None:
+        print(flac.stats, file=sys.stderr)
 
 
 if __name__ == '__main__':
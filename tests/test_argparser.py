@@ -0,0 +1,22 @@
+import io
+import unittest
+from contextlib import redirect_stderr
+
+from flac.argparser import make_parser
+
+
+class TagArgumentsTest(unittest.TestCase):
+    def test_tag_values(self):
+        args = make_parser().parse_args(
+            ['tag', '--set', 'TITLE=a=b', '--add', 'ARTIST=', 'x.flac'])
+
+        self.assertEqual(args.set, [('TITLE', 'a=b')])
+        self.assertEqual(args.add, [('ARTIST', '')])
+
+    def test_malformed_value_is_usage_error(self):
+        stderr = io.StringIO()
+        with redirect_stderr(stderr), self.assertRaises(SystemExit) as e:
+            make_parser().parse_args(['tag', '--set', 'BAD', 'x.flac'])
+
+        self.assertEqual(e.exception.code, 2)
+        self.assertIn('expected TAG=VALUE', stderr.getvalue())
@@ -0,0 +1,89 @@
+import asyncio
+import os
+import shutil
+import tempfile
+import unittest
+
+from flac.meta import AsyncFlac
+from flac.meta.engine import PythonEngine
+
+from benchmarks import encoder
+
+
+class CountingEngine(PythonEngine):
+    def __init__(self):
+        self.packed = 0
+
+    def pack(self, channels, bits_per_sample: int, fmt) -> bytes:
+        self.packed += 1
+        return super().pack(channels, bits_per_sample, fmt)
+
+
+class AsyncFlacTest(unittest.TestCase):
+    def setUp(self):
+        self.channels = encoder.make_signal(8000)
+        self.data = encoder.encode(self.channels, block_size=512)
+
+    def feed(self, reader: asyncio.StreamReader, chunk: int = 700):
+        async def feed():
+            for i in range(0, len(self.data), chunk):
+                reader.feed_data(self.data[i:i + chunk])
+                await asyncio.sleep(0)
+            reader.feed_eof()
+        return asyncio.ensure_future(feed())
+
+    def test_frames_from_stream_reader(self):
+        async def decode():
+            reader = asyncio.StreamReader()
+            feeder = self.feed(reader)
+            flac = await AsyncFlac.from_reader(reader)
+            self.assertEqual(flac.sample_rate, 44100)
+            result = [frame.data async for frame in flac.frames()]
+            await feeder
+            return b''.join(result)
+
+        self.assertEqual(asyncio.run(decode()),
+                         encoder.pcm(self.channels, 16))
+
+    def test_frames_from_file(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        filename = os.path.join(directory, 'test.flac')
+        with open(filename, 'wb') as f:
+            f.write(self.data)
+
+        async def decode():
+            flac = await AsyncFlac.open(filename)
+            return b''.join([frame.data async for frame in flac.frames()])
+
+        self.assertEqual(asyncio.run(decode()),
+                         encoder.pcm(self.channels, 16))
+
+    def test_backpressure_and_early_exit(self):
+        engine = CountingEngine()
+
+        async def decode():
+            reader = asyncio.StreamReader()
+            feeder = self.feed(reader)
+            flac = await AsyncFlac.from_reader(reader, engine=engine,
+                                               queue_size=2)
+            frames = flac.frames()
+            await frames.__anext__()
+            await asyncio.sleep(0.2)
+            decoded = engine.packed
+            await frames.aclose()
+            await feeder
+            return decoded
+
+        # один отданный фрейм, два в очереди и один ждёт места в ней
+        self.assertLessEqual(asyncio.run(decode()), 4)
+
+    def test_decoding_errors_should_propagate(self):
+        async def decode():
+            reader = asyncio.StreamReader()
+            reader.feed_data(b'RIFF' + bytes(100))
+            reader.feed_eof()
+            await AsyncFlac.from_reader(reader)
+
+        with self.assertRaises(ValueError):
+            asyncio.run(decode())
@@ -2,7 +2,7 @@ import unittest
 import io
 import struct
 
-from flac.meta import BitStream
+from flac.meta import BitStream, BufferedBitStream
 
 
 class BitStreamTest(unittest.TestCase):
@@ -55,3 +55,96 @@ class BitStreamTest(unittest.TestCase):
         stream = BitStream(io.BytesIO(data))
 
         self.assertEqual(stream.read_sint(8), -12)
+
+
+class BufferedBitStreamTest(unittest.TestCase):
+    def setUp(self):
+        data = struct.pack('>BBB', 0b11100101, 0b01100001, 0b00001111)
+        self.stream = BufferedBitStream(io.BytesIO(data))
+
+    def test_read_uint(self):
+        self.assertEqual(self.stream.read_uint(3), 0b111)
+        self.assertEqual(self.stream.read_uint(8), 0b00101011)
+        self.assertEqual(self.stream.read_uint(1), 0)
+
+    def test_read_byte_should_align_on_byte(self):
+        self.stream.read_uint(5)
+        self.assertEqual(self.stream.read_byte(), 0b01100001)
+        self.assertEqual(self.stream.read_byte(), 0b00001111)
+        self.assertEqual(self.stream.read_byte(), -1)
+
+    def test_reading_rice_encoded_int(self):
+        data = 0b00001010101010111000010111010000.to_bytes(4, byteorder='big')
+        stream = BufferedBitStream(io.BytesIO(data))
+
+        self.assertEqual(stream.read_rice_int(4), -35)
+        self.assertEqual(stream.read_rice_int(4), -11)
+        self.assertEqual(stream.read_rice_int(4), +4)
+        self.assertEqual(stream.read_rice_int(4), -12)
+        self.assertEqual(stream.read_rice_int(4), 8)
+
+    def test_reading_bytes(self):
+        stream = BufferedBitStream(io.BytesIO(b'bytes and more bytes'))
+        stream.read_uint(3)
+
+        self.assertEqual(stream.read_bytes(4), b'ytes')
+        self.assertEqual(stream.read_uint(8), ord(' '))
+        self.assertEqual(stream.read_bytes(15), b'and more bytes')
+
+    def test_reading_signed_int(self):
+        data = (-12).to_bytes(1, byteorder='big', signed=True)
+        stream = BufferedBitStream(io.BytesIO(data))
+
+        self.assertEqual(stream.read_sint(8), -12)
+
+    def test_reading_past_end_should_raise_eof(self):
+        self.stream.read_uint(20)
+        with self.assertRaises(EOFError):
+            self.stream.read_uint(5)
+
+    def test_should_match_bit_stream_across_chunks(self):
+        data = bytes((i * 37 + 11) & 0xFF for i in range(1000))
+        expected = BitStream(io.BytesIO(data))
+        actual = BufferedBitStream(io.BytesIO(data), chunk_size=7)
+
+        for i in range(300):
+            n = i % 33
+            self.assertEqual(actual.read_uint(n), expected.read_uint(n))
+            if i % 50 == 0:
+                self.assertEqual(actual.read_bytes(3),
+                                 expected.read_bytes(3))
+            if i % 7 == 0:
+                self.assertEqual(actual.read_rice_int(3),
+                                 expected.read_rice_int(3))
+
+    def test_find_and_seek(self):
+        data = b'abc\xff\xf8def\xff\xf9'
+        for chunk_size in [1, 4, 1 << 16]:
+            stream = BufferedBitStream(io.BytesIO(data), chunk_size)
+            stream.read_uint(3)
+
+            self.assertTrue(stream.find(b'\xff\xf8'))
+            self.assertEqual(stream.tell(), 3)
+            self.assertEqual(stream.read_uint(16), 0xfff8)
+            self.assertTrue(stream.find(b'\xff'))
+            self.assertEqual(stream.tell(), 8)
+            self.assertFalse(stream.find(b'\xfa'))
+
+            stream.seek(1)
+            self.assertEqual(stream.read_bytes(2), b'bc')
+            self.assertEqual(stream.tell(), 3)
+
+    def test_capture_across_chunks(self):
+        data = bytes(range(40))
+        for chunk_size in [1, 3, 16, 1 << 16]:
+            stream = BufferedBitStream(io.BytesIO(data), chunk_size)
+            stream.read_uint(12)
+            stream._clear_buffer()
+            stream.start_capture()
+            stream.read_uint(6)
+            for _ in range(10):
+                stream.read_uint(13)
+            stream._clear_buffer()
+
+            self.assertEqual(stream.end_capture(), data[2:19], chunk_size)
+            self.assertEqual(stream.read_uint(8), 19)
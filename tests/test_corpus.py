@@ -0,0 +1,23 @@
+import shutil
+import tempfile
+import unittest
+
+from benchmarks.corpus import CASES, build_corpus
+from flac.verify import verify_file
+
+
+class CorpusTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_corpus_should_decode(self):
+        corpus = build_corpus(self.dir, seconds=0.03)
+
+        self.assertEqual(len(corpus), len(CASES))
+        for file in corpus:
+            result = verify_file(file.filename)
+            self.assertTrue(result.ok and result.md5_ok, str(result))
+            self.assertEqual(result.samples, file.samples)
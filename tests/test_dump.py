@@ -0,0 +1,56 @@
+import io
+import unittest
+from binascii import hexlify
+
+from flac.dump import dump_frames
+from flac.meta import Frame
+
+
+class CountingWriter(io.BytesIO):
+    def __init__(self):
+        super().__init__()
+        self.writes = 0
+
+    def write(self, data):
+        self.writes += 1
+        return super().write(data)
+
+
+def make_frame(sample_offset: int, samples, channels: int = 3) -> Frame:
+    data = b''.join(s.to_bytes(2, 'little', signed=True) for s in samples)
+    return Frame(data, sample_offset, len(samples) // channels, 0, channels,
+                 2)
+
+
+class DumpTest(unittest.TestCase):
+    def setUp(self):
+        self.frames = [make_frame(0, range(-6, 6)),
+                       make_frame(4, range(100, 112))]
+        self.data = b''.join(f.data for f in self.frames)
+
+    def test_hex(self):
+        out = CountingWriter()
+        written = dump_frames(self.frames, out)
+
+        self.assertEqual(out.getvalue(), hexlify(self.data))
+        self.assertEqual(written, len(self.data) * 2)
+        self.assertEqual(out.writes, 1)
+
+    def test_raw_is_written_in_large_chunks(self):
+        out = CountingWriter()
+        dump_frames(self.frames * 10, out, raw=True, buffer_size=100)
+
+        self.assertEqual(out.getvalue(), self.data * 10)
+        self.assertEqual(out.writes, 4)
+
+    def test_channels(self):
+        out = io.BytesIO()
+        dump_frames(self.frames, out, raw=True, channels=[2, 0])
+
+        expected = make_frame(0, [-4, -6, -1, -3, 2, 0, 5, 3,
+                                  102, 100, 105, 103, 108, 106, 111, 109])
+        self.assertEqual(out.getvalue(), expected.data)
+
+    def test_bad_channel(self):
+        with self.assertRaises(ValueError):
+            dump_frames(self.frames, io.BytesIO(), channels=[3])
@@ -0,0 +1,129 @@
+import random
+import unittest
+from array import array
+
+from flac.meta.engine import ArrayEngine, NumpyEngine, PythonEngine, numpy
+from flac.meta.pcm import FORMATS, S16LE, U8, container_format, md5_format
+
+
+class PythonEngineTest(unittest.TestCase):
+    def setUp(self):
+        self.engine = PythonEngine()
+
+    def test_left_side(self):
+        self.assertEqual(self.engine.decorrelate(8, [5, -3], [2, -4]),
+                         [[5, -3], [3, 1]])
+
+    def test_right_side(self):
+        self.assertEqual(self.engine.decorrelate(9, [2, -4], [3, 1]),
+                         [[5, -3], [3, 1]])
+
+    def test_mid_side(self):
+        self.assertEqual(self.engine.decorrelate(10, [4, -1], [2, -4]),
+                         [[5, -3], [3, 1]])
+
+    def test_shift(self):
+        self.assertEqual(self.engine.shift([1, -2, 0], 3), [8, -16, 0])
+
+    def test_pack(self):
+        self.assertEqual(self.engine.pack([[1, -2], [256, 3]], 16, S16LE),
+                         b'\x01\x00\x00\x01\xfe\xff\x03\x00')
+        self.assertEqual(self.engine.pack([[-128, 127]], 8, U8), b'\x00\xff')
+
+
+@unittest.skipIf(numpy is None, 'numpy is not installed')
+class NumpyEngineTest(unittest.TestCase):
+    def setUp(self):
+        rnd = random.Random(7)
+        self.first = [rnd.randint(-2 ** 23, 2 ** 23 - 1) for _ in range(500)]
+        self.second = [rnd.randint(-2 ** 23, 2 ** 23 - 1)
+                       for _ in range(500)]
+        self.expected = PythonEngine()
+        self.actual = NumpyEngine()
+
+    def test_decorrelation_should_match_python_engine(self):
+        for channel_assigment in [8, 9, 10]:
+            expected = self.expected.decorrelate(
+                channel_assigment, self.first, self.second)
+            actual = self.actual.decorrelate(
+                channel_assigment, self.first, self.second)
+
+            self.assertEqual([c.tolist() for c in actual], expected)
+
+    def test_shift_should_match_python_engine(self):
+        self.assertEqual(self.actual.shift(self.first, 5).tolist(),
+                         self.expected.shift(self.first, 5))
+
+    def test_pack_should_match_python_engine(self):
+        for bits in [8, 12, 16, 20, 24, 32]:
+            channels = [[s >> (24 - min(bits, 24)) for s in self.first],
+                        [s >> (24 - min(bits, 24)) for s in self.second]]
+            for fmt in [container_format(bits)] + list(FORMATS.values()):
+                self.assertEqual(self.actual.pack(channels, bits, fmt),
+                                 self.expected.pack(channels, bits, fmt),
+                                 (bits, fmt))
+
+
+class ArrayEngineTest(unittest.TestCase):
+    def setUp(self):
+        rnd = random.Random(3)
+        self.first = [rnd.randint(-2 ** 15, 2 ** 15 - 1) for _ in range(300)]
+        self.second = [rnd.randint(-2 ** 15, 2 ** 15 - 1)
+                       for _ in range(300)]
+        self.expected = PythonEngine()
+        self.engine = ArrayEngine()
+        self.engine.reserve(300, 16)
+
+    def test_blocks_should_reuse_buffers(self):
+        self.engine.start_frame(300, 2)
+        first = self.engine.verbatim(self.first)
+        self.engine.start_frame(300, 1)
+        constant = self.engine.constant(5, 10)
+
+        self.assertIs(first.obj, constant.obj)
+        self.assertEqual(first[:10].tolist(), [5] * 10)
+
+    def test_restore_should_match_python_engine(self):
+        residuals = array('i', [s >> 10 for s in self.second[:40]])
+        for order in range(5):
+            self.engine.start_frame(300, 1)
+            self.assertEqual(
+                self.engine.restore_fixed(self.first[:order],
+                                          residuals[order - 4:]).tolist(),
+                self.expected.restore_fixed(self.first[:order],
+                                            residuals[order - 4:]))
+        self.engine.start_frame(300, 1)
+        self.assertEqual(
+            self.engine.restore_lpc(self.first[:4], [3, -2, 1, 1], 2,
+                                    residuals).tolist(),
+            self.expected.restore_lpc(self.first[:4], [3, -2, 1, 1], 2,
+                                      residuals))
+
+    def test_decorrelate_and_shift_in_place(self):
+        for channel_assigment in [8, 9, 10]:
+            self.engine.start_frame(300, 2)
+            blocks = self.engine.decorrelate(
+                channel_assigment, self.engine.verbatim(self.first),
+                self.engine.shift(self.engine.verbatim(self.second), 1))
+
+            self.assertEqual(
+                [b.tolist() for b in blocks],
+                self.expected.decorrelate(
+                    channel_assigment, self.first,
+                    self.expected.shift(self.second, 1)))
+
+    def test_pack_should_match_python_engine(self):
+        for bits in [8, 12, 16, 20, 24, 32]:
+            engine = ArrayEngine()
+            engine.reserve(300, bits)
+            channels = [[s >> (24 - min(bits, 24)) for s in self.first],
+                        [s >> (24 - min(bits, 24)) for s in self.second]]
+            formats = list(FORMATS.values()) + [container_format(bits),
+                                                md5_format(bits)]
+            for fmt in formats:
+                engine.start_frame(300, 2)
+                blocks = [engine.verbatim(c) for c in channels]
+
+                self.assertEqual(engine.pack(blocks, bits, fmt),
+                                 self.expected.pack(channels, bits, fmt),
+                                 (bits, fmt))
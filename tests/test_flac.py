@@ -0,0 +1,371 @@
+import io
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+from flac.meta import Flac
+from flac.meta.engine import ArrayEngine
+
+from benchmarks import encoder
+
+
+class NonSeekable(io.RawIOBase):
+    def __init__(self, data: bytes):
+        self._data = io.BytesIO(data)
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        return self._data.readinto(b)
+
+
+class FlacTestCase(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def write_flac(self, channels, name: str = 'test.flac', **kwargs) -> str:
+        """Закодировать channels в файл name, kwargs - параметры
+        encoder.encode
+        """
+        return self.write_file(encoder.encode(channels, **kwargs), name)
+
+    def write_file(self, data: bytes, name: str = 'test.flac') -> str:
+        """Записать готовые байты, например испорченный flac
+        """
+        filename = os.path.join(self.dir, name)
+        with open(filename, 'wb') as f:
+            f.write(data)
+        return filename
+
+    def decoded_frames(self, flac: Flac) -> list:
+        decoded = []
+        decode_frame = flac._decode_frame
+
+        def counting_decode_frame(*args):
+            result = decode_frame(*args)
+            decoded.append(result[0].sample_offset)
+            return result
+        flac._decode_frame = counting_decode_frame
+        return decoded
+
+
+class DecodeTest(FlacTestCase):
+    engine = None
+
+    def open(self, filename: str) -> Flac:
+        return Flac(filename, self.engine() if self.engine else None)
+
+    def test_subframe_types_and_stereo_modes(self):
+        channels = encoder.make_signal(2000)
+        for subframe in ['verbatim', 'fixed0', 'fixed1', 'fixed2',
+                         'fixed3', 'fixed4', 'lpc1', 'lpc8', 'lpc32']:
+            for stereo in ['independent', 'left_side', 'right_side',
+                           'mid_side']:
+                filename = self.write_flac(
+                    channels, subframe=subframe, stereo=stereo,
+                    block_size=576, partition_order=2)
+                flac = self.open(filename)
+
+                self.assertEqual(b''.join(flac.data),
+                                 encoder.pcm(channels, 16),
+                                 (subframe, stereo))
+
+    def test_sample_widths_with_wasted_bits(self):
+        for bits in [8, 16, 24]:
+            channels = [[(s >> 2) << 2 for s in c]
+                        for c in encoder.make_signal(1500, 2, bits)]
+            filename = self.write_flac(
+                channels, bits_per_sample=bits, block_size=1000,
+                wasted=True, escape=True, partition_order=1)
+
+            self.assertEqual(b''.join(self.open(filename).data),
+                             encoder.pcm(channels, bits))
+
+    def test_constant_subframes(self):
+        channels = [[7] * 1000, [-300] * 1000]
+        filename = self.write_flac(channels, subframe='constant',
+                                   block_size=300)
+
+        self.assertEqual(b''.join(self.open(filename).data),
+                         encoder.pcm(channels, 16))
+
+
+class ArrayEngineDecodeTest(DecodeTest):
+    engine = ArrayEngine
+
+    def test_iter_blocks_should_reuse_buffers(self):
+        channels = encoder.make_signal(2000)
+        flac = self.open(self.write_flac(channels, block_size=512,
+                                         stereo='mid_side'))
+        buffers = set()
+        decoded = [[], []]
+        for header, blocks in flac.iter_blocks():
+            buffers.update(id(b.obj) for b in blocks)
+            for samples, block in zip(decoded, blocks):
+                samples.extend(block.tolist())
+
+        self.assertEqual(decoded, channels)
+        self.assertEqual(len(buffers), 2)
+
+
+class IterFramesTest(FlacTestCase):
+    def setUp(self):
+        super().setUp()
+        self.channels = encoder.make_signal(5000)
+        self.filename = self.write_flac(self.channels, block_size=1152)
+
+    def test_frames_should_contain_whole_blocks(self):
+        frames = list(Flac(self.filename).iter_frames())
+
+        self.assertEqual([f.sample_offset for f in frames],
+                         [0, 1152, 2304, 3456, 4608])
+        self.assertEqual([f.block_size for f in frames],
+                         [1152, 1152, 1152, 1152, 392])
+        self.assertTrue(all(f.channels == 2 and f.sample_width == 2
+                            for f in frames))
+        self.assertEqual(b''.join(f.data for f in frames),
+                         encoder.pcm(self.channels, 16))
+
+    def test_byte_offsets_should_point_to_frame_headers(self):
+        with open(self.filename, 'rb') as f:
+            content = f.read()
+
+        for frame in Flac(self.filename).iter_frames():
+            self.assertEqual(
+                content[frame.byte_offset:frame.byte_offset + 2],
+                b'\xff\xf8')
+
+    def test_data_should_yield_samples(self):
+        data = list(Flac(self.filename).data)
+
+        self.assertEqual(len(data), 10000)
+        self.assertEqual(data[0], encoder.pcm([[self.channels[0][0]]], 16))
+
+
+class SeekTest(FlacTestCase):
+    def setUp(self):
+        super().setUp()
+        self.channels = encoder.make_signal(20000)
+        self.expected = encoder.pcm(self.channels, 16)
+
+    def test_seek_with_seektable(self):
+        filename = self.write_flac(self.channels, block_size=1024,
+                                   seektable_interval=4096)
+        flac = Flac(filename)
+        self.assertEqual(len(flac.seektable.points), 5)
+        decoded = self.decoded_frames(flac)
+
+        flac.seek(13000)
+        frame = next(flac.iter_frames())
+
+        self.assertEqual(decoded, [12288])
+        self.assertEqual(frame.sample_offset, 13000)
+        self.assertEqual(frame.block_size, 13312 - 13000)
+        self.assertEqual(frame.data, self.expected[13000 * 4:13312 * 4])
+
+    def test_seek_without_seektable(self):
+        filename = self.write_flac(self.channels, block_size=1152)
+        flac = Flac(filename)
+        self.assertIsNone(flac.seektable)
+
+        for sample in [19999, 0, 1152, 7000]:
+            flac.seek(sample)
+            data = b''.join(f.data for f in flac.iter_frames())
+
+            self.assertEqual(data, self.expected[sample * 4:])
+
+    def test_seek_out_of_range(self):
+        flac = Flac(self.write_flac(self.channels))
+
+        with self.assertRaises(ValueError):
+            flac.seek(20000)
+
+
+class ReadRangeTest(FlacTestCase):
+    def setUp(self):
+        super().setUp()
+        self.channels = encoder.make_signal(20000)
+        self.expected = encoder.pcm(self.channels, 16)
+
+    def test_read_range(self):
+        flac = Flac(self.write_flac(self.channels, block_size=1152,
+                                    seektable_interval=4608))
+        decoded = self.decoded_frames(flac)
+
+        for start, end in [(5000, 5001), (4608, 5760), (100, 19000),
+                           (0, 20000), (19999, None), (3000, 3000)]:
+            del decoded[:]
+            frames = list(flac.read_range(start, end))
+
+            self.assertEqual(b''.join(f.data for f in frames),
+                             self.expected[start * 4:(end or 20000) * 4],
+                             (start, end))
+            self.assertEqual(len(decoded), len(frames), (start, end))
+
+    def test_read_range_clips_end(self):
+        flac = Flac(self.write_flac(self.channels))
+
+        self.assertEqual(b''.join(f.data for f in flac.read_range(
+            19000, 50000)), self.expected[19000 * 4:])
+        with self.assertRaises(ValueError):
+            list(flac.read_range(100, 50))
+
+    def test_read_range_from_stream(self):
+        data = encoder.encode(self.channels)
+        flac = Flac.from_stream(io.BufferedReader(NonSeekable(data)))
+        self.assertFalse(flac._stream.seekable())
+
+        self.assertEqual(b''.join(f.data for f in flac.read_range(
+            5000, 9000)), self.expected[5000 * 4:9000 * 4])
+
+    def test_decode_parallel_range(self):
+        flac = Flac(self.write_flac(self.channels, block_size=1024))
+        frames = list(flac.decode_parallel(2, frames_per_task=3,
+                                           start=2500, end=15000))
+
+        self.assertEqual(b''.join(f.data for f in frames),
+                         self.expected[2500 * 4:15000 * 4])
+        self.assertEqual(frames[0].sample_offset, 2500)
+
+
+class DecodeParallelTest(FlacTestCase):
+    def test_should_match_sequential_decoding(self):
+        channels = encoder.make_signal(12000)
+        filename = self.write_flac(channels, block_size=1024,
+                                   stereo='mid_side')
+
+        frames = list(Flac(filename).decode_parallel(workers=2,
+                                                     frames_per_task=3))
+
+        self.assertEqual([f.sample_offset for f in frames],
+                         list(range(0, 12000, 1024)))
+        self.assertEqual(b''.join(f.data for f in frames),
+                         encoder.pcm(channels, 16))
+
+
+class LazyMetadataTest(FlacTestCase):
+    def test_payloads_should_not_be_read_on_open(self):
+        image = bytes(range(256)) * 8192
+        filename = self.write_flac(
+            encoder.make_signal(3000), block_size=1024,
+            blocks=[(6, encoder.picture(image, 'image/png')),
+                    (2, b'TEST' + bytes(300000)),
+                    (4, encoder.vorbis_comment({'TITLE': ['Lazy']}))])
+        read_sizes = []
+
+        def counting_open(name, mode):
+            f = open(name, mode)
+            read = f.read
+
+            def counting_read(n=-1):
+                data = read(n)
+                read_sizes.append(len(data))
+                return data
+            f.read = counting_read
+            return f
+
+        with mock.patch('flac.meta.metadata.open', counting_open,
+                        create=True):
+            flac = Flac(filename)
+
+        self.assertLess(sum(read_sizes), 200000)
+        self.assertFalse(flac.pictures[0]._image.is_loaded)
+        self.assertEqual(flac.vorbis_comments[0].tags['TITLE'], ['Lazy'])
+        self.assertEqual(flac.pictures[0].image_size, len(image))
+        self.assertEqual(flac.pictures[0].image_data, image)
+        self.assertEqual(flac.applications[0].id, 'TEST')
+        self.assertEqual(len(flac.applications[0].data), 300000)
+        self.assertEqual(len(b''.join(f.data for f in flac.iter_frames())),
+                         12000)
+
+
+class MmapTest(FlacTestCase):
+    def test_decoding_and_zero_copy_payloads(self):
+        channels = encoder.make_signal(5000)
+        image = b'\x89PNG' + bytes(5000)
+        filename = self.write_flac(
+            channels, block_size=1024,
+            blocks=[(6, encoder.picture(image, 'image/png'))])
+        flac = Flac(filename, use_mmap=True)
+
+        self.assertIsInstance(flac.pictures[0].image_data, memoryview)
+        self.assertEqual(flac.pictures[0].image_data, image)
+        self.assertEqual(flac.pictures[0].mime_type, 'image/png')
+        self.assertEqual(b''.join(f.data for f in flac.iter_frames()),
+                         encoder.pcm(channels, 16))
+
+        flac.seek(3000)
+        self.assertEqual(next(flac.iter_frames()).data,
+                         encoder.pcm([c[3000:3072] for c in channels], 16))
+        self.assertEqual(len(flac.frame_index), 5)
+
+    def test_map_is_closed_with_flac(self):
+        filename = self.write_flac(encoder.make_signal(3000))
+        flac = Flac(filename, use_mmap=True)
+        self.assertEqual(len(list(flac.iter_frames())), 1)
+        mapped = flac._mmap
+
+        del flac
+        self.assertTrue(mapped.closed)
+
+
+class StreamTest(FlacTestCase):
+    def feed_pipe(self, data: bytes, chunk: int = 1000):
+        read_fd, write_fd = os.pipe()
+
+        def write():
+            with os.fdopen(write_fd, 'wb', buffering=0) as pipe:
+                for i in range(0, len(data), chunk):
+                    pipe.write(data[i:i + chunk])
+
+        thread = threading.Thread(target=write)
+        thread.start()
+        self.addCleanup(thread.join)
+        pipe = os.fdopen(read_fd, 'rb', buffering=0)
+        self.addCleanup(pipe.close)
+        return pipe
+
+    def test_decode_from_pipe(self):
+        channels = encoder.make_signal(6000)
+        image = bytes(range(256)) * 1000
+        data = encoder.encode(
+            channels, block_size=1024, subframe='lpc8',
+            blocks=[(6, encoder.picture(image, 'image/png'))])
+        flac = Flac.from_stream(self.feed_pipe(data))
+
+        self.assertIsNone(flac.size)
+        self.assertEqual(flac.pictures[0].image_data, image)
+        frames = list(flac.iter_frames())
+        self.assertEqual(b''.join(f.data for f in frames),
+                         encoder.pcm(channels, 16))
+        self.assertEqual([f.sample_offset for f in frames],
+                         list(range(0, 6000, 1024)))
+
+    def test_pipe_is_not_seekable(self):
+        data = encoder.encode(encoder.make_signal(2000), block_size=1024)
+        flac = Flac.from_stream(self.feed_pipe(data))
+
+        with self.assertRaises(io.UnsupportedOperation):
+            flac.seek(1500)
+        with self.assertRaises(io.UnsupportedOperation):
+            flac.frame_index
+        with self.assertRaises(io.UnsupportedOperation):
+            next(flac.decode_parallel())
+        list(flac.iter_frames())
+
+    def test_seekable_stream(self):
+        channels = encoder.make_signal(5000)
+        flac = Flac.from_stream(io.BytesIO(
+            encoder.encode(channels, block_size=1024)))
+
+        self.assertEqual(len(flac.frame_index), 5)
+        flac.seek(3000)
+        self.assertEqual(next(flac.iter_frames()).data,
+                         encoder.pcm([c[3000:3072] for c in channels], 16))
@@ -0,0 +1,77 @@
+import os
+from unittest import mock
+
+from flac.meta import Flac
+from flac.meta.frame_index import FrameIndex
+
+from benchmarks import encoder
+from .test_flac import FlacTestCase
+
+
+class FrameIndexTest(FlacTestCase):
+    def setUp(self):
+        super().setUp()
+        self.channels = encoder.make_signal(10000)
+        self.filename = self.write_flac(self.channels, block_size=1152)
+        self.cache_dir = os.path.join(self.dir, 'cache')
+
+    def test_scan_should_match_decoded_frames(self):
+        flac = Flac(self.filename)
+        frames = list(Flac(self.filename).iter_frames())
+        index = flac.frame_index
+
+        self.assertEqual(len(index), len(frames))
+        for i, frame in enumerate(frames):
+            self.assertEqual(index[i], (frame.sample_offset,
+                                        frame.byte_offset, frame.block_size))
+        self.assertEqual(index.total_samples, 10000)
+        self.assertEqual(index.find(1151), 0)
+        self.assertEqual(index.find(9999), len(frames) - 1)
+        self.assertEqual(index.find(10000), -1)
+
+    def test_scan_without_min_frame_size(self):
+        flac = Flac(self.filename)
+        flac._streaminfo.min_frame_size = 0
+
+        self.assertEqual(list(flac.frame_index.byte_offsets),
+                         list(Flac(self.filename).frame_index.byte_offsets))
+
+    def test_index_should_be_loaded_from_cache(self):
+        expected = Flac(self.filename, index_cache=self.cache_dir).frame_index
+
+        with mock.patch.object(FrameIndex, 'scan') as scan:
+            index = Flac(self.filename,
+                         index_cache=self.cache_dir).frame_index
+
+            scan.assert_not_called()
+        self.assertEqual(list(index.byte_offsets),
+                         list(expected.byte_offsets))
+        self.assertEqual(list(index.block_sizes), list(expected.block_sizes))
+
+    def test_cache_should_be_invalidated_when_file_changes(self):
+        Flac(self.filename, index_cache=self.cache_dir).frame_index
+        self.write_flac(encoder.make_signal(3000), block_size=1152)
+
+        index = Flac(self.filename, index_cache=self.cache_dir).frame_index
+
+        self.assertEqual(index.total_samples, 3000)
+
+    def test_seek_should_decode_one_frame(self):
+        flac = Flac(self.filename)
+        flac.frame_index
+        with mock.patch.object(flac, '_decode_subframes',
+                               wraps=flac._decode_subframes) as decode:
+            flac.seek(5000)
+            frame = next(flac.iter_frames())
+
+            self.assertEqual(decode.call_count, 1)
+        self.assertEqual(frame.sample_offset, 5000)
+        self.assertEqual(
+            frame.data,
+            encoder.pcm([c[5000:5760] for c in self.channels], 16))
+
+    def test_duration(self):
+        flac = Flac(self.filename)
+        flac._streaminfo.total_samples = 0
+
+        self.assertAlmostEqual(flac.duration, 10000 / 44100)
@@ -0,0 +1,59 @@
+import os
+
+from flac.library import Library
+
+from benchmarks import encoder
+from .test_flac import FlacTestCase
+
+
+class LibraryTest(FlacTestCase):
+    def setUp(self):
+        super().setUp()
+        self.root = os.path.join(self.dir, 'music')
+        os.makedirs(os.path.join(self.root, 'album'))
+        tags = encoder.vorbis_comment({'ARTIST': ['Someone'],
+                                       'TITLE': ['Song']})
+        picture = encoder.picture(b'\x89PNG' + bytes(1000), 'image/png')
+        self.first = self.write_flac(
+            encoder.make_signal(1000), 'music/album/01.flac',
+            blocks=[(4, tags), (6, picture)])
+        self.second = self.write_flac(encoder.make_signal(500, 1),
+                                      'music/02.FLAC')
+        with open(os.path.join(self.root, 'broken.flac'), 'wb') as f:
+            f.write(b'not a flac file')
+        with open(os.path.join(self.root, 'cover.jpg'), 'wb') as f:
+            f.write(b'jpeg')
+        self.library = Library(os.path.join(self.dir, 'library.sqlite'))
+
+    def tearDown(self):
+        self.library.close()
+        super().tearDown()
+
+    def test_scan(self):
+        result = self.library.scan(self.root, workers=1)
+
+        self.assertEqual((result.scanned, result.unchanged, result.failed),
+                         (3, 0, 1))
+        self.assertEqual(len(self.library), 3)
+        metadata = self.library.get(self.first)
+        self.assertEqual(metadata['streaminfo']['total_samples'], 1000)
+        self.assertEqual(metadata['tags'], {'ARTIST': ['Someone'],
+                                            'TITLE': ['Song']})
+        self.assertEqual(metadata['pictures'][0]['mime_type'], 'image/png')
+        self.assertEqual(metadata['pictures'][0]['size'], 1004)
+        self.assertEqual(self.library.get(self.second)['streaminfo']
+                         ['channels'], 1)
+        self.assertEqual(len(self.library.errors()), 1)
+
+    def test_rescan_should_skip_unchanged_files(self):
+        self.library.scan(self.root, workers=2)
+        self.write_flac(encoder.make_signal(700, 1), 'music/02.FLAC')
+        os.remove(self.first)
+
+        result = self.library.scan(self.root, workers=2)
+
+        self.assertEqual((result.scanned, result.unchanged, result.removed),
+                         (1, 1, 1))
+        self.assertIsNone(self.library.get(self.first))
+        self.assertEqual(self.library.get(self.second)['streaminfo']
+                         ['total_samples'], 700)
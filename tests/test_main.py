@@ -0,0 +1,39 @@
+import io
+import os
+import sys
+import unittest
+from contextlib import redirect_stdout
+from unittest import mock
+
+try:
+    import main
+except ImportError:
+    # main.py тянет зависимости плеера (npyscreen)
+    main = None
+
+from benchmarks.encoder import encode, make_signal, pcm
+from .test_flac import FlacTestCase
+
+
+class Stdin:
+    def __init__(self, data: bytes):
+        self.buffer = io.BytesIO(data)
+
+
+@unittest.skipIf(main is None, 'player dependencies are not installed')
+class ConvertCommandTest(FlacTestCase):
+    def run_main(self, *argv: str, stdin: bytes = b''):
+        with mock.patch.object(sys, 'argv', ['main.py'] + list(argv)), \
+                mock.patch.object(sys, 'stdin', Stdin(stdin)), \
+                redirect_stdout(io.StringIO()):
+            main.main()
+
+    def test_stdin_with_jobs(self):
+        channels = make_signal(5000)
+        wav = os.path.join(self.dir, 'out.wav')
+
+        self.run_main('conv', '-', wav, '-j', '2',
+                      stdin=encode(channels, block_size=1152))
+
+        with open(wav, 'rb') as f:
+            self.assertEqual(f.read()[44:], pcm(channels, 16))
@@ -1,8 +1,13 @@
 import io
+import struct
 import unittest
 
-from flac.meta import BitStream
-from flac.meta.blocks import Application, Picture, Streaminfo, VorbisComment
+from flac.meta import BitStream, BufferedBitStream, Flac
+from flac.meta.blocks import (Application, Picture, SeekTable, Streaminfo,
+                              VorbisComment)
+
+from benchmarks import encoder
+from .test_flac import FlacTestCase
 
 
 def create_stream(data: bytes) -> BitStream:
@@ -87,6 +92,20 @@ class PictureTest(unittest.TestCase):
         self.assertEqual(pic.used_colors, 0)
         self.assertEqual(pic.image_data, b'\xff\xd8')
 
+    def test_image_should_be_read_on_first_access(self):
+        data = (
+            b'\x00\x00\x00\x03\x00\x00\x00\nimage/jpeg\x00\x00\x00\x00'
+            b'\x00\x00\x04\xb0\x00\x00\x04\xb0\x00\x00\x00\x18\x00\x00\x00'
+            b'\x00\x00\x00\x00\x04\xff\xd8\xff\xe0tail')
+        stream = BufferedBitStream(io.BytesIO(data))
+        pic = Picture(len(data) - 4, False, stream)
+
+        self.assertFalse(pic._image.is_loaded)
+        self.assertEqual(pic.image_size, 4)
+        self.assertEqual(stream.read_bytes(4), b'tail')
+        self.assertEqual(pic.image_data, b'\xff\xd8\xff\xe0')
+        self.assertEqual(stream.tell(), len(data))
+
 
 class ApplicationTest(unittest.TestCase):
     def test_simple_parsing(self):
@@ -95,3 +114,42 @@ class ApplicationTest(unittest.TestCase):
 
         self.assertEqual(app.id, 'SONY')
         self.assertEqual(app.data, b'applicationdata')
+
+
+class SeekTableTest(unittest.TestCase):
+    def test_simple_parsing(self):
+        data = (struct.pack('>QQH', 0, 0, 4096) +
+                struct.pack('>QQH', 8192, 20761, 4096) +
+                struct.pack('>QQH', 0xFFFFFFFFFFFFFFFF, 0, 0))
+        table = SeekTable(len(data), False, create_stream(data))
+
+        self.assertEqual([p.sample_number for p in table.points], [0, 8192])
+        self.assertEqual(table.points[1].offset, 20761)
+        self.assertEqual(table.points[1].samples, 4096)
+        self.assertIsNone(table.find(-1))
+        self.assertEqual(table.find(8191).sample_number, 0)
+        self.assertEqual(table.find(10000).sample_number, 8192)
+
+    def test_trailing_bytes_are_skipped(self):
+        data = struct.pack('>QQH', 4096, 100, 4096) + b'\0\0\0'
+        stream = create_stream(data + b'next')
+        table = SeekTable(len(data), False, stream)
+
+        self.assertEqual([p.sample_number for p in table.points], [4096])
+        self.assertEqual(stream.read_bytes(4), b'next')
+
+
+class LazyPayloadTest(FlacTestCase):
+    def setUp(self):
+        super().setUp()
+        self.filename = self.write_flac(
+            encoder.make_signal(2000), blocks=[
+                (2, b'TESTpayload'),
+                (6, encoder.picture(b'\x89PNG image'))])
+
+    def test_read_after_flac_is_collected(self):
+        picture = Flac(self.filename).pictures[0]
+        application = Flac(self.filename).applications[0]
+
+        self.assertEqual(picture.image_data, b'\x89PNG image')
+        self.assertEqual(application.data, b'payload')
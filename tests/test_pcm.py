@@ -0,0 +1,91 @@
+import struct
+import unittest
+
+from flac.meta import Flac
+from flac.meta.pcm import (FLOAT32, FORMATS, S16LE, S24LE, S32LE, U8,
+                           container_format, md5_format, numpy, pack,
+                           pack_numpy)
+
+from benchmarks import encoder
+from .test_flac import FlacTestCase
+
+
+def reference(channels, bits_per_sample: int, fmt) -> bytes:
+    """Поштучная упаковка через struct, как раньше в engine.pack
+    """
+    result = b''
+    for frame in zip(*channels):
+        for s in frame:
+            if fmt.is_float:
+                result += struct.pack('<f', s / (1 << (bits_per_sample - 1)))
+                continue
+            if fmt.justify:
+                shift = fmt.bits - bits_per_sample
+                s = s << shift if shift >= 0 else s >> -shift
+            if fmt.unsigned:
+                s += 128
+            result += struct.pack('<q', s)[:fmt.sample_width]
+    return result
+
+
+class PackTest(unittest.TestCase):
+    def signal(self, bits: int):
+        low, high = -(1 << (bits - 1)), (1 << (bits - 1)) - 1
+        return [[low, high, 0, -1, 1, 5], [3, -7, high, low, 100 % high, 0]]
+
+    def test_formats_should_match_reference(self):
+        for bits in [4, 8, 12, 16, 20, 24, 32]:
+            channels = self.signal(bits)
+            formats = list(FORMATS.values()) + [md5_format(bits)]
+            for fmt in formats:
+                expected = reference(channels, bits, fmt)
+
+                self.assertEqual(pack(channels, bits, fmt), expected,
+                                 (bits, fmt))
+                if numpy is not None:
+                    self.assertEqual(pack_numpy(channels, bits, fmt),
+                                     expected, (bits, fmt))
+
+    def test_odd_bit_depths_are_justified(self):
+        self.assertEqual(pack([[1, -1]], 12, S16LE), b'\x10\x00\xf0\xff')
+        self.assertEqual(pack([[1, -1]], 20, S24LE),
+                         b'\x10\x00\x00\xf0\xff\xff')
+        self.assertEqual(pack([[1, -1]], 12, md5_format(12)),
+                         b'\x01\x00\xff\xff')
+
+    def test_float32_is_normalized(self):
+        data = pack([[-32768, 16384, 0]], 16, FLOAT32)
+
+        self.assertEqual(struct.unpack('<3f', data), (-1.0, 0.5, 0.0))
+
+    def test_container_format(self):
+        self.assertEqual([container_format(b) for b in [8, 12, 16, 20, 24,
+                                                        32]],
+                         [U8, S16LE, S16LE, S24LE, S24LE, S32LE])
+        with self.assertRaises(ValueError):
+            container_format(33)
+
+
+class OutputFormatTest(FlacTestCase):
+
+    def test_12_bit_stream_is_padded_to_16_bits(self):
+        channels = encoder.make_signal(2500, bits_per_sample=12)
+        flac = Flac(self.write_flac(
+            channels, bits_per_sample=12, block_size=1000))
+        frames = list(flac.iter_frames())
+
+        self.assertEqual(flac.pcm_format, S16LE)
+        self.assertTrue(all(f.sample_width == 2 for f in frames))
+        self.assertEqual(b''.join(f.data for f in frames),
+                         encoder.pcm([[s << 4 for s in c] for c in channels],
+                                     16))
+
+    def test_selected_format_applies_to_ranges(self):
+        channels = encoder.make_signal(2500)
+        flac = Flac(self.write_flac(
+            channels, bits_per_sample=16, block_size=1000))
+        flac.pcm_format = S24LE
+        data = b''.join(f.data for f in flac.read_range(1200, 2100))
+
+        expected = [[s << 8 for s in c[1200:2100]] for c in channels]
+        self.assertEqual(data, encoder.pcm(expected, 24))
@@ -0,0 +1,118 @@
+from flac.audio import FakeBackend
+from flac.meta import Flac
+from flac.playlist import Playlist
+
+from benchmarks import encoder
+from .test_flac import FlacTestCase
+
+
+class PlaylistTest(FlacTestCase):
+    def setUp(self):
+        super().setUp()
+        self.backend = FakeBackend()
+
+    def write_track(self, name: str, length: int, seed: int,
+                    sample_rate: int = 8000):
+        channels = encoder.make_signal(length, seed=seed)
+        filename = self.write_flac(
+            channels, name, sample_rate=sample_rate, block_size=1024,
+            blocks=[(4, encoder.vorbis_comment({'TITLE': [name]}))])
+        return filename, encoder.pcm(channels, 16)
+
+    def pull_all(self, playlist: Playlist) -> list:
+        """Вывести всё, запоминая слышимый трек после каждого куска.
+        Возвращает данные каждого открытого аудиопотока
+        """
+        playlist.play()
+        streams, titles = [], []
+        while playlist.is_alive():
+            stream = self.backend.stream
+            if stream not in streams:
+                streams.append(stream)
+            if stream.is_active():
+                playlist._buffer.wait(len(playlist._out), timeout=1)
+                stream.pull()
+                titles.append(playlist.title)
+            playlist.join(0.01)
+        self.titles = titles
+        return [bytes(s.output) for s in streams]
+
+    def test_gapless_switch(self):
+        first, first_pcm = self.write_track('a.flac', 3000, 1)
+        second, second_pcm = self.write_track('b.flac', 5000, 2)
+        playlist = Playlist([first, second], self.backend)
+        self.addCleanup(playlist.abort)
+
+        outputs = self.pull_all(playlist)
+        expected = first_pcm + second_pcm
+
+        self.assertEqual(len(outputs), 1)
+        self.assertEqual(outputs[0][:len(expected)], expected)
+        self.assertEqual(outputs[0][len(expected):],
+                         bytes(len(outputs[0]) - len(expected)))
+        self.assertEqual(self.titles[0], 'a.flac')
+        self.assertEqual(self.titles[-1], 'b.flac')
+        self.assertEqual(playlist.index, 1)
+
+    def test_format_change_reopens_stream(self):
+        first, first_pcm = self.write_track('a.flac', 3000, 1)
+        second, second_pcm = self.write_track('b.flac', 4000, 2,
+                                             sample_rate=16000)
+        playlist = Playlist([first, second], self.backend)
+        self.addCleanup(playlist.abort)
+
+        outputs = self.pull_all(playlist)
+
+        self.assertEqual(len(outputs), 2)
+        self.assertEqual(outputs[0][:len(first_pcm)], first_pcm)
+        self.assertEqual(outputs[1][:len(second_pcm)], second_pcm)
+
+    def test_seek_after_lookahead_switch(self):
+        first, first_pcm = self.write_track('a.flac', 3000, 1)
+        second, second_pcm = self.write_track('b.flac', 3000, 2)
+        third, third_pcm = self.write_track('c.flac', 3000, 3)
+        playlist = Playlist([first, second, third], self.backend)
+        self.addCleanup(playlist.abort)
+        # декодер успевает записать в буфер начало второго трека
+        playlist._buffer.wait(len(first_pcm) + 4, timeout=1)
+        playlist.seek(2000)
+
+        outputs = self.pull_all(playlist)
+        expected = first_pcm[2000 * 4:] + second_pcm + third_pcm
+
+        self.assertEqual(outputs[0][:len(expected)], expected)
+
+    def test_repeated_seek_reuses_preload(self):
+        # первый трек длиннее кольцевого буфера: декодер не успевает
+        # перейти ко второму до перемоток
+        first, first_pcm = self.write_track('a.flac', 30000, 1)
+        second, second_pcm = self.write_track('b.flac', 3000, 2)
+        opened = []
+
+        def opener(filename: str) -> Flac:
+            opened.append(filename)
+            return Flac(filename)
+
+        playlist = Playlist([first, second], self.backend, opener)
+        self.addCleanup(playlist.abort)
+        for sample in [1000, 500, 1500, 0]:
+            playlist._buffer.wait(4, timeout=1)
+            playlist.seek(sample)
+
+        outputs = self.pull_all(playlist)
+        expected = first_pcm + second_pcm
+
+        self.assertEqual(outputs[0][:len(expected)], expected)
+        self.assertEqual(opened, [first, second])
+
+    def test_broken_file_is_skipped(self):
+        first, first_pcm = self.write_track('a.flac', 2000, 1)
+        broken = self.write_file(b'garbage', 'broken.flac')
+        third, third_pcm = self.write_track('c.flac', 2000, 3)
+        playlist = Playlist([first, broken, third], self.backend)
+        self.addCleanup(playlist.abort)
+
+        outputs = self.pull_all(playlist)
+        expected = first_pcm + third_pcm
+
+        self.assertEqual(outputs[0][:len(expected)], expected)
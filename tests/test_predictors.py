@@ -0,0 +1,67 @@
+import random
+import unittest
+
+from flac.meta.predictors import (FIXED_COEFFS, numpy, restore_fixed,
+                                  restore_fixed_numpy, restore_lpc)
+
+
+def restore_reference(warmup, coefs, shift, residuals):
+    result = list(warmup)
+    for r in residuals:
+        s = sum(c * result[-j - 1] for j, c in enumerate(coefs))
+        result.append((s >> shift) + r)
+    return result
+
+
+class PredictorsTest(unittest.TestCase):
+    def setUp(self):
+        self.rnd = random.Random(11)
+
+    def random_list(self, count: int, bits: int):
+        limit = 1 << (bits - 1)
+        return [self.rnd.randint(-limit, limit - 1) for _ in range(count)]
+
+    def test_fixed_kernels_should_match_reference(self):
+        for order, coefs in enumerate(FIXED_COEFFS):
+            warmup = self.random_list(order, 16)
+            residuals = self.random_list(300, 4)
+
+            self.assertEqual(restore_fixed(warmup, residuals),
+                             restore_reference(warmup, coefs, 0, residuals),
+                             order)
+
+    def test_fixed4_coefficients(self):
+        # x[n] = 4x[n-1] - 6x[n-2] + 4x[n-3] - x[n-4] точно
+        # продолжает кубическую последовательность
+        cube = [n ** 3 for n in range(10)]
+        self.assertEqual(restore_fixed(cube[:4], [0] * 6), cube)
+
+    def test_lpc_kernels_should_match_reference(self):
+        for order in list(range(1, 13)) + [16, 31, 32]:
+            for shift in [0, 5, 15]:
+                warmup = self.random_list(order, 16)
+                coefs = self.random_list(order, 6)
+                residuals = self.random_list(200, 8)
+
+                self.assertEqual(
+                    restore_lpc(warmup, coefs, shift, residuals),
+                    restore_reference(warmup, coefs, shift, residuals),
+                    (order, shift))
+
+    def test_invalid_orders(self):
+        with self.assertRaises(ValueError):
+            restore_fixed([0] * 5, [1, 2])
+        with self.assertRaises(ValueError):
+            restore_lpc([0] * 33, [1] * 33, 0, [1, 2])
+        with self.assertRaises(ValueError):
+            restore_lpc([0], [1], -1, [1, 2])
+
+    @unittest.skipIf(numpy is None, 'numpy is not installed')
+    def test_numpy_fixed_should_match_python(self):
+        for order in range(len(FIXED_COEFFS)):
+            warmup = self.random_list(order, 24)
+            residuals = self.random_list(4096, 12)
+
+            self.assertEqual(
+                restore_fixed_numpy(warmup, residuals).tolist(),
+                restore_fixed(warmup, residuals), order)
@@ -0,0 +1,83 @@
+import io
+import random
+import unittest
+
+from flac.meta import BitStream, BufferedBitStream, Flac
+
+from benchmarks.encoder import BitWriter
+
+
+def create_decoder(data: bytes, chunk_size: int) -> Flac:
+    flac = Flac.__new__(Flac)
+    flac._f = io.BytesIO(data)
+    flac._stream = BufferedBitStream(flac._f, chunk_size=chunk_size)
+    return flac
+
+
+class RicePartitionTest(unittest.TestCase):
+    def encode(self, values, param: int) -> bytes:
+        writer = BitWriter()
+        for v in values:
+            writer.write_rice_int(v, param)
+        writer.align()
+        return writer.getvalue()
+
+    def test_should_match_per_sample_decoding(self):
+        rnd = random.Random(42)
+        for param in [0, 1, 4, 9, 14, 30]:
+            limit = min(40 << param, (1 << 31) - 1)
+            values = [rnd.randint(-limit, limit) for _ in range(1000)]
+            values += [0, -1, 1, limit, -limit]
+            data = self.encode(values, param)
+            for chunk_size in [1, 5, 64, 1 << 16]:
+                expected = BitStream(io.BytesIO(data))
+                expected_values = [expected.read_rice_int(param)
+                                   for _ in range(len(values))]
+                actual = BufferedBitStream(io.BytesIO(data), chunk_size)
+
+                self.assertEqual(
+                    list(actual.read_rice_partition(len(values), param)),
+                    expected_values)
+                self.assertEqual(expected_values, values)
+
+    def test_should_continue_after_partition(self):
+        writer = BitWriter()
+        for v in [5, -6, 7]:
+            writer.write_rice_int(v, 2)
+        writer.write_uint(0b101, 3)
+        writer.align()
+        stream = BufferedBitStream(io.BytesIO(writer.getvalue()))
+
+        self.assertEqual(list(stream.read_rice_partition(3, 2)), [5, -6, 7])
+        self.assertEqual(stream.read_uint(3), 0b101)
+
+
+class DecodeResidualsTest(unittest.TestCase):
+    def test_rice_and_escape_partitions(self):
+        writer = BitWriter()
+        writer.write_uint(0, 2)  # 4-bit rice parameters
+        writer.write_uint(2, 4)  # 4 partitions of 8 samples
+        partitions = [[3, -1, 0, 7, -8, 2],  # predictor order 2
+                      [10, -11, 12, -13, 14, -15, 16, -17],
+                      [0] * 8,
+                      [100, -100, 5, 0, 1, -1, 2, -2]]
+        writer.write_uint(3, 4)
+        for v in partitions[0]:
+            writer.write_rice_int(v, 3)
+        writer.write_uint(0b1111, 4)  # escape code
+        writer.write_uint(6, 5)
+        for v in partitions[1]:
+            writer.write_sint(v, 6)
+        writer.write_uint(0b1111, 4)  # escape code with zero bits
+        writer.write_uint(0, 5)
+        writer.write_uint(5, 4)
+        for v in partitions[3]:
+            writer.write_rice_int(v, 5)
+        writer.align()
+
+        for chunk_size in [1, 1 << 16]:
+            flac = create_decoder(writer.getvalue(), chunk_size)
+            residuals = flac._decode_residuals(32, 2)
+
+            self.assertEqual(residuals.typecode, 'i')
+            self.assertEqual(list(residuals), sum(partitions, []))
@@ -0,0 +1,68 @@
+import threading
+import unittest
+
+from flac.ring_buffer import RingBuffer
+
+
+class RingBufferTest(unittest.TestCase):
+    def test_wraparound(self):
+        ring = RingBuffer(10)
+        chunk = bytearray(4)
+
+        self.assertTrue(ring.write(b'abcdefg'))
+        self.assertEqual(ring.read_into(chunk), 4)
+        self.assertEqual(chunk, b'abcd')
+        self.assertTrue(ring.write(b'hijkl'))
+        self.assertEqual(ring.available, 8)
+        self.assertEqual(ring.free, 2)
+        self.assertEqual(ring.read(100), b'efghijkl')
+        self.assertEqual(ring.read(5), b'')
+
+    def test_writer_should_block_until_reader_frees_space(self):
+        ring = RingBuffer(16)
+        data = bytes(range(256)) * 40
+        result = bytearray()
+        writer = threading.Thread(target=ring.write, args=(data,))
+        writer.start()
+
+        chunk = bytearray(7)
+        while len(result) < len(data):
+            ring.wait(1, timeout=1)
+            result += chunk[:ring.read_into(chunk)]
+        writer.join()
+
+        self.assertEqual(bytes(result), data)
+
+    def test_clear_should_interrupt_writer(self):
+        ring = RingBuffer(4)
+        epoch = ring.epoch
+        results = []
+        writer = threading.Thread(
+            target=lambda: results.append(ring.write(b'x' * 10, epoch)))
+        writer.start()
+        ring.wait(4, timeout=1)
+        ring.clear()
+        writer.join()
+
+        self.assertEqual(results, [False])
+        self.assertEqual(ring.available, 0)
+        # запись из старой эпохи после clear не попадает в буфер
+        self.assertFalse(ring.write(b'old', epoch))
+        self.assertTrue(ring.write(b'new', ring.epoch))
+        self.assertEqual(ring.read(10), b'new')
+
+    def test_close(self):
+        ring = RingBuffer(8)
+        ring.write(b'abc')
+        ring.close()
+
+        self.assertTrue(ring.wait(5, timeout=0))
+        self.assertFalse(ring.finished)
+        self.assertEqual(ring.read(8), b'abc')
+        self.assertTrue(ring.finished)
+        self.assertFalse(ring.write(b'more'))
+
+        ring.close(ring.epoch - 1)  # устаревшее закрытие игнорируется
+        ring.clear()
+        ring.close(ring.epoch - 1)
+        self.assertFalse(ring.finished)
@@ -0,0 +1,145 @@
+import threading
+import unittest
+
+from flac.audio import (COMPLETE, OUTPUT_OVERFLOW, OUTPUT_UNDERFLOW,
+                        FakeBackend, Gain, apply_gain, numpy)
+from flac.meta import Flac
+from flac.song import Song
+
+from benchmarks import encoder
+from .test_flac import FlacTestCase
+
+
+def gain_reference(data: bytes, sample_width: int, gain: float) -> bytes:
+    high = (1 << (sample_width * 8 - 1)) - 1
+    offset = 128 if sample_width == 1 else 0
+    result = bytearray()
+    for i in range(0, len(data), sample_width):
+        s = int.from_bytes(data[i:i + sample_width], 'little',
+                           signed=sample_width != 1) - offset
+        s = min(max(int(s * gain), -high - 1), high) + offset
+        result += s.to_bytes(sample_width, 'little',
+                             signed=sample_width != 1)
+    return bytes(result)
+
+
+class ApplyGainTest(unittest.TestCase):
+    def test_should_match_reference(self):
+        data = bytes(range(256)) * 12
+        for sample_width in [1, 2, 3, 4]:
+            for gain in [0.5, 1.7, 300.0]:
+                buffer = bytearray(data)
+                apply_gain(buffer, sample_width, gain)
+
+                self.assertEqual(
+                    bytes(buffer),
+                    gain_reference(data, sample_width, gain),
+                    (sample_width, gain, numpy is not None))
+
+    def test_reused_buffers(self):
+        data = bytes(range(256)) * 12
+        gain = Gain()
+        for sample_width in [3, 1, 3, 2, 1]:
+            for size in [len(data), 96]:
+                buffer = bytearray(data[:size])
+                gain.apply(buffer, sample_width, 0.3)
+
+                self.assertEqual(
+                    bytes(buffer),
+                    gain_reference(data[:size], sample_width, 0.3),
+                    (sample_width, size))
+
+
+class SongTest(FlacTestCase):
+    def setUp(self):
+        super().setUp()
+        self.channels = encoder.make_signal(8000)
+        self.expected = encoder.pcm(self.channels, 16)
+        self.filename = self.write_flac(self.channels, block_size=1024,
+                                        sample_rate=8000)
+        self.backend = FakeBackend(latency=0.01)
+
+    def gated_song(self):
+        """Song, декодер которого отдаёт фреймы только по gate.set()
+        """
+        flac = Flac(self.filename)
+        read_range = flac.read_range
+        gate = threading.Event()
+
+        def gated_read_range(start):
+            for frame in read_range(start):
+                gate.wait()
+                yield frame
+        flac.read_range = gated_read_range
+        song = Song(flac, self.backend)
+        self.addCleanup(gate.set)
+        self.addCleanup(song.abort)
+        return song, gate
+
+    def play_to_end(self, song, length: int) -> bytes:
+        """Выведенные данные без тишины, которой дополнен последний кусок
+        """
+        stream = self.backend.stream
+        song.play()
+        while stream.is_active():
+            song._buffer.wait(len(song._out), timeout=1)
+            stream.pull()
+        song.join(1)
+        self.assertEqual(stream.output[length:],
+                         bytes(len(stream.output) - length))
+        return bytes(stream.output[:length])
+
+    def test_playback(self):
+        song = Song(Flac(self.filename), self.backend)
+
+        self.assertEqual(self.play_to_end(song, len(self.expected)),
+                         self.expected)
+        self.assertFalse(song.is_alive())
+        self.assertTrue(self.backend.stream.closed)
+        self.assertTrue(self.backend.terminated)
+        self.assertEqual(song.current_time, 1000)
+
+    def test_pause_returns_preallocated_silence(self):
+        song, _ = self.gated_song()
+
+        first = self.backend.stream.pull()
+        self.assertIs(self.backend.stream.pull(), first)
+        self.assertEqual(first, bytes(400 * 4))
+        self.assertEqual(song.underruns, 0)
+
+    def test_underruns_and_overruns(self):
+        song, gate = self.gated_song()
+        song.play()
+
+        self.assertEqual(self.backend.stream.pull(), bytes(400 * 4))
+        self.assertEqual(song.underruns, 1)
+        self.backend.stream.pull(status=OUTPUT_UNDERFLOW | OUTPUT_OVERFLOW)
+        self.assertEqual((song.underruns, song.overruns), (3, 1))
+
+        gate.set()
+        song._buffer.wait(len(song._out), timeout=1)
+        self.assertEqual(self.backend.stream.pull(), self.expected[:1600])
+        self.assertAlmostEqual(
+            song.latency,
+            0.01 + song._buffer.available / 4 / 8000)
+
+    def test_seek_and_volume(self):
+        song = Song(Flac(self.filename), self.backend)
+        song.current_time = 500
+        song.change_volume(-6)
+
+        data = self.play_to_end(song, 4000 * 4)
+        self.assertEqual(data, gain_reference(
+            self.expected[4000 * 4:], 2, 10 ** (-6 / 20)))
+
+    def test_complete_flag(self):
+        song = Song(Flac(self.filename), self.backend)
+        song.seek(7999)
+        song.play()
+        song._buffer.wait(4, timeout=1)
+        stream = self.backend.stream
+
+        self.assertEqual(stream.pull()[:4], self.expected[-4:])
+        song._buffer.wait(1, timeout=1)
+        data, flag = song._callback(None, 400, {}, 0)
+        self.assertEqual(flag, COMPLETE)
@@ -0,0 +1,91 @@
+import os
+
+from flac.meta import DecodeStats, Flac, Frame
+from flac.split import TrackRange, route_frames, split_file, track_ranges
+
+from benchmarks import encoder
+from .test_flac import FlacTestCase
+
+
+class CueSheetTest(FlacTestCase):
+    def setUp(self):
+        super().setUp()
+        self.channels = encoder.make_signal(10000)
+        # у второго трека пауза INDEX 00, третий - трек данных
+        cue = encoder.cuesheet([
+            (0, 1, [(0, 1)], True),
+            (2500, 2, [(0, 0), (500, 1)], True),
+            (6000, 3, [(0, 1)], False),
+            (7000, 4, [(0, 1)], True),
+        ], lead_out=10000, catalog='1234567890123')
+        self.filename = self.write_flac(self.channels, 'disc.flac',
+                                        block_size=1152, blocks=[(5, cue)])
+
+    def test_parse(self):
+        cuesheet = Flac(self.filename).cuesheet
+
+        self.assertEqual(cuesheet.media_catalog_number, '1234567890123')
+        self.assertTrue(cuesheet.is_cd)
+        self.assertEqual([t.number for t in cuesheet.tracks],
+                         [1, 2, 3, 4, 170])
+        self.assertEqual([t.start for t in cuesheet.tracks],
+                         [0, 3000, 6000, 7000, 10000])
+        self.assertEqual([t.is_audio for t in cuesheet.tracks],
+                         [True, True, False, True, True])
+        self.assertEqual(cuesheet.lead_out.offset, 10000)
+
+    def test_track_ranges(self):
+        ranges = track_ranges(Flac(self.filename).cuesheet, 10000)
+
+        self.assertEqual([(r.number, r.start, r.end) for r in ranges],
+                         [(1, 0, 3000), (2, 3000, 6000), (4, 7000, 10000)])
+
+    def test_route_frames(self):
+        frames = [Frame(bytes(range(10)), 0, 10, 0, 1, 1),
+                  Frame(bytes(range(10, 20)), 10, 10, 0, 1, 1)]
+        ranges = [TrackRange(1, 2, 5), TrackRange(2, 5, 15),
+                  TrackRange(3, 17, 18)]
+
+        parts = [(t.number, p.data) for t, p in route_frames(frames, ranges)]
+
+        self.assertEqual(parts, [(1, bytes([2, 3, 4])),
+                                 (2, bytes(range(5, 10))),
+                                 (2, bytes(range(10, 15))),
+                                 (3, bytes([17]))])
+
+    def test_split_file(self):
+        out = os.path.join(self.dir, 'tracks')
+        os.mkdir(out)
+        flac = Flac(self.filename)
+        flac.stats = DecodeStats()
+        paths = split_file(flac, out)
+
+        self.assertEqual([os.path.basename(p) for p in paths],
+                         ['01.wav', '02.wav', '04.wav'])
+        pcm = encoder.pcm(self.channels, 16)
+        width = 4
+        for path, (start, end) in zip(paths, [(0, 3000), (3000, 6000),
+                                              (7000, 10000)]):
+            with open(path, 'rb') as f:
+                data = f.read()
+            self.assertEqual(data[44:], pcm[start * width:end * width])
+            self.assertEqual(int.from_bytes(data[40:44], 'little'),
+                             (end - start) * width)
+        # один проход: каждый фрейм декодирован один раз
+        self.assertEqual(flac.stats.frames, 9)
+
+    def test_split_mmap(self):
+        flac = Flac(self.filename, use_mmap=True)
+
+        self.assertEqual(flac.cuesheet.media_catalog_number, '1234567890123')
+        paths = split_file(flac, self.dir)
+        with open(paths[-1], 'rb') as f:
+            data = f.read()
+        self.assertEqual(data[44:],
+                         encoder.pcm(self.channels, 16)[7000 * 4:])
+
+    def test_no_cuesheet(self):
+        self.write_flac(self.channels[:1] * 2, 'disc.flac', block_size=1152)
+
+        with self.assertRaises(ValueError):
+            split_file(Flac(self.filename), self.dir)
@@ -0,0 +1,47 @@
+import os
+
+from flac.meta import DecodeStats, Flac
+from flac.meta.stats import STAGES
+
+from benchmarks import encoder
+from .test_flac import FlacTestCase
+
+
+class DecodeStatsTest(FlacTestCase):
+    def test_counters(self):
+        channels = [[(s >> 2) << 2 for s in c]
+                    for c in encoder.make_signal(5000)]
+        subframes = ['lpc8', 'fixed2', 'verbatim', 'lpc8', 'lpc8']
+        filename = self.write_flac(
+            channels, block_size=1024, stereo='mid_side', escape=True,
+            partition_order=2, wasted=True,
+            subframe=lambda number, channel: subframes[number])
+        flac = Flac(filename)
+        stats = flac.stats = DecodeStats()
+        data = b''.join(f.data for f in flac.iter_frames(check_crc=True))
+
+        self.assertEqual(data, encoder.pcm(channels, 16))
+        self.assertEqual(stats.frames, 5)
+        self.assertEqual(stats.samples, 10000)
+        self.assertEqual(stats.bytes, os.path.getsize(filename) -
+                         flac._audio_offset)
+        self.assertEqual(stats.subframes,
+                         {'lpc': 6, 'fixed': 2, 'verbatim': 2})
+        self.assertEqual(stats.lpc_orders, {8: 6})
+        self.assertEqual(stats.fixed_orders, {2: 2})
+        self.assertEqual(stats.rice_partitions, 8 * 4)
+        self.assertEqual(stats.escape_partitions, 8 * 2)
+        self.assertEqual(stats.wasted_subframes, 10)
+        self.assertTrue(all(stats.stage_seconds[stage] > 0
+                            for stage in STAGES))
+        self.assertIn('lpc orders: 8: 6', str(stats))
+
+    def test_disabled_by_default(self):
+        flac = Flac(self.write_flac(encoder.make_signal(2000)))
+        stats = flac.stats = DecodeStats()
+        flac.stats = None
+        list(flac.iter_frames())
+
+        self.assertIsNone(flac.stats)
+        self.assertEqual(stats.frames, 0)
+        self.assertNotIn('_decode_residuals', flac.__dict__)
@@ -0,0 +1,74 @@
+import unittest
+
+from flac.meta.crc import crc16
+from flac.verify import verify_file, verify_files
+
+from benchmarks import encoder
+from .test_flac import FlacTestCase
+
+
+class Crc16Test(unittest.TestCase):
+    def test_should_match_bitwise_crc(self):
+        data = bytes(range(256)) * 3 + b'\x01'
+        for end in [0, 1, 2, 255, len(data)]:
+            self.assertEqual(crc16(data[:end]), encoder.crc16(data[:end]))
+        self.assertEqual(crc16(data[101:], crc16(data[:101])),
+                         encoder.crc16(data))
+
+
+class VerifyTest(FlacTestCase):
+    def setUp(self):
+        super().setUp()
+        self.channels = encoder.make_signal(40000)
+        self.data = encoder.encode(self.channels, block_size=1152,
+                                   subframe='lpc8')
+
+    def test_valid_file(self):
+        result = verify_file(self.write_file(self.data))
+
+        self.assertTrue(result.ok, str(result))
+        self.assertTrue(result.md5_ok)
+        self.assertEqual(result.frames, 35)
+        self.assertEqual(result.samples, 40000)
+
+    def test_8_bit_md5_is_over_signed_samples(self):
+        channels = encoder.make_signal(3000, bits_per_sample=8)
+        result = verify_file(self.write_file(encoder.encode(
+            channels, bits_per_sample=8)))
+
+        self.assertTrue(result.md5_ok, str(result))
+
+    def test_12_bit_md5_is_over_unpadded_samples(self):
+        channels = encoder.make_signal(3000, bits_per_sample=12)
+        result = verify_file(self.write_file(encoder.encode(
+            channels, bits_per_sample=12)))
+
+        self.assertTrue(result.md5_ok, str(result))
+
+    def test_corrupted_frame(self):
+        data = bytearray(self.data)
+        data[len(data) // 2] ^= 0x04
+        result = verify_file(self.write_file(bytes(data)))
+
+        self.assertFalse(result.ok)
+        self.assertEqual(len(result.crc_errors), 1)
+        self.assertIn('CRC mismatch', str(result))
+
+    def test_md5_mismatch(self):
+        # MD5 лежит в последних 16 байтах STREAMINFO
+        data = bytearray(self.data)
+        data[8 + 34 - 1] ^= 0xFF
+        result = verify_file(self.write_file(bytes(data)))
+
+        self.assertFalse(result.md5_ok)
+        self.assertEqual(result.crc_errors, [])
+        self.assertIn('MD5 mismatch', str(result))
+
+    def test_verify_files_in_parallel(self):
+        good = self.write_file(self.data, 'good.flac')
+        bad = self.write_file(b'not a flac file', 'bad.flac')
+        results = list(verify_files([good, bad], workers=2))
+
+        self.assertEqual([r.path for r in results], [good, bad])
+        self.assertEqual([r.ok for r in results], [True, False])
+        self.assertIn('Bad flac file', results[1].error)
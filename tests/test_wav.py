@@ -0,0 +1,29 @@
+import io
+import struct
+import unittest
+
+from flac.wav import HEADER_SIZE, WavWriter, wav_header
+
+
+class WavTest(unittest.TestCase):
+    def test_header(self):
+        header = wav_header(2, 44100, 16, 400)
+
+        self.assertEqual(len(header), HEADER_SIZE)
+        self.assertEqual(header[:4], b'RIFF')
+        self.assertEqual(struct.unpack('<I', header[4:8])[0], 436)
+        self.assertEqual(struct.unpack('<HHIIHH', header[20:36]),
+                         (1, 2, 44100, 44100 * 4, 4, 16))
+        self.assertEqual(struct.unpack('<I', header[40:44])[0], 400)
+
+    def test_writer_should_fix_sizes_on_close(self):
+        f = io.BytesIO()
+        wav = WavWriter(f, 1, 8000, 24)
+        wav.write(b'\x00' * 30)
+        wav.close()
+
+        data = f.getvalue()
+        self.assertEqual(data[HEADER_SIZE:], b'\x00' * 30)
+        self.assertEqual(struct.unpack('<I', data[4:8])[0], 66)
+        self.assertEqual(struct.unpack('<I', data[40:44])[0], 30)
+        self.assertEqual(struct.unpack('<H', data[32:34])[0], 3)
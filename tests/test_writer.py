@@ -0,0 +1,178 @@
+import os
+import struct
+
+from flac.meta import Flac
+from flac.meta.blocks import Padding
+from flac.meta.writer import (MetadataEditor, _finish, edit_files,
+                              vorbis_comment_data)
+from flac.verify import verify_file
+
+from benchmarks import encoder
+from .test_flac import FlacTestCase
+
+
+def comment_block(tags: dict) -> tuple:
+    return 4, vorbis_comment_data('test', tags)
+
+
+class MetadataEditorTest(FlacTestCase):
+    def setUp(self):
+        super().setUp()
+        self.channels = encoder.make_signal(5000)
+
+    def write(self, padding: int = 1024, name: str = 'test.flac') -> str:
+        blocks = [comment_block({'TITLE': ['Song']})]
+        if padding is not None:
+            blocks.append((1, bytes(padding)))
+        return self.write_flac(self.channels, name, block_size=1152,
+                               blocks=blocks)
+
+    def audio(self, filename: str) -> bytes:
+        flac = Flac(filename)
+        offset = flac._audio_offset
+        del flac
+        with open(filename, 'rb') as f:
+            f.seek(offset)
+            return f.read()
+
+    def test_edit_in_place(self):
+        filename = self.write()
+        size = os.path.getsize(filename)
+        audio = self.audio(filename)
+
+        editor = MetadataEditor(filename)
+        editor.set_tag('title', ['Other'])
+        editor.add_tag('ARTIST', 'Someone')
+        result = editor.save()
+
+        self.assertTrue(result.in_place)
+        self.assertEqual(os.path.getsize(filename), size)
+        self.assertEqual(self.audio(filename), audio)
+        flac = Flac(filename)
+        self.assertEqual(flac.vorbis_comments[0].tags,
+                         {'TITLE': ['Other'], 'ARTIST': ['Someone']})
+        padding = [b for b in flac.metadata_blocks if isinstance(b, Padding)]
+        self.assertEqual(len(padding), 1)
+        self.assertTrue(padding[0].is_last)
+        self.assertTrue(verify_file(filename).ok)
+
+    def test_exact_fit_without_padding(self):
+        filename = self.write(padding=None)
+        size = os.path.getsize(filename)
+
+        editor = MetadataEditor(filename)
+        editor.set_tag('TITLE', ['Gnos'])
+
+        self.assertTrue(editor.save().in_place)
+        self.assertEqual(os.path.getsize(filename), size)
+        self.assertEqual(Flac(filename).vorbis_comments[0].tags,
+                         {'TITLE': ['Gnos']})
+
+    def test_rewrite_when_padding_is_too_small(self):
+        filename = self.write(padding=10)
+        audio = self.audio(filename)
+
+        editor = MetadataEditor(filename)
+        editor.set_tag('COMMENT', ['x' * 100])
+        result = editor.save(padding=500)
+
+        self.assertFalse(result.in_place)
+        self.assertEqual(self.audio(filename), audio)
+        flac = Flac(filename)
+        self.assertEqual(flac.vorbis_comments[0].tags['COMMENT'],
+                         ['x' * 100])
+        self.assertEqual(flac.metadata_blocks[-1].size, 500)
+        self.assertTrue(verify_file(filename).ok)
+        self.assertEqual([f for f in os.listdir(self.dir)], ['test.flac'])
+
+        # следующая правка уже помещается в новый PADDING
+        editor.add_tag('COMMENT', 'y' * 100)
+        self.assertTrue(editor.save().in_place)
+
+    def test_pictures(self):
+        filename = self.write(padding=4096)
+        editor = MetadataEditor(filename)
+        editor.add_picture(b'\x89PNG' + bytes(100), 'image/png',
+                           description='front')
+        editor.add_picture(b'back', 'image/jpeg', picture_type=4)
+        self.assertTrue(editor.save().in_place)
+
+        flac = Flac(filename)
+        pictures = flac.pictures
+        self.assertEqual([(p.type_code, p.mime_type, p.description)
+                          for p in pictures],
+                         [(3, 'image/png', 'front'), (4, 'image/jpeg', '')])
+        self.assertEqual(pictures[0].image_data, b'\x89PNG' + bytes(100))
+
+        editor = MetadataEditor(filename)
+        editor.remove_pictures(3)
+        editor.save()
+        self.assertEqual([p.type_code for p in Flac(filename).pictures], [4])
+
+    def test_value_with_equals_sign(self):
+        filename = self.write()
+        editor = MetadataEditor(filename)
+        editor.set_tag('COMMENT', ['a=b=c'])
+        editor.save()
+
+        self.assertEqual(MetadataEditor(filename).get_tag('comment'),
+                         ['a=b=c'])
+
+    def test_edit_files(self):
+        paths = [self.write(name='{}.flac'.format(i)) for i in range(3)]
+        paths.append(os.path.join(self.dir, 'missing.flac'))
+
+        results = list(edit_files(
+            paths, lambda e: e.set_tag('ALBUM', ['Batch']), workers=2))
+
+        self.assertEqual([r.path for r in results], paths)
+        self.assertEqual([r.ok for r in results], [True, True, True, False])
+        for path in paths[:3]:
+            self.assertEqual(Flac(path).vorbis_comments[0].tags['ALBUM'],
+                             ['Batch'])
+
+    def test_block_size_limit(self):
+        filename = self.write()
+        editor = MetadataEditor(filename)
+        editor.set_tag('COMMENT', ['x' * (1 << 24)])
+
+        with self.assertRaises(ValueError):
+            editor.save()
+        self.assertEqual(struct.unpack('>I', b'\0' + open(
+            filename, 'rb').read()[5:8])[0], 34)
+
+    def test_padding_larger_than_block_limit(self):
+        limit = (1 << 24) - 1
+        filename = self.write(padding=limit)
+        with open(filename, 'rb') as f:
+            data = f.read()
+        # второй PADDING после STREAMINFO: вместе с первым не помещается
+        # в один блок
+        extra = encoder.metadata_block(1, bytes(1000))
+        self.write_file(data[:42] + extra + data[42:])
+
+        editor = MetadataEditor(filename)
+        editor.remove_tag('TITLE')
+        self.assertTrue(editor.save().in_place)
+
+        flac = Flac(filename)
+        sizes = [b.size for b in flac.metadata_blocks
+                 if isinstance(b, Padding)]
+        self.assertEqual(len(sizes), 2)
+        self.assertLessEqual(max(sizes), limit)
+        self.assertTrue(flac.metadata_blocks[-1].is_last)
+        self.assertTrue(verify_file(filename).ok)
+
+    def test_padding_split_leaves_no_short_remainder(self):
+        limit = (1 << 24) - 1
+        for free in [limit + 4, limit + 6, 2 * (limit + 4) + 2]:
+            data = _finish(b'', free)
+            self.assertEqual(len(data), free)
+            offset, sizes = 0, []
+            while offset < len(data):
+                size = struct.unpack('>I', data[offset:offset + 4])[0] \
+                    & limit
+                sizes.append(size)
+                offset += 4 + size
+            self.assertEqual(offset, free)
+            self.assertEqual(data[offset - 4 - sizes[-1]] & 0x80, 0x80)